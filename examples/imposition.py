@@ -27,7 +27,8 @@ def create_book(papersize):
             AlignLM.ALIGN_LEFT if recto else AlignLM.ALIGN_RIGHT,
             AlignLM.ALIGN_BOTTOM, element=rotated)
 
-        inner_content = RecursionStopperLM(8)
+        # Recurse until the pages are too small to see.
+        inner_content = RecursionStopperLM(20, size_limit=2)
         inner_overlay = OverlayLM([
             Border(width=0, background=(1.0, 1.0, 1.0)),
             ClipLM(
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+"""
+Advance widths of the standard 14 PDF fonts, in thousandths of an em,
+from the Adobe Font Metrics (AFM) files distributed with the fonts.
+
+This module is generated, do not edit it by hand.
+"""
+
+#: The characters in WinAnsiEncoding, in the order of the widths below.
+WINANSI_CHARACTERS = (
+    ' !"#$%&\'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]'
+    '^_`abcdefghijklmnopqrstuvwxyz{|}~\xa0¡¢£¤¥¦§¨©ª«¬\xad®¯°±²³´µ¶·¸'
+    '¹º»¼½¾¿ÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖ×ØÙÚÛÜÝÞßàáâãäåæçèéêëìíîïðñòóôõö÷ø'
+    'ùúûüýþÿŒœŠšŸŽžƒˆ˜–—‘’‚“”„†‡•…‰‹›€™'
+    )
+
+#: The characters in SymbolEncoding, in the order of the widths below.
+SYMBOL_CHARACTERS = (
+    ' !#%&()+,./0123456789:;<=>?[]_{|}¬°±µ×÷ƒΑΒΓΔΕΖΗΘΙΚΛΜΝΞΟΠΡΣΤΥΦΧΨΩ'
+    'αβγδεζηθικλμνξοπρςστυφχψωϑϒϕϖ•…′″⁄€ℑ℘ℜΩℵ←↑→↓↔↵⇐⇑⇒⇓⇔∀∂∃∅∆∇∈∉∋∏∑−∗'
+    '√∝∞∠∧∨∩∪∫∴∼≅≈≠≡≤≥⊂⊃⊄⊆⊇⊕⊗⊥⋅⌠⌡〈〉◊♠♣♥♦\uf6d9\uf6da\uf6db\uf8e5'
+    '\uf8e6\uf8e7\uf8e8\uf8e9\uf8ea\uf8eb\uf8ec\uf8ed\uf8ee\uf8ef'
+    '\uf8f0\uf8f1\uf8f2\uf8f3\uf8f4\uf8f5\uf8f6\uf8f7\uf8f8\uf8f9'
+    '\uf8fa\uf8fb\uf8fc\uf8fd\uf8fe'
+    )
+
+#: The characters in ZapfDingbatsEncoding, in the order of the widths below.
+ZAPFDINGBATS_CHARACTERS = (
+    ' →↔↕①②③④⑤⑥⑦⑧⑨⑩■▲▼◆●◗★☎☛☞♠♣♥♦✁✂✃✄✆✇✈✉✌✍✎✏✐✑✒✓✔✕✖✗✘✙✚✛✜✝✞✟✠✡✢✣✤✥✦✧'
+    '✩✪✫✬✭✮✯✰✱✲✳✴✵✶✷✸✹✺✻✼✽✾✿❀❁❂❃❄❅❆❇❈❉❊❋❍❏❐❑❒❖❘❙❚❛❜❝❞❡❢❣❤❥❦❧❨❩❪❫❬❭❮❯❰'
+    '❱❲❳❴❵❶❷❸❹❺❻❼❽❾❿➀➁➂➃➄➅➆➇➈➉➊➋➌➍➎➏➐➑➒➓➔➘➙➚➛➜➝➞➟➠➡➢➣➤➥➦➧➨➩➪➫➬➭➮➯➱➲➳➴'
+    '➵➶➷➸➹➺➻➼➽➾'
+    )
+
+#: The encoding and widths of each font.
+WIDTHS = {
+    'Courier': (WINANSI_CHARACTERS, (
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600
+        )),
+    'Courier-Bold': (WINANSI_CHARACTERS, (
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600
+        )),
+    'Courier-Oblique': (WINANSI_CHARACTERS, (
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600
+        )),
+    'Courier-BoldOblique': (WINANSI_CHARACTERS, (
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600, 600,
+        600, 600, 600, 600, 600, 600, 600, 600, 600, 600
+        )),
+    'Helvetica': (WINANSI_CHARACTERS, (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278,
+        333, 278, 278, 556, 556, 556, 556, 556, 556, 556, 556, 556, 556,
+        278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611,
+        778, 722, 278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667,
+        611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556, 333,
+        556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833,
+        556, 556, 556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500,
+        334, 260, 334, 584, 278, 333, 556, 556, 556, 556, 260, 556, 333,
+        737, 370, 556, 584, 333, 737, 333, 400, 584, 333, 333, 333, 556,
+        537, 278, 333, 333, 365, 556, 834, 834, 834, 611, 667, 667, 667,
+        667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+        722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722,
+        667, 667, 611, 556, 556, 556, 556, 556, 556, 889, 500, 556, 556,
+        556, 556, 278, 278, 278, 278, 556, 556, 556, 556, 556, 556, 556,
+        584, 611, 556, 556, 556, 556, 500, 556, 500, 1000, 944, 667, 500,
+        667, 611, 500, 556, 333, 333, 556, 1000, 222, 222, 222, 333, 333,
+        333, 556, 556, 350, 1000, 1000, 333, 333, 556, 1000
+        )),
+    'Helvetica-Bold': (WINANSI_CHARACTERS, (
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278,
+        333, 278, 278, 556, 556, 556, 556, 556, 556, 556, 556, 556, 556,
+        333, 333, 584, 584, 584, 611, 975, 722, 722, 722, 722, 667, 611,
+        778, 722, 278, 556, 722, 611, 833, 722, 778, 667, 778, 722, 667,
+        611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556, 333,
+        556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889,
+        611, 611, 611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500,
+        389, 280, 389, 584, 278, 333, 556, 556, 556, 556, 280, 556, 333,
+        737, 370, 556, 584, 333, 737, 333, 400, 584, 333, 333, 333, 611,
+        556, 278, 333, 333, 365, 556, 834, 834, 834, 611, 722, 722, 722,
+        722, 722, 722, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+        722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722,
+        667, 667, 611, 556, 556, 556, 556, 556, 556, 889, 556, 556, 556,
+        556, 556, 278, 278, 278, 278, 611, 611, 611, 611, 611, 611, 611,
+        584, 611, 611, 611, 611, 611, 556, 611, 556, 1000, 944, 667, 556,
+        667, 611, 500, 556, 333, 333, 556, 1000, 278, 278, 278, 500, 500,
+        500, 556, 556, 350, 1000, 1000, 333, 333, 556, 1000
+        )),
+    'Helvetica-Oblique': (WINANSI_CHARACTERS, (
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278,
+        333, 278, 278, 556, 556, 556, 556, 556, 556, 556, 556, 556, 556,
+        278, 278, 584, 584, 584, 556, 1015, 667, 667, 722, 722, 667, 611,
+        778, 722, 278, 500, 667, 556, 833, 722, 778, 667, 778, 722, 667,
+        611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556, 333,
+        556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833,
+        556, 556, 556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500,
+        334, 260, 334, 584, 278, 333, 556, 556, 556, 556, 260, 556, 333,
+        737, 370, 556, 584, 333, 737, 333, 400, 584, 333, 333, 333, 556,
+        537, 278, 333, 333, 365, 556, 834, 834, 834, 611, 667, 667, 667,
+        667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+        722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722,
+        667, 667, 611, 556, 556, 556, 556, 556, 556, 889, 500, 556, 556,
+        556, 556, 278, 278, 278, 278, 556, 556, 556, 556, 556, 556, 556,
+        584, 611, 556, 556, 556, 556, 500, 556, 500, 1000, 944, 667, 500,
+        667, 611, 500, 556, 333, 333, 556, 1000, 222, 222, 222, 333, 333,
+        333, 556, 556, 350, 1000, 1000, 333, 333, 556, 1000
+        )),
+    'Helvetica-BoldOblique': (WINANSI_CHARACTERS, (
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278,
+        333, 278, 278, 556, 556, 556, 556, 556, 556, 556, 556, 556, 556,
+        333, 333, 584, 584, 584, 611, 975, 722, 722, 722, 722, 667, 611,
+        778, 722, 278, 556, 722, 611, 833, 722, 778, 667, 778, 722, 667,
+        611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556, 333,
+        556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889,
+        611, 611, 611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500,
+        389, 280, 389, 584, 278, 333, 556, 556, 556, 556, 280, 556, 333,
+        737, 370, 556, 584, 333, 737, 333, 400, 584, 333, 333, 333, 611,
+        556, 278, 333, 333, 365, 556, 834, 834, 834, 611, 722, 722, 722,
+        722, 722, 722, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+        722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722,
+        667, 667, 611, 556, 556, 556, 556, 556, 556, 889, 556, 556, 556,
+        556, 556, 278, 278, 278, 278, 611, 611, 611, 611, 611, 611, 611,
+        584, 611, 611, 611, 611, 611, 556, 611, 556, 1000, 944, 667, 556,
+        667, 611, 500, 556, 333, 333, 556, 1000, 278, 278, 278, 500, 500,
+        500, 556, 556, 350, 1000, 1000, 333, 333, 556, 1000
+        )),
+    'Times-Roman': (WINANSI_CHARACTERS, (
+        250, 333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250,
+        333, 250, 278, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+        278, 278, 564, 564, 564, 444, 921, 722, 667, 667, 722, 611, 556,
+        722, 722, 333, 389, 722, 611, 889, 722, 722, 556, 722, 667, 556,
+        611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500, 333,
+        444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778,
+        500, 500, 500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444,
+        480, 200, 480, 541, 250, 333, 500, 500, 500, 500, 200, 500, 333,
+        760, 276, 500, 564, 333, 760, 333, 400, 564, 300, 300, 333, 500,
+        453, 250, 333, 300, 310, 500, 750, 750, 750, 444, 722, 722, 722,
+        722, 722, 722, 889, 667, 611, 611, 611, 611, 333, 333, 333, 333,
+        722, 722, 722, 722, 722, 722, 722, 564, 722, 722, 722, 722, 722,
+        722, 556, 500, 444, 444, 444, 444, 444, 444, 667, 444, 444, 444,
+        444, 444, 278, 278, 278, 278, 500, 500, 500, 500, 500, 500, 500,
+        564, 500, 500, 500, 500, 500, 500, 500, 500, 889, 722, 556, 389,
+        722, 611, 444, 500, 333, 333, 500, 1000, 333, 333, 333, 444, 444,
+        444, 500, 500, 350, 1000, 1000, 333, 333, 500, 980
+        )),
+    'Times-Bold': (WINANSI_CHARACTERS, (
+        250, 333, 555, 500, 500, 1000, 833, 278, 333, 333, 500, 570, 250,
+        333, 250, 278, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+        333, 333, 570, 570, 570, 500, 930, 722, 667, 722, 722, 667, 611,
+        778, 778, 389, 500, 778, 667, 944, 722, 778, 611, 778, 722, 556,
+        667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500, 333,
+        500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833,
+        556, 500, 556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444,
+        394, 220, 394, 520, 250, 333, 500, 500, 500, 500, 220, 500, 333,
+        747, 300, 500, 570, 333, 747, 333, 400, 570, 300, 300, 333, 556,
+        540, 250, 333, 300, 330, 500, 750, 750, 750, 500, 722, 722, 722,
+        722, 722, 722, 1000, 722, 667, 667, 667, 667, 389, 389, 389, 389,
+        722, 722, 778, 778, 778, 778, 778, 570, 778, 722, 722, 722, 722,
+        722, 611, 556, 500, 500, 500, 500, 500, 500, 722, 444, 444, 444,
+        444, 444, 278, 278, 278, 278, 500, 556, 500, 500, 500, 500, 500,
+        570, 500, 556, 556, 556, 556, 500, 556, 500, 1000, 722, 556, 389,
+        722, 667, 444, 500, 333, 333, 500, 1000, 333, 333, 333, 500, 500,
+        500, 500, 500, 350, 1000, 1000, 333, 333, 500, 1000
+        )),
+    'Times-Italic': (WINANSI_CHARACTERS, (
+        250, 333, 420, 500, 500, 833, 778, 214, 333, 333, 500, 675, 250,
+        333, 250, 278, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+        333, 333, 675, 675, 675, 500, 920, 611, 611, 667, 722, 611, 611,
+        722, 722, 333, 444, 667, 556, 833, 667, 722, 611, 722, 611, 500,
+        556, 722, 611, 833, 611, 556, 556, 389, 278, 389, 422, 500, 333,
+        500, 500, 444, 500, 444, 278, 500, 500, 278, 278, 444, 278, 722,
+        500, 500, 500, 500, 389, 389, 278, 500, 444, 667, 444, 444, 389,
+        400, 275, 400, 541, 250, 389, 500, 500, 500, 500, 275, 500, 333,
+        760, 276, 500, 675, 333, 760, 333, 400, 675, 300, 300, 333, 500,
+        523, 250, 333, 300, 310, 500, 750, 750, 750, 500, 611, 611, 611,
+        611, 611, 611, 889, 667, 611, 611, 611, 611, 333, 333, 333, 333,
+        722, 667, 722, 722, 722, 722, 722, 675, 722, 722, 722, 722, 722,
+        556, 611, 500, 500, 500, 500, 500, 500, 500, 667, 444, 444, 444,
+        444, 444, 278, 278, 278, 278, 500, 500, 500, 500, 500, 500, 500,
+        675, 500, 500, 500, 500, 500, 444, 500, 444, 944, 667, 500, 389,
+        556, 556, 389, 500, 333, 333, 500, 889, 333, 333, 333, 556, 556,
+        556, 500, 500, 350, 889, 1000, 333, 333, 500, 980
+        )),
+    'Times-BoldItalic': (WINANSI_CHARACTERS, (
+        250, 389, 555, 500, 500, 833, 778, 278, 333, 333, 500, 570, 250,
+        333, 250, 278, 500, 500, 500, 500, 500, 500, 500, 500, 500, 500,
+        333, 333, 570, 570, 570, 500, 832, 667, 667, 667, 722, 667, 667,
+        722, 778, 389, 500, 667, 611, 889, 722, 722, 611, 722, 667, 556,
+        611, 722, 667, 889, 667, 611, 611, 333, 278, 333, 570, 500, 333,
+        500, 500, 444, 500, 444, 333, 500, 556, 278, 278, 500, 278, 778,
+        556, 500, 500, 500, 389, 389, 278, 556, 444, 667, 500, 444, 389,
+        348, 220, 348, 570, 250, 389, 500, 500, 500, 500, 220, 500, 333,
+        747, 266, 500, 606, 333, 747, 333, 400, 570, 300, 300, 333, 576,
+        500, 250, 333, 300, 300, 500, 750, 750, 750, 500, 667, 667, 667,
+        667, 667, 667, 944, 667, 667, 667, 667, 667, 389, 389, 389, 389,
+        722, 722, 722, 722, 722, 722, 722, 570, 722, 722, 722, 722, 722,
+        611, 611, 500, 500, 500, 500, 500, 500, 500, 722, 444, 444, 444,
+        444, 444, 278, 278, 278, 278, 500, 556, 500, 500, 500, 500, 500,
+        570, 500, 556, 556, 556, 556, 444, 500, 444, 944, 722, 556, 389,
+        611, 611, 389, 500, 333, 333, 500, 1000, 333, 333, 333, 500, 500,
+        500, 500, 500, 350, 1000, 1000, 333, 333, 500, 1000
+        )),
+    'Symbol': (SYMBOL_CHARACTERS, (
+        250, 333, 500, 833, 778, 333, 333, 549, 250, 250, 278, 500, 500,
+        500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 549, 549, 549,
+        444, 333, 333, 500, 480, 200, 480, 713, 400, 549, 576, 549, 549,
+        500, 722, 667, 603, 612, 611, 611, 722, 741, 333, 722, 686, 889,
+        722, 645, 722, 768, 556, 592, 611, 690, 763, 722, 795, 768, 631,
+        549, 411, 494, 439, 494, 603, 521, 329, 549, 549, 576, 521, 493,
+        549, 549, 549, 439, 603, 439, 576, 521, 549, 686, 686, 631, 620,
+        603, 713, 460, 1000, 247, 411, 167, 750, 686, 987, 795, 768, 823,
+        987, 603, 987, 603, 1042, 658, 987, 603, 987, 603, 1042, 713, 494,
+        549, 823, 612, 713, 713, 713, 439, 823, 713, 549, 500, 549, 713,
+        713, 768, 603, 603, 768, 768, 274, 863, 549, 549, 549, 549, 549,
+        549, 549, 713, 713, 713, 713, 713, 768, 768, 658, 250, 686, 686,
+        329, 329, 494, 753, 753, 753, 753, 790, 790, 890, 500, 603, 1000,
+        790, 790, 786, 384, 384, 384, 384, 384, 384, 494, 494, 494, 494,
+        686, 384, 384, 384, 384, 384, 384, 494, 494, 494
+        )),
+    'ZapfDingbats': (ZAPFDINGBATS_CHARACTERS, (
+        278, 838, 1016, 458, 788, 788, 788, 788, 788, 788, 788, 788, 788,
+        788, 761, 892, 892, 788, 791, 438, 816, 719, 960, 939, 626, 776,
+        694, 595, 974, 961, 974, 980, 789, 790, 791, 690, 549, 855, 911,
+        933, 911, 945, 974, 755, 846, 762, 761, 571, 677, 763, 760, 759,
+        754, 494, 552, 537, 577, 692, 786, 788, 788, 790, 793, 794, 823,
+        789, 841, 823, 833, 816, 831, 923, 744, 723, 749, 790, 792, 695,
+        776, 768, 792, 759, 707, 708, 682, 701, 826, 815, 789, 789, 707,
+        687, 696, 689, 786, 787, 713, 791, 785, 873, 762, 762, 759, 759,
+        784, 138, 277, 415, 392, 392, 668, 668, 732, 544, 544, 910, 667,
+        760, 760, 390, 390, 317, 317, 276, 276, 509, 509, 410, 410, 234,
+        234, 334, 334, 788, 788, 788, 788, 788, 788, 788, 788, 788, 788,
+        788, 788, 788, 788, 788, 788, 788, 788, 788, 788, 788, 788, 788,
+        788, 788, 788, 788, 788, 788, 788, 894, 748, 924, 748, 918, 927,
+        928, 928, 834, 873, 828, 924, 924, 917, 930, 931, 463, 883, 836,
+        836, 867, 867, 696, 696, 874, 874, 760, 946, 771, 865, 771, 888,
+        967, 888, 831, 873, 927, 970, 918
+        )),
+    }
+
+#: The width used for characters that no font can represent.
+MISSING_WIDTH = 761
@@ -24,13 +24,18 @@ except ImportError:
             ImportWarning
             )
 
-def render_to_cairo_context(cairo_context, papersize_tuple, layout):
+def render_to_cairo_context(cairo_context, papersize_tuple, layout,
+                            pages=None):
     """Renders the given layout manager on a page of the given context.
 
     Assumes the given context has not yet been reversed in the y-direction
     (i.e. it is still the default for Cairo, where y increases up
     from the bottom of the page). This method performs the reversal and
     resets it before it returns.
+
+    If ``pages`` is given, only the pages of a
+    :class:`layout.pages.output.PagesLM` whose zero-based indices it
+    contains are output.
     """
     try:
         cairo_context.save()
@@ -38,31 +43,74 @@ def render_to_cairo_context(cairo_context, papersize_tuple, layout):
         cairo_context.scale(1, -1)
         layout.render(
             Rectangle(0, 0, *papersize_tuple),
-            dict(output=CairoOutput(cairo_context))
+            dict(
+                output=CairoOutput(cairo_context),
+                minimum_size_cache={},
+                height_for_width_cache={},
+                retain_minimum_sizes=True,
+                pages=pages
+                )
             )
     finally:
         cairo_context.restore()
 
-def render_to_cairo_document(output_filename, papersize_tuple, layout):
-    """Create and save a document with contents of the given layout manager."""
+def render_to_cairo_document(output_filename, papersize_tuple, layout,
+                             pages=None):
+    """Create and save a document with contents of the given layout
+    manager, optionally only the given pages."""
     doc = cairo.PDFSurface(output_filename, *papersize_tuple)
     c = cairo.Context(doc)
-    render_to_cairo_context(c, papersize_tuple, layout)
+    render_to_cairo_context(c, papersize_tuple, layout, pages)
+
+# Text is measured at this size and scaled down, to avoid any rounding
+# of small font sizes.
+_MEASURE_FONT_SIZE = 1000.0
 
 class CairoOutput(output.OutputTarget):
     """An output adapter for Cairo.
 
     Assumes the Cairo context has already been reversed in the y-direction
     (i.e. so y increases downwards from the top of the page).
+
+    The font, color, line width and dash pattern are tracked in a
+    :class:`layout.datatypes.output.GraphicsState`, and only set on the
+    context when they change, so shapes are drawn without saving and
+    restoring the context around each one. Text is drawn with a
+    flipped font matrix, rather than by flipping the context.
+
+    Text widths are held in :attr:`text_width_cache` and
+    :attr:`glyph_widths`, which are shared by every instance of this
+    class. If a ``metrics`` object, such as a
+    :class:`layout.metrics.FontMetrics`, is given, text is measured
+    with that instead.
     """
-    def __init__(self, cairo_context):
+
+    #: The :class:`layout.datatypes.output.TextWidthCache` used to
+    #: measure text.
+    text_width_cache = output.TextWidthCache()
+
+    #: The :class:`layout.datatypes.output.GlyphWidths` used to
+    #: measure batches of text.
+    glyph_widths = output.GlyphWidths()
+
+    def __init__(self, cairo_context, metrics=None):
         self.c = cairo_context
+        self.metrics = metrics
+        self.state = output.GraphicsState()
+
+        # The recording surface of each stored form, by key, and the
+        # contexts of the pages or forms that the forms being stored
+        # are inside.
+        self._forms = {}
+        self._form_stack = []
 
     def _save_state(self):
         self.c.save()
+        self.state.save()
 
     def _restore_state(self):
         self.c.restore()
+        self.state.restore()
 
     def translate(self, x, y):
         self.c.translate(x, y)
@@ -74,35 +122,76 @@ class CairoOutput(output.OutputTarget):
         self.c.rotate(degrees * math.pi / 180)
 
     def text_width(self, text, *, font_name, font_size):
+        if self.metrics is not None:
+            return self.metrics.text_width(
+                text, font_name=font_name, font_size=font_size
+                )
+        return self.text_width_cache.get_width(
+            text, font_name, font_size, self._unit_text_width
+            )
+
+    def text_widths(self, strings, *, font_name, font_size):
+        if self.metrics is not None:
+            return self.metrics.text_widths(
+                strings, font_name=font_name, font_size=font_size
+                )
+        return self.glyph_widths.get_widths(
+            strings, font_name, font_size, self._unit_text_width
+            )
+
+    def _unit_text_width(self, text, font_name):
         c = self.c
         c.save()
         c.select_font_face(font_name)
-        c.set_font_size(font_size)
+        c.set_font_size(_MEASURE_FONT_SIZE)
         _, _, _, _, x_adv, _ = c.text_extents(text)
         c.restore()
-        return x_adv
+        return x_adv / _MEASURE_FONT_SIZE
+
+    def _set_source(self, color):
+        # Cairo fills and strokes with the same source.
+        if self.state.changed('source', color):
+            self.c.set_source_rgb(*color)
+
+    def _set_font(self, font_name, font_size):
+        c = self.c
+        state = self.state
+        if state.changed('font_name', font_name):
+            c.select_font_face(font_name)
+        if state.changed('font_size', font_size):
+            # Flipped, so text is upright in the reversed context.
+            c.set_font_matrix(
+                cairo.Matrix(font_size, 0, 0, -font_size, 0, 0)
+                )
 
     def draw_text(self, text, x, y, *, font_name, font_size, fill):
         c = self.c
-        c.save()
-        c.select_font_face(font_name)
-        c.set_font_size(font_size)
-        c.set_source_rgb(*fill)
-        c.translate(x, y)
-        c.move_to(0, 0)
-        c.scale(1, -1)
+        self._set_font(font_name, font_size)
+        self._set_source(fill)
+        c.move_to(x, y)
         c.show_text(text)
-        c.restore()
+
+    def draw_text_lines(self, lines, *, font_name, font_size, fill):
+        """Draws the given lines, selecting the font and color once."""
+        c = self.c
+        self._set_font(font_name, font_size)
+        self._set_source(fill)
+        for text, x, y in lines:
+            c.move_to(x, y)
+            c.show_text(text)
 
     def _fill_and_stroke(self, stroke, stroke_width, stroke_dash, fill):
         c = self.c
+        state = self.state
         if fill:
-            c.set_source_rgb(*fill)
+            self._set_source(fill)
             c.fill_preserve()
         if stroke:
-            c.set_source_rgb(*stroke)
-            c.set_line_width(stroke_width)
-            if stroke_dash:
+            self._set_source(stroke)
+            if state.changed('stroke_width', stroke_width):
+                c.set_line_width(stroke_width)
+            stroke_dash = tuple(stroke_dash or ())
+            if state.changed('stroke_dash', stroke_dash):
                 c.set_dash(stroke_dash)
             c.stroke()
         c.new_path()
@@ -113,12 +202,10 @@ class CairoOutput(output.OutputTarget):
             stroke_width=1,
             stroke_dash=None):
         c = self.c
-        c.save()
         c.new_path()
         c.move_to(x0, y0)
         c.line_to(x1, y1)
         self._fill_and_stroke(stroke, stroke_width, stroke_dash, None)
-        c.restore()
 
     def draw_rect(
             self, x, y, w, h, *,
@@ -128,11 +215,9 @@ class CairoOutput(output.OutputTarget):
             fill=None
             ):
         c = self.c
-        c.save()
         c.new_path()
         c.rectangle(x, y, w, h)
         self._fill_and_stroke(stroke, stroke_width, stroke_dash, fill)
-        c.restore()
 
     def draw_image(self, img_filename, x, y, w, h):
         raise NotImplemented()
@@ -148,17 +233,94 @@ class CairoOutput(output.OutputTarget):
             ) -> None:
         """Draws the given polygon."""
         c = self.c
-        c.save()
         c.new_path()
         for x,y in zip(*[iter(pts)]*2):
             c.line_to(x, y)
         if close_path:
             c.close_path()
         self._fill_and_stroke(stroke, stroke_width, stroke_dash, fill)
+
+    def draw_lines(
+            self, coords, *,
+            stroke,
+            stroke_width=1,
+            stroke_dash=None):
+        """Draws the given lines as a single path."""
+        c = self.c
+        c.new_path()
+        for x0, y0, x1, y1 in output.group_coordinates(coords, 4):
+            c.move_to(x0, y0)
+            c.line_to(x1, y1)
+        self._fill_and_stroke(stroke, stroke_width, stroke_dash, None)
+
+    def draw_rects(
+            self, coords, *,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        """Draws the given rectangles as a single path."""
+        c = self.c
+        c.new_path()
+        for x, y, w, h in output.group_coordinates(coords, 4):
+            c.rectangle(x, y, w, h)
+        self._fill_and_stroke(stroke, stroke_width, stroke_dash, fill)
+
+    def draw_polygons(
+            self, polygons, *,
+            close_path=True,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ) -> None:
+        """Draws the given polygons, setting their style once."""
+        c = self.c
+        for pts in polygons:
+            c.new_path()
+            for x,y in output.group_coordinates(pts, 2):
+                c.line_to(x, y)
+            if close_path:
+                c.close_path()
+            self._fill_and_stroke(stroke, stroke_width, stroke_dash, fill)
+
+    def has_form(self, key):
+        return key in self._forms
+
+    def begin_form(self, key, w, h):
+        """Starts a form, drawn on a Cairo recording surface, which
+        PDF surfaces write to the document once."""
+        surface = cairo.RecordingSurface(
+            cairo.CONTENT_COLOR_ALPHA, (0, 0, w, h)
+            )
+        self._form_stack.append((key, surface, self.c, self.state))
+        # The surface isn't reversed, so it is drawn in the same
+        # coordinates as the page it is placed on.
+        self.c = cairo.Context(surface)
+        self.state = output.GraphicsState()
+        return True
+
+    def end_form(self):
+        key, surface, self.c, self.state = self._form_stack.pop()
+        self._forms[key] = surface
+
+    def discard_form(self):
+        _, _, self.c, self.state = self._form_stack.pop()
+
+    def forget_form(self, key):
+        self._forms.pop(key, None)
+
+    def draw_form(self, key):
+        c = self.c
+        c.save()
+        c.set_source_surface(self._forms[key], 0, 0)
+        c.paint()
         c.restore()
 
     def end_page(self):
         self.c.show_page()
+        self.state.reset()
 
     def clip_rect(self, x, y, w, h):
         c = self.c
@@ -3,10 +3,172 @@
 """Base class for output."""
 
 import abc
+import array
+import collections
 import typing
 
 Color = typing.Tuple[float, float, float]
 
+class TextWidthCache:
+    """
+    A bounded cache of text widths, keyed by font name and text, that
+    discards the least recently used widths when it is full.
+
+    Widths are stored for a font size of one point and scaled to the
+    size requested, so the same string in different sizes is only
+    measured once. The ``hits`` and ``misses`` counts can be used to
+    check how effective the cache is.
+    """
+    def __init__(self, max_size:int=20000) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._widths = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._widths)
+
+    def get_width(
+            self, text:str, font_name:str, font_size:float,
+            measure:typing.Callable[[str, str], float]
+            ) -> float:
+        """
+        Returns the width of the given text. If it isn't in the cache,
+        ``measure(text, font_name)`` is called to find its width at a
+        font size of one point.
+        """
+        key = (font_name, text)
+        widths = self._widths
+        try:
+            width = widths[key]
+        except KeyError:
+            self.misses += 1
+            width = widths[key] = measure(text, font_name)
+            if len(widths) > self.max_size:
+                widths.popitem(last=False)
+        else:
+            self.hits += 1
+            widths.move_to_end(key)
+        return width * font_size
+
+    def clear(self) -> None:
+        """Removes all widths and resets the statistics."""
+        self._widths.clear()
+        self.hits = 0
+        self.misses = 0
+
+class GlyphWidths:
+    """
+    Tables of the advance width of each character, at a font size of
+    one point, for each font. Characters are measured the first time
+    they are seen, after which whole batches of strings can be measured
+    without calling the backend.
+
+    This ignores kerning, so is only suitable for backends that don't
+    kern text, such as ReportLab and Cairo's simple text API.
+    """
+    def __init__(self) -> None:
+        self._tables = {}
+
+    def get_widths(
+            self, strings:typing.Sequence[str],
+            font_name:str, font_size:float,
+            measure:typing.Callable[[str, str], float]
+            ) -> array.array:
+        """
+        Returns an array of the widths of the given strings. Any
+        characters not yet in the table for the font are measured with
+        ``measure(character, font_name)``, which should return the
+        width at a font size of one point.
+        """
+        table = self._tables.get(font_name)
+        if table is None:
+            table = self._tables[font_name] = {}
+        for character in set().union(*strings).difference(table):
+            table[character] = measure(character, font_name)
+
+        width_of = table.__getitem__
+        return array.array('d', [
+            sum(map(width_of, text)) * font_size for text in strings
+            ])
+
+class GraphicsState:
+    """
+    The drawing settings, such as the font and colors, that an output
+    target has last sent to its backend, so it need only send the ones
+    that change, rather than setting them all, inside their own saved
+    state, for every shape.
+
+    Backends restore these settings when they restore a saved state,
+    so :meth:`save` and :meth:`restore` should be called whenever the
+    backend's state is saved and restored, and :meth:`reset` whenever
+    the backend's settings return to their defaults, such as at the
+    start of a new page.
+    """
+    def __init__(self) -> None:
+        self._current = {}
+        self._saved = []
+
+    def changed(self, name:str, value) -> bool:
+        """
+        Returns true if the given setting doesn't yet have the given
+        value, in which case the caller must send it to the backend,
+        and it is recorded as the new value.
+        """
+        current = self._current
+        if name in current and current[name] == value:
+            return False
+        current[name] = value
+        return True
+
+    def save(self) -> None:
+        """Pushes a copy of the current settings on the stack."""
+        self._saved.append(dict(self._current))
+
+    def restore(self) -> None:
+        """Pops the settings from the stack."""
+        self._current = self._saved.pop()
+
+    def reset(self) -> None:
+        """Forgets the current settings, so they are all sent again."""
+        self._current.clear()
+
+def get_measure_key(target) -> typing.Hashable:
+    """
+    Returns a key for the way the given output target measures text.
+    Measurements can be shared between targets with the same key.
+
+    Targets that pass measuring on to another object, such as
+    recordings, name it in a ``measure_output`` attribute, and targets
+    that measure with a ``metrics`` object, such as a
+    :class:`layout.metrics.FontMetrics`, name it in a ``metrics``
+    attribute. The key is that of the object that does the measuring:
+    its ``measure_key`` attribute, if it has one, or otherwise its
+    type.
+    """
+    while True:
+        key = getattr(target, 'measure_key', None)
+        if key is not None:
+            return key
+        measurer = getattr(target, 'measure_output', None)
+        if measurer is None:
+            measurer = getattr(target, 'metrics', None)
+        if measurer is None:
+            return type(target)
+        target = measurer
+
+def group_coordinates(coords:typing.Iterable[float], n:int
+                      ) -> typing.Iterator[typing.Tuple[float, ...]]:
+    """
+    Yields tuples of each ``n`` values of the given flat sequence of
+    coordinates, such as a list, an ``array.array`` or a NumPy array.
+    NumPy arrays of any shape are flattened first.
+    """
+    ravel = getattr(coords, 'ravel', None)
+    if ravel is not None:
+        coords = ravel().tolist()
+    return zip(*[iter(coords)]*n)
+
 class OutputTarget(metaclass=abc.ABCMeta):
     """
     To allow this package to work with various renderers, this defines
@@ -48,12 +210,35 @@ class OutputTarget(metaclass=abc.ABCMeta):
         """The width of the given text string."""
         return 0
 
+    def text_widths(self, strings:typing.Sequence[str], *,
+                    font_name:str, font_size:float) -> array.array:
+        """The widths of each of the given text strings, as an
+        array. Backends should override this to measure the strings
+        in bulk."""
+        return array.array('d', [
+            self.text_width(text, font_name=font_name, font_size=font_size)
+            for text in strings
+            ])
+
     @abc.abstractmethod
     def draw_text(self, text:str, x:float, y:float, *,
                   font_name:str, font_size:float, fill:Color) -> None:
         """Draws the given text at x,y."""
         pass
 
+    def draw_text_lines(
+            self, lines:typing.Iterable[typing.Tuple[str, float, float]], *,
+            font_name:str, font_size:float, fill:Color
+            ) -> None:
+        """Draws each of the given (text, x, y) lines, all in the same
+        font and color. Backends should override this to draw the lines
+        as a single block of text."""
+        for text, x, y in lines:
+            self.draw_text(
+                text, x, y,
+                font_name=font_name, font_size=font_size, fill=fill
+                )
+
     @abc.abstractmethod
     def draw_line(
             self, x0:float, y0:float, x1:float, y1:float, *,
@@ -95,6 +280,100 @@ class OutputTarget(metaclass=abc.ABCMeta):
         """Draws the given linear path."""
         pass
 
+    def draw_lines(
+            self, coords:typing.Sequence[float], *,
+            stroke:Color,
+            stroke_width:float=1,
+            stroke_dash:typing.Sequence=None
+            ) -> None:
+        """Draws a line between each pair of points in the given flat
+        sequence of coordinates, four per line (x0, y0, x1, y1), all in
+        the same style. Backends should override this to draw the lines
+        as a single path."""
+        for x0, y0, x1, y1 in group_coordinates(coords, 4):
+            self.draw_line(
+                x0, y0, x1, y1,
+                stroke=stroke, stroke_width=stroke_width,
+                stroke_dash=stroke_dash
+                )
+
+    def draw_rects(
+            self, coords:typing.Sequence[float], *,
+            stroke:Color=None,
+            stroke_width:float=1,
+            stroke_dash:typing.Sequence=None,
+            fill:Color=None
+            ) -> None:
+        """Draws the rectangles in the given flat sequence of
+        coordinates, four per rectangle (x, y, w, h), all in the same
+        style. Backends should override this to draw the rectangles
+        as a single path, filled with the nonzero winding rule, so
+        overlapping rectangles are filled as if drawn separately."""
+        for x, y, w, h in group_coordinates(coords, 4):
+            self.draw_rect(
+                x, y, w, h,
+                stroke=stroke, stroke_width=stroke_width,
+                stroke_dash=stroke_dash, fill=fill
+                )
+
+    def draw_polygons(
+            self, polygons:typing.Iterable[typing.Sequence[float]], *,
+            close_path:bool=True,
+            stroke:Color=None,
+            stroke_width:float=1,
+            stroke_dash:typing.Sequence=None,
+            fill:Color=None
+            ) -> None:
+        """Draws each of the given flat sequences of coordinates as a
+        linear path, all in the same style. Backends should override
+        this to set the style only once."""
+        for pts in polygons:
+            self.draw_polygon(
+                *pts, close_path=close_path,
+                stroke=stroke, stroke_width=stroke_width,
+                stroke_dash=stroke_dash, fill=fill
+                )
+
+    def has_form(self, key:typing.Hashable) -> bool:
+        """Has a form been stored with the given key?"""
+        return False
+
+    def begin_form(self, key:typing.Hashable, w:float, h:float) -> bool:
+        """
+        Starts storing a form with the given key: output that is kept
+        by the backend and can then be drawn any number of times with
+        :meth:`draw_form`, such as a PDF form XObject. Everything
+        output until :meth:`end_form` goes into the form, rather than
+        the page, in coordinates from (0, 0) to (w, h), and is clipped
+        to that rectangle.
+
+        Returns False, without starting a form, if this target can't
+        store forms, in which case the caller should output directly.
+        Backends that can should override this and the other form
+        methods.
+        """
+        return False
+
+    def end_form(self) -> None:
+        """Finishes the form started by :meth:`begin_form`, and stores
+        it."""
+        raise NotImplementedError("This output target can't store forms.")
+
+    def discard_form(self) -> None:
+        """Abandons the form started by :meth:`begin_form`, after an
+        error, without storing it. Output returns to where it was."""
+        raise NotImplementedError("This output target can't store forms.")
+
+    def forget_form(self, key:typing.Hashable) -> None:
+        """Forgets the stored form with the given key, if there is one,
+        so it can be freed, once it won't be drawn again."""
+        pass
+
+    def draw_form(self, key:typing.Hashable) -> None:
+        """Draws the stored form with the given key, with its origin at
+        the current origin."""
+        raise NotImplementedError("This output target can't store forms.")
+
     @abc.abstractmethod
     def clip_rect(self, x:float, y:float, w:float, h:float) -> None:
         """Clip further output to this rect."""
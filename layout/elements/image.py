@@ -11,6 +11,9 @@ except ImportError:
         ImportWarning
         )
 
+@root.add_layout_properties([
+    'min_width', 'fixed_size', 'horizontal_align', 'vertical_align'
+    ])
 class Image(root.LayoutElement):
     """Represents an image to be displayed at a fixed aspect ratio."""
 
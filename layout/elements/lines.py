@@ -1,6 +1,7 @@
 import layout.managers.root as root
 import layout.datatypes as datatypes
 
+@root.add_layout_properties(['color', 'width', 'dash'])
 class LineBase(root.LayoutElement):
     """The base class for various kinds of line."""
 
@@ -36,6 +37,7 @@ class VerticalLine(LineBase):
             stroke=self.color, stroke_width=self.width, stroke_dash=self.dash
             )
 
+@root.add_layout_properties(['background'])
 class Border(LineBase):
     """Draws a line surrounding the space, with an optional additional
     color for fill."""
@@ -67,20 +69,23 @@ class Border(LineBase):
                          fill=self.background
                          )
                 if self.color is not None:
-                    def _line(pos1, pos2):
-                        c.draw_line(
-                            pos1.x, pos1.y, pos2.x, pos2.y,
+                    # Each side runs from its corner to the next.
+                    corners = (
+                        rect.top_left, rect.top_right,
+                        rect.bottom_right, rect.bottom_left
+                        )
+                    coords = []
+                    for side, direction in enumerate(self.directions):
+                        if direction:
+                            start = corners[side]
+                            end = corners[(side + 1) % 4]
+                            coords.extend((start.x, start.y, end.x, end.y))
+                    if coords:
+                        c.draw_lines(
+                            coords,
                             stroke=self.color, stroke_width=self.width,
                             stroke_dash=self.dash
                             )
-                    if self.directions[0]:
-                        _line(rect.top_left, rect.top_right)
-                    if self.directions[1]:
-                        _line(rect.top_right, rect.bottom_right)
-                    if self.directions[2]:
-                        _line(rect.bottom_right, rect.bottom_left)
-                    if self.directions[3]:
-                        _line(rect.bottom_left, rect.top_left)
 
 class Fill(Border):
     """
@@ -1,6 +1,7 @@
 import layout.managers.root as root
 from layout.datatypes import Rectangle
 
+@root.add_layout_properties(['index', 'total', 'width', 'color', 'margin'])
 class SignatureMark(root.LayoutElement):
     """A signature mark.
 
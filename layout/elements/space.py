@@ -1,6 +1,7 @@
 import layout.managers.root as root
 import layout.datatypes as datatypes
 
+@root.add_layout_properties(['width', 'height'])
 class Spacer(root.LayoutElement):
     """Reserves a specific amount of blank space.
 
@@ -1,7 +1,13 @@
+import bisect
+import collections
+import itertools
+
 import layout.managers.root as root
 import layout.datatypes as datatypes
+from layout.datatypes import output
 import layout.managers.directional as directional
 
+@root.add_layout_properties(['color', 'font_name', 'font_size', 'align'])
 class TextBase(root.LayoutElement):
     """Base class of things that track their font, color and alignment."""
 
@@ -16,89 +22,688 @@ class TextBase(root.LayoutElement):
         self.font_size = font_size
         self.align = align
 
+def _iter_greedy_breaks(word_widths, word_space, width, indent, start=0,
+                        end=None):
+    """
+    Yields the index of the word that starts each new line, putting as
+    many words on each line as will fit, starting from the word with
+    the given index at the given indent, and stopping before the word
+    with the ``end`` index, if given. A word wider than the line is put
+    on a line of its own.
+
+    Widths are only looked up as they are needed, so ``word_widths``
+    can be any sequence that measures words when they are indexed.
+    """
+    if end is None:
+        end = len(word_widths)
+    x = indent
+    line_start = start
+    for index in range(start, end):
+        ww = word_widths[index]
+        if x + ww > width and index > line_start:
+            # Newline
+            yield index
+            line_start = index
+            x = 0
+        x += ww + word_space
+
+# Overfull lines cost this much more than the same amount of space left
+# over, so they are only chosen when a word is wider than the line.
+_OVERFULL_PENALTY = 1e6
+
+def _line_badness(length, width):
+    """The badness of a line of the given length set in the given width:
+    the square of the space left over, or a heavy penalty on the amount
+    it overflows."""
+    slack = width - length
+    if slack >= 0:
+        return slack * slack
+    return _OVERFULL_PENALTY * slack * slack
+
+def _break_lines_optimally(word_widths, word_space, width, indent):
+    """
+    Returns the indices of the words that start each line after the
+    first, chosen to minimize the total badness of all the lines but
+    the last, which only has to fit.
+
+    The length of the line from word i up to word j is ``ends[j] -
+    starts[i]``, and the badness is a convex function of it, so the
+    costs are totally monotone. Once a later start is better for some
+    end, it stays better for all the ends after it. We keep a queue of
+    candidate starts with the first end each one wins, finding that end
+    by binary search, so the whole paragraph is broken in O(n log n).
+    """
+    num_words = len(word_widths)
+    if num_words < 2:
+        return []
+
+    # The position of each word boundary, as if every word were followed
+    # by a space.
+    positions = [0.0]
+    for ww in word_widths:
+        positions.append(positions[-1] + ww + word_space)
+    ends = [position - word_space for position in positions]
+    starts = positions[:]
+    starts[0] -= indent
+
+    best = [0.0] * (num_words + 1)
+    previous = [0] * (num_words + 1)
+
+    def cost(i, j):
+        return best[i] + _line_badness(ends[j] - starts[i], width)
+
+    # Breaks before the last line: candidates and the first end each
+    # one is best for.
+    last = num_words - 1
+    candidates = [0]
+    firsts = [1]
+    head = 0
+    for j in range(1, num_words):
+        while head + 1 < len(candidates) and firsts[head + 1] <= j:
+            head += 1
+        i = candidates[head]
+        best[j] = cost(i, j)
+        previous[j] = i
+
+        # Remove the candidates that j beats from their first end on.
+        # The head candidate is never removed, as its first end has
+        # already passed.
+        while firsts[-1] > j and \
+                cost(j, firsts[-1]) <= cost(candidates[-1], firsts[-1]):
+            candidates.pop()
+            firsts.pop()
+
+        # Find the first end, if any, where j beats the last candidate.
+        other = candidates[-1]
+        low = max(firsts[-1], j + 1)
+        high = last + 1
+        while low < high:
+            middle = (low + high) // 2
+            if cost(j, middle) <= cost(other, middle):
+                high = middle
+            else:
+                low = middle + 1
+        if low <= last:
+            candidates.append(j)
+            firsts.append(low)
+
+    # The last line costs nothing if it fits.
+    def last_line_cost(i):
+        length = ends[num_words] - starts[i]
+        return best[i] + (
+            0 if length <= width else _line_badness(length, width)
+            )
+    i = min(range(num_words), key=last_line_cost)
+
+    breaks = []
+    while i > 0:
+        breaks.append(i)
+        i = previous[i]
+    breaks.reverse()
+    return breaks
+
+class ParagraphLayoutCache:
+    """
+    A bounded cache of paragraph layouts, shared by every paragraph with
+    the same text, font and geometry, that discards the least recently
+    used layouts when it is full.
+
+    Each layout holds the words on each line and the height of the
+    lines, neither of which are ever changed once cached. The ``hits``
+    and ``misses`` counts can be used to check how effective the cache
+    is.
+    """
+    def __init__(self, max_size=2000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._layouts = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._layouts)
+
+    def get_layout(self, key, layout):
+        """
+        Returns the layout with the given key. If it isn't in the
+        cache, ``layout()`` is called to calculate it.
+        """
+        layouts = self._layouts
+        try:
+            result = layouts[key]
+        except KeyError:
+            self.misses += 1
+            result = layouts[key] = layout()
+            if len(layouts) > self.max_size:
+                layouts.popitem(last=False)
+        else:
+            self.hits += 1
+            layouts.move_to_end(key)
+        return result
+
+    def clear(self):
+        """Removes all layouts and resets the statistics."""
+        self._layouts.clear()
+        self.hits = 0
+        self.misses = 0
+
+@root.add_layout_properties(
+    ['width', 'leading', 'paragraph_indent', 'line_breaking']
+    )
 class Paragraph(TextBase):
     """
     A paragraph of text that will be fit in the given width.
 
-    Because this class has a specific width it does not scale to fit
-    with the room it is given. It may therefore overlap surrounding
-    content unless it is wrapped in a scaling layout manager.
+    The given width is the paragraph's minimum width. When it is
+    drawn the text is reflowed to fit the width it is given, and
+    managers that stretch their elements to fill a column, such as
+    :class:`layout.managers.directional.VerticalLM`, use
+    :meth:`get_height_for_width` to give it the height it then needs.
+    Otherwise it may overlap surrounding content, unless it is wrapped
+    in a scaling layout manager.
+
+    By default lines are broken greedily, putting as many words on
+    each line as will fit. With ``line_breaking=BREAK_OPTIMAL`` the
+    breaks are chosen to minimize the sum of the squares of the space
+    left at the end of each line but the last, in the manner of Knuth
+    and Plass, giving a more even right edge.
+
+    Layouts are held in :attr:`layout_cache`, which is shared by every
+    instance of this class, so repeated paragraphs, such as footers,
+    are only laid out once. When the text is edited, only the words
+    that have changed are measured again, and greedy breaking only
+    breaks the lines from the edit until they match the old lines.
     """
+
+    BREAK_GREEDY = 0
+    BREAK_OPTIMAL = 1
+
+    #: The :class:`ParagraphLayoutCache` holding laid out paragraphs.
+    layout_cache = ParagraphLayoutCache()
+
+    # The settings, words, word widths, space width and breaks of the
+    # last layout, kept when the text changes so edits can be laid out
+    # incrementally.
+    _last_breaks = None
+
+    # The number of widths whose layouts are kept on the paragraph, in
+    # front of the shared layout cache.
+    _max_width_layouts = 8
+
     def __init__(self, text, width, font_name='Helvetica',
                  font_size=11, color=(0,0,0),
-                 leading=1.3, paragraph_indent=True):
+                 leading=1.3, paragraph_indent=True,
+                 line_breaking=BREAK_GREEDY):
         super(Paragraph, self).__init__(font_name, font_size, color)
         self.text = text
         self.width = width
         self.paragraph_indent = paragraph_indent
         self.leading = leading
+        self.line_breaking = line_breaking
 
     def _set_text(self, text):
         self._text = text
-        # Clear calculated quantities
-        self._layout = None
-        self.height = 0
+        self.invalidate()
     def _get_text(self):
         return self._text
     text = property(_get_text, _set_text)
 
-    def _do_layout(self, data):
+    def _mark_changed(self):
+        super(Paragraph, self)._mark_changed()
+        # Clear calculated quantities
+        self._layout = None
+        self.height = 0
+        self._width_layouts = {}
+
+    def _get_layout(self, width, data):
         """
-        Lays the text out into separate lines and calculates their
-        total height.
+        Returns the words on each line and the height of the lines when
+        the text is laid out in the given width. Each width is laid out
+        at most once, and is found in the :attr:`layout_cache` if any
+        paragraph has already been laid out the same way. Only the
+        layouts of the last few widths are kept on the paragraph.
         """
         c = data['output']
-        word_space = c.text_width(
-            ' ',
-            font_name=self.font_name,
-            font_size=self.font_size)
+        width_key = (width, output.get_measure_key(c))
+        width_layouts = self._width_layouts
+        try:
+            return width_layouts[width_key]
+        except KeyError:
+            pass
+        if len(width_layouts) >= self._max_width_layouts:
+            del width_layouts[next(iter(width_layouts))]
 
-        # Arrange the text as words on lines
-        self._layout = [[]]
-        x = self.font_size if self.paragraph_indent else 0
-        for word in self.text.split():
-            ww = c.text_width(
-                word,
+        key = (
+            self.text, width, self.font_name, self.font_size,
+            self.leading, self.paragraph_indent, self.line_breaking,
+            output.get_measure_key(c)
+            )
+        result = width_layouts[width_key] = \
+            self.layout_cache.get_layout(
+                key, lambda: self._break_lines(width, c)
+                )
+        return result
+
+    def _do_layout(self, data):
+        """
+        Lays the text out into separate lines at our width and
+        calculates their total height.
+        """
+        lines, self.height = self._get_layout(self.width, data)
+        self._layout = list(lines)
+
+    def _measure_words(self, words, c):
+        """
+        Returns the widths of the given words, and of a space, reusing
+        the widths from the last layout for any words at the start and
+        end of the text that haven't changed since, so only edited
+        words are measured. Also returns the number of words unchanged
+        at the start and end.
+        """
+        measure_key = (
+            output.get_measure_key(c), self.font_name, self.font_size
+            )
+        last = self._last_breaks
+        if last is None or last[0][:3] != measure_key:
+            word_space = c.text_width(
+                ' ',
                 font_name=self.font_name,
                 font_size=self.font_size)
-            if x + ww > self.width:
-                # Newline
-                x = 0
-                self._layout.append([])
-            self._layout[-1].append(word)
-            x += ww + word_space
+            word_widths = c.text_widths(
+                words,
+                font_name=self.font_name,
+                font_size=self.font_size)
+            return word_widths, word_space, 0, 0
+
+        _, old_words, old_widths, word_space, _ = last
+        most = min(len(words), len(old_words))
+        prefix = 0
+        while prefix < most and words[prefix] == old_words[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < most - prefix and \
+                words[-1-suffix] == old_words[-1-suffix]:
+            suffix += 1
+
+        word_widths = old_widths[:prefix]
+        word_widths.extend(c.text_widths(
+            words[prefix:len(words)-suffix],
+            font_name=self.font_name,
+            font_size=self.font_size))
+        word_widths.extend(old_widths[len(old_widths)-suffix:])
+        return word_widths, word_space, prefix, suffix
+
+    def _break_greedily(self, words, word_widths, word_space, width,
+                        indent, settings, prefix, suffix):
+        """
+        Returns the index of the word that starts each line after the
+        first. If the text was last broken with the same settings, the
+        lines before the first edited word are kept, and breaking stops
+        as soon as a line starts at the same word in the unchanged end
+        of the text as it did before.
+        """
+        last = self._last_breaks
+        if last is None or last[0] != settings:
+            return list(_iter_greedy_breaks(
+                word_widths, word_space, width, indent
+                ))
+
+        _, old_words, _, _, old_breaks = last
+        # An edit can pull its first word back onto the line before, so
+        # start again from the line holding the word before the edit.
+        line = bisect.bisect_right(old_breaks, prefix - 1) if prefix else 0
+        breaks = old_breaks[:line]
+        start = breaks[-1] if breaks else 0
+
+        shift = len(words) - len(old_words)
+        first_unchanged = len(words) - suffix
+        old_break_set = set(old_breaks)
+        for index in _iter_greedy_breaks(
+                word_widths, word_space, width, indent if line == 0 else 0,
+                start
+                ):
+            breaks.append(index)
+            if index >= first_unchanged and index - shift in old_break_set:
+                # The rest of the lines are as they were.
+                old_line = bisect.bisect_right(old_breaks, index - shift)
+                breaks.extend(
+                    old_index + shift for old_index in old_breaks[old_line:]
+                    )
+                break
+        return breaks
+
+    def _break_lines(self, width, c):
+        """
+        Returns the words on each line, measured with the given output,
+        and the height of the lines.
+        """
+        words = self.text.split()
+        word_widths, word_space, prefix, suffix = self._measure_words(
+            words, c
+            )
+
+        # Arrange the text as words on lines
+        indent = self.font_size if self.paragraph_indent else 0
+        settings = (
+            output.get_measure_key(c), self.font_name, self.font_size,
+            width, indent,
+            self.line_breaking
+            )
+        if self.line_breaking == Paragraph.BREAK_OPTIMAL:
+            breaks = _break_lines_optimally(
+                word_widths, word_space, width, indent
+                )
+        else:
+            breaks = self._break_greedily(
+                words, word_widths, word_space, width, indent, settings,
+                prefix, suffix
+                )
+        self._last_breaks = (settings, words, word_widths, word_space, breaks)
+        lines = tuple(
+            tuple(words[start:end])
+            for start, end in zip([0] + breaks, breaks + [len(words)])
+            )
 
         # Work out the height we need
-        num_lines = len(self._layout)
-        self.height = (
+        num_lines = len(lines)
+        height = (
             num_lines * self.font_size +
             (num_lines-1)*(self.font_size * (self.leading - 1.0))
             )
+        return lines, height
 
     def get_minimum_size(self, data):
         if not self._layout:
             self._do_layout(data)
         return datatypes.Point(self.width, self.height)
 
+    def get_height_for_width(self, width, data):
+        """The height of the text when it is reflowed to fit the given
+        width."""
+        return self._get_layout(width, data)[1]
+
     def render(self, rect, data):
-        if not self._layout:
-            self._do_layout(data)
+        """Draws the text, reflowed to fit the width it is given."""
+        lines, _ = self._get_layout(rect.w, data)
+        y = rect.y + rect.h - self.font_size
+        x = rect.x + (self.font_size if self.paragraph_indent else 0)
+        placed = []
+        for line in lines:
+            placed.append((' '.join(line), x, y))
+            x = rect.x
+            y -= self.font_size * self.leading
+        data['output'].draw_text_lines(
+            placed,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            fill=self.color
+            )
+
+
+# Words are measured in batches of this many as a flow needs them.
+_FLOW_MEASURE_BATCH = 256
+
+class _FlowWordWidths:
+    """The widths of the words of a :class:`TextFlow`, measured as they
+    are indexed."""
+    def __init__(self, flow, c):
+        self.flow = flow
+        self.c = c
+
+    def __getitem__(self, index):
+        return self.flow._get_word_width(index, self.c)
+
+@root.add_layout_properties(['text', 'leading', 'paragraph_indent'])
+class TextFlow(TextBase):
+    """
+    A long text poured through a chain of frames, such as the columns
+    of a page and then the columns of the pages that follow.
+
+    Frames are made with :meth:`create_frame` and placed wherever they
+    are needed in the layout. Each frame holds as many lines as fit in
+    the rectangle it is given, continuing from where the frame before
+    it stopped, so frames must be rendered in the order they were
+    created. A flow placed in a layout directly shows as much of its
+    text as fits, as if it were a chain of one frame.
+
+    Blank lines in the text separate paragraphs, each of which starts
+    on a new line, indented if ``paragraph_indent`` is true. Lines are
+    broken greedily, in the same way as :class:`Paragraph`, and words
+    are only measured and broken into lines as the frames need them, so
+    a long text can be output one page at a time with
+    :meth:`iter_pages`.
+
+    The flow doesn't hold on to its frames, but remembers the word
+    indices of the lines placed in each frame filled so far, so that
+    any frame can be rendered again. This grows with the number of
+    lines output, rather than with the text, which is held anyway.
+    Changing the flow, or calling :meth:`iter_pages`, starts a new
+    chain, whose frames must be made again.
+    """
+    def __init__(self, text, font_name='Helvetica',
+                 font_size=11, color=(0,0,0),
+                 leading=1.3, paragraph_indent=True):
+        super(TextFlow, self).__init__(font_name, font_size, color)
+        self.text = text
+        self.leading = leading
+        self.paragraph_indent = paragraph_indent
+
+    def _mark_changed(self):
+        super(TextFlow, self)._mark_changed()
+        # Clear calculated quantities
+        self._words = None
+        self._paragraph_starts = None
+        self._paragraph_ends = None
+        self._word_widths = None
+        self._measured_with = None
+        self._word_space = 0
+        self._restart_chain()
+
+    def _restart_chain(self):
+        """Forgets the frames made so far, so the next frame made
+        starts the chain again."""
+        self._frame_count = 0
+        # The (start, width, height, lines) placed in each frame so
+        # far, in order.
+        self._filled = []
+
+    def create_frame(self):
+        """Returns a new frame at the end of the chain."""
+        frame = TextFlowFrame(self, self._frame_count)
+        self._frame_count += 1
+        return frame
+
+    def _get_words(self):
+        if self._words is None:
+            self._words = []
+            self._paragraph_starts = set()
+            self._paragraph_ends = []
+            for paragraph in self.text.split('\n\n'):
+                words = paragraph.split()
+                if words:
+                    self._paragraph_starts.add(len(self._words))
+                    self._words.extend(words)
+                    self._paragraph_ends.append(len(self._words))
+        return self._words
+
+    def _get_paragraph_end(self, index):
+        """Returns the index of the word after the end of the paragraph
+        holding the given word."""
+        ends = self._paragraph_ends
+        return ends[bisect.bisect_right(ends, index)]
+
+    def _use_output(self, c):
+        """Discards our word widths and frames if they were measured
+        with an output that measures text differently."""
+        measure_key = output.get_measure_key(c)
+        if self._measured_with != measure_key:
+            self._measured_with = measure_key
+            self._word_widths = []
+            self._word_space = c.text_width(
+                ' ',
+                font_name=self.font_name,
+                font_size=self.font_size)
+            del self._filled[:]
+
+    def _get_word_width(self, index, c):
+        """Returns the width of the given word, measuring it, and those
+        after it, if it hasn't been measured yet."""
+        widths = self._word_widths
+        if index >= len(widths):
+            start = len(widths)
+            widths.extend(c.text_widths(
+                self._words[start:max(index+1, start+_FLOW_MEASURE_BATCH)],
+                font_name=self.font_name,
+                font_size=self.font_size))
+        return widths[index]
+
+    def _fill(self, start, width, height, c):
+        """Returns the (start, end) word indices of each line that fits
+        in a frame of the given size, from the given word."""
+        words = self._get_words()
+        line_height = self.font_size * self.leading
+        if height < self.font_size:
+            max_lines = 0
+        else:
+            max_lines = int(
+                (height - self.font_size) / line_height + 1e-9
+                ) + 1
+
+        word_widths = _FlowWordWidths(self, c)
+        lines = []
+        index = start
+        while len(lines) < max_lines and index < len(words):
+            # Break the rest of the paragraph, as far as the frame needs.
+            end = self._get_paragraph_end(index)
+            indent = 0
+            if self.paragraph_indent and index in self._paragraph_starts:
+                indent = self.font_size
+            breaks = _iter_greedy_breaks(
+                word_widths, self._word_space, width, indent, index, end
+                )
+            for line_end in itertools.chain(breaks, [end]):
+                lines.append((index, line_end))
+                index = line_end
+                if len(lines) == max_lines:
+                    break
+        return tuple(lines)
+
+    def _get_end(self, frame_index):
+        """Returns the index of the word after the last one in the given
+        filled frame."""
+        start, _, _, lines = self._filled[frame_index]
+        return lines[-1][1] if lines else start
+
+    def _get_frame_lines(self, frame_index, rect, data):
+        """Returns the lines in the given frame, filling it if it hasn't
+        been filled at this size, after the frame before it."""
         c = data['output']
-        with c:
-            y = rect.y + rect.h - self.font_size
-            x = rect.x + (self.font_size if self.paragraph_indent else 0)
-            for line in self._layout:
-                c.draw_text(
-                    ' '.join(line), x, y,
-                    font_name=self.font_name,
-                    font_size=self.font_size,
-                    fill=self.color
+        self._get_words()
+        self._use_output(c)
+
+        if frame_index > len(self._filled):
+            raise ValueError(
+                "Frame %d of the text flow was rendered before frame %d." %
+                (frame_index, len(self._filled))
+                )
+        start = self._get_end(frame_index-1) if frame_index else 0
+
+        if frame_index < len(self._filled):
+            filled = self._filled[frame_index]
+            if filled[:3] == (start, rect.w, rect.h):
+                return filled[3]
+            # The frames after this one follow on from it.
+            del self._filled[frame_index:]
+
+        lines = self._fill(start, rect.w, rect.h, c)
+        self._filled.append((start, rect.w, rect.h, lines))
+        return lines
+
+    def is_finished(self):
+        """Have all the words been placed in the frames rendered so
+        far?"""
+        words = self._get_words()
+        return not words or (
+            bool(self._filled) and self._get_end(-1) == len(words)
+            )
+
+    def iter_pages(self, create_page):
+        """
+        Yields pages until all the text has been placed. Each page is
+        made by calling ``create_page(flow)``, which should call
+        :meth:`create_frame` for each frame on the page. Each page must
+        be rendered before the next is requested, as that is when its
+        frames are filled. Pages are given a true ``fast_forward``
+        attribute, so pages that aren't output by a
+        :class:`layout.pages.output.PagesLM` are still laid out.
+
+        Each call starts a new chain of frames, so the pages can be
+        iterated, and the text output, again.
+        """
+        self._restart_chain()
+        while True:
+            end = self._get_end(-1) if self._filled else 0
+            page = create_page(self)
+            page.fast_forward = True
+            yield page
+            if len(self._filled) < self._frame_count:
+                raise ValueError(
+                    "A page must be rendered before the next is requested."
                     )
+            if self.is_finished():
+                return
+            if self._get_end(-1) == end:
+                raise ValueError("The page's frames are too small for text.")
 
-                x = rect.x
-                y -= self.font_size * self.leading
+    def get_minimum_size(self, data):
+        return datatypes.Point(0, 0)
 
+    def render(self, rect, data):
+        c = data['output']
+        self._get_words()
+        self._use_output(c)
+        self._draw_lines(self._fill(0, rect.w, rect.h, c), rect, c)
 
+    def _render_frame(self, frame_index, rect, data):
+        self._draw_lines(
+            self._get_frame_lines(frame_index, rect, data), rect,
+            data['output']
+            )
+
+    def _draw_lines(self, lines, rect, c):
+        words = self._words
+        y = rect.y + rect.h - self.font_size
+        placed = []
+        for start, end in lines:
+            x = rect.x
+            if self.paragraph_indent and start in self._paragraph_starts:
+                x += self.font_size
+            placed.append((' '.join(words[start:end]), x, y))
+            y -= self.font_size * self.leading
+        c.draw_text_lines(
+            placed,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            fill=self.color
+            )
+
+class TextFlowFrame(root.LayoutElement):
+    """
+    A frame in the chain of a :class:`TextFlow`, made with its
+    :meth:`TextFlow.create_frame` method. It fills whatever space it is
+    given with the text that follows the frame before it.
+    """
+    def __init__(self, flow, index):
+        self.flow = flow
+        self.index = index
+        self._adopt(flow)
+
+    def get_minimum_size(self, data):
+        return datatypes.Point(0, 0)
+
+    def render(self, rect, data):
+        self.flow._render_frame(self.index, rect, data)
+
+@root.add_layout_properties(['text'])
 class TextLine(TextBase):
     """
     An unsplittable line of text formatted in a single font and size.
@@ -118,7 +723,9 @@ class TextLine(TextBase):
             )
         return datatypes.Point(width, self.font_size)
 
-    def render(self, rect, data):
+    def _get_origin(self, rect, data):
+        """Returns the x, y position of the text in the given
+        rectangle."""
         # Calculate the y coordinate including the descender (so we fit in
         # the box rather than resting on the bottom edge of it).
         y = rect.y + self.font_size*0.2
@@ -128,8 +735,12 @@ class TextLine(TextBase):
             x = rect.left
         else:
             align = 1 if self.align == TextLine.ALIGN_RIGHT else 0.5
-            width = self.get_minimum_size(data).x
+            width = root.get_cached_minimum_size(self, data).x
             x = rect.left + (rect.w - width) * align
+        return x, y
+
+    def render(self, rect, data):
+        x, y = self._get_origin(rect, data)
         data['output'].draw_text(
             self.text, x, y,
             font_name=self.font_name,
@@ -161,11 +772,56 @@ class TextBlock(TextBase):
             self.vertical.add_element(TextLine(
                     text, font_name, self.font_size, self.color, self.align
                     ))
+        self._adopt(self.vertical)
+
+    def _measure_lines(self, data):
+        """Measures any of our lines not yet measured in this render
+        pass, with one call per font, and stores their sizes in the
+        pass's 'minimum_size_cache'."""
+        try:
+            cache = data['minimum_size_cache']
+        except (KeyError, TypeError):
+            return
+
+        lines_by_font = {}
+        for line in self.vertical.elements:
+            if line not in cache:
+                lines_by_font.setdefault(line.font_name, []).append(line)
+
+        c = data['output']
+        for font_name, lines in lines_by_font.items():
+            widths = c.text_widths(
+                [line.text for line in lines],
+                font_name=font_name,
+                font_size=self.font_size
+                )
+            for line, width in zip(lines, widths):
+                cache[line] = datatypes.Point(width, line.font_size)
 
     def get_minimum_size(self, data):
-        return self.vertical.get_minimum_size(data)
+        self._measure_lines(data)
+        return root.get_cached_minimum_size(self.vertical, data)
 
     def render(self, rect, data):
-        return self.vertical.render(rect, data)
+        """Draws the lines in each font as a single block of text,
+        unless the frame of each line is being recorded."""
+        self._measure_lines(data)
+        if 'frame_recorder' in data:
+            return root.render_element(self.vertical, rect, data)
+
+        lines_by_font = {}
+        for line, line_rect in self.vertical._get_element_rects(rect, data):
+            x, y = line._get_origin(line_rect, data)
+            lines_by_font.setdefault(line.font_name, []).append(
+                (line.text, x, y)
+                )
+        c = data['output']
+        for font_name, lines in lines_by_font.items():
+            c.draw_text_lines(
+                lines,
+                font_name=font_name,
+                font_size=self.font_size,
+                fill=self.color
+                )
 
 
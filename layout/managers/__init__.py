@@ -3,6 +3,7 @@ from .box import *
 from .clip import *
 from .directional import *
 from .fixed import *
+from .form import *
 from .grid import *
 from .jitter import *
 from .margins import *
@@ -1,6 +1,9 @@
 from layout import datatypes
 from . import root
 
+@root.add_layout_properties([
+    'horizontal_align', 'vertical_align', 'element', 'min_width', 'min_height'
+    ])
 class AlignLM(root.LayoutManager):
     """
     A layout manager that takes one element and aligns it according to
@@ -67,7 +70,7 @@ class AlignLM(root.LayoutManager):
     def get_minimum_size(self, data):
         """Returns the minimum size of the managed element, as long as
         it is larger than any manually set minima."""
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
         return datatypes.Point(
             max(size.x, self.min_width),
             max(size.y, self.min_height)
@@ -77,7 +80,7 @@ class AlignLM(root.LayoutManager):
         """Draws the managed element in the correct alignment."""
         # We can't use our get minimum size, because that enforces
         # the size limits.
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
 
         # Assume we're bottom left at our natural size.
         x = rect.x
@@ -102,4 +105,6 @@ class AlignLM(root.LayoutManager):
         elif self.vertical_align == AlignLM.GROW_Y:
             h = rect.h
 
-        self.element.render(datatypes.Rectangle(x, y, w, h), data)
+        root.render_element(
+            self.element, datatypes.Rectangle(x, y, w, h), data
+            )
@@ -4,6 +4,7 @@ from . import root
 _box_fields = ['top', 'right', 'bottom', 'left', 'center']
 
 @root.add_fields('_elements', _box_fields)
+@root.add_layout_properties(['margin'])
 class BoxLM(root.LayoutManager):
     """
     A layout manager in the style of Java's BoxLayout, with a central
@@ -104,9 +105,9 @@ class BoxLM(root.LayoutManager):
         item_sizes = [
             (
                 datatypes.Point(0, 0)
-                if getattr(self, direction) is None
-                else getattr(self, direction).get_minimum_size(data)
-            ) for direction in _box_fields
+                if element is None
+                else root.get_cached_minimum_size(element, data)
+            ) for element in self._elements
         ]
 
         # Work out how many margins we'll be using
@@ -129,27 +130,64 @@ class BoxLM(root.LayoutManager):
             )
         return datatypes.Point(min_width, min_height)
 
+    def get_height_for_width(self, width, data):
+        """
+        The top and bottom elements are given the full width, and the
+        center element the width left by the left and right elements.
+        """
+        h_margins = 0
+        if self.top is not None: h_margins += self.margin
+        if self.bottom is not None: h_margins += self.margin
+
+        height = h_margins
+        for element in (self.top, self.bottom):
+            if element is not None:
+                height += root.get_height_for_width(element, width, data)
+
+        middle_height = 0
+        for element in (self.left, self.right):
+            if element is not None:
+                size = root.get_cached_minimum_size(element, data)
+                middle_height = max(middle_height, size.y)
+                width -= size.x + self.margin
+        if self.center is not None:
+            middle_height = max(
+                middle_height,
+                root.get_height_for_width(self.center, width, data)
+                )
+        return height + middle_height
+
     def render(self, rect, data):
         x, y, w, h = rect.get_data()
 
         if self.top is not None:
-            size = self.top.get_minimum_size(data)
-            self.top.render(datatypes.Rectangle(x,y+h-size.y,w,size.y), data)
-            h -= size.y + self.margin
+            top_h = root.get_height_for_width(self.top, w, data)
+            root.render_element(
+                self.top, datatypes.Rectangle(x,y+h-top_h,w,top_h), data
+                )
+            h -= top_h + self.margin
         if self.bottom is not None:
-            size = self.bottom.get_minimum_size(data)
-            self.bottom.render(datatypes.Rectangle(x, y, w, size.y), data)
-            y += size.y + self.margin
-            h -= size.y + self.margin
+            bottom_h = root.get_height_for_width(self.bottom, w, data)
+            root.render_element(
+                self.bottom, datatypes.Rectangle(x, y, w, bottom_h), data
+                )
+            y += bottom_h + self.margin
+            h -= bottom_h + self.margin
         if self.right is not None:
-            size = self.right.get_minimum_size(data)
-            self.right.render(datatypes.Rectangle(x+w-size.x,y,size.x,h), data)
+            size = root.get_cached_minimum_size(self.right, data)
+            root.render_element(
+                self.right, datatypes.Rectangle(x+w-size.x,y,size.x,h), data
+                )
             w -= size.x + self.margin
         if self.left is not None:
-            size = self.left.get_minimum_size(data)
-            self.left.render(datatypes.Rectangle(x, y, size.x, h), data)
+            size = root.get_cached_minimum_size(self.left, data)
+            root.render_element(
+                self.left, datatypes.Rectangle(x, y, size.x, h), data
+                )
             w -= size.x + self.margin
             x += size.x + self.margin
         if self.center is not None:
-            self.center.render(datatypes.Rectangle(x, y, w, h), data)
+            root.render_element(
+                self.center, datatypes.Rectangle(x, y, w, h), data
+                )
 
@@ -1,5 +1,6 @@
 from . import root
 
+@root.add_layout_properties(['element'])
 class ClipLM(root.LayoutManager):
     """
     A ReportLab-specific layout manager that establishes a clipping
@@ -16,11 +17,11 @@ class ClipLM(root.LayoutManager):
         self.element = element
 
     def get_minimum_size(self, data):
-        return self.element.get_minimum_size(data)
+        return root.get_cached_minimum_size(self.element, data)
 
     def render(self, rect, data):
         # Set the crop.
         c = data['output']
         with c:
             c.clip_rect(rect.x, rect.y, rect.w, rect.h)
-            self.element.render(rect, data)
+            root.render_element(self.element, rect, data)
@@ -1,6 +1,7 @@
 from layout import datatypes
 from . import root
 
+@root.add_layout_properties(['margin', 'vertical_align', 'horizontal_align'])
 class VerticalLM(root.GroupLayoutManager):
     """
     Keeps a set of elements above one another. We can control
@@ -87,15 +88,50 @@ class VerticalLM(root.GroupLayoutManager):
         min_width = 0
         height = 0
         for element in self.elements:
-            size = element.get_minimum_size(data)
+            size = root.get_cached_minimum_size(element, data)
             min_width = max(min_width, size.x)
             height += size.y
         height += (len(self.elements)-1)*self.margin
         return datatypes.Point(min_width, height)
 
-    def render(self, rect, data):
+    def _get_element_widths(self, width, data):
         """
-        Displays the elements according to the align properties.
+        Returns the x offset and width of each element, if the layout
+        is given the width.
+        """
+        if self.horizontal_align == VerticalLM.ALIGN_GROW:
+            return [(0, width)] * len(self.elements)
+
+        result = []
+        for element in self.elements:
+            size = root.get_cached_minimum_size(element, data)
+            if self.horizontal_align == VerticalLM.ALIGN_LEFT:
+                result.append((0, size.x))
+            elif self.horizontal_align == VerticalLM.ALIGN_CENTER:
+                result.append((width*0.5 - size.x*0.5, size.x))
+            else:
+                assert self.horizontal_align == VerticalLM.ALIGN_RIGHT
+                result.append((width - size.x, size.x))
+        return result
+
+    def get_height_for_width(self, width, data):
+        """
+        The total height the elements need at the widths they will
+        be given, plus margins.
+        """
+        height = 0
+        for element, (_, w) in zip(
+                self.elements, self._get_element_widths(width, data)
+                ):
+            height += root.get_height_for_width(element, w, data)
+        height += (len(self.elements)-1)*self.margin
+        return height
+
+    def _get_element_rects(self, rect, data):
+        """
+        Returns the elements, from the top down, with the rectangle
+        each is given when the layout is rendered in the given
+        rectangle.
         """
         # Make sure we're aligned correctly
         if self.horizontal_align not in VerticalLM._VALID_ALIGN_HORIZONTAL:
@@ -103,12 +139,22 @@ class VerticalLM(root.GroupLayoutManager):
         if self.vertical_align not in VerticalLM._VALID_ALIGN_VERTICAL:
             raise ValueError('Vertical align is not valid.')
 
-        # Work out the extra height we have to distribute
-        extra_height = rect.h - self.get_minimum_size(data).y
+        # Work out the space each element needs at its width, and the
+        # extra height we have to distribute
         num_elements = len(self.elements)
         if num_elements == 0:
-            return
-        elif num_elements > 1:
+            return []
+        placements = []
+        total_height = 0
+        for element, (x, w) in zip(
+                self.elements, self._get_element_widths(rect.w, data)
+                ):
+            h = root.get_height_for_width(element, w, data)
+            placements.append((element, rect.x + x, w, h))
+            total_height += h
+        total_height += (num_elements-1)*self.margin
+        extra_height = rect.h - total_height
+        if num_elements > 1:
             per_margin = 1.0 / float(num_elements-1)
         else:
             per_margin = 0.0
@@ -121,41 +167,36 @@ class VerticalLM(root.GroupLayoutManager):
         elif self.vertical_align == VerticalLM.ALIGN_TOP:
             y = rect.y + extra_height
 
-        # Render each child element
-        for element in reversed(self.elements):
-            size = element.get_minimum_size(data)
-
-            # Work out the x-coordinates
-            if self.horizontal_align == VerticalLM.ALIGN_LEFT:
-                x = rect.x
-                w = size.x
-            elif self.horizontal_align == VerticalLM.ALIGN_CENTER:
-                x = rect.center - size.x*0.5
-                w = size.x
-            elif self.horizontal_align == VerticalLM.ALIGN_RIGHT:
-                x = rect.right - size.x
-                w = size.x
-            else:
-                assert self.horizontal_align == VerticalLM.ALIGN_GROW
-                x = rect.x
-                w = rect.w
-
+        # Place each child element
+        element_rects = []
+        for element, x, w, height in reversed(placements):
             # Work out the y-coordinates
             if self.vertical_align in VerticalLM._ALIGN_SIMPLE_SET:
-                h = size.y
-                next_y = y + size.y + self.margin
+                h = height
+                next_y = y + height + self.margin
             elif self.vertical_align == VerticalLM.ALIGN_EQUAL_SPACING:
-                h = size.y
-                next_y = y + size.y + self.margin + extra_height*per_margin
+                h = height
+                next_y = y + height + self.margin + extra_height*per_margin
             else:
                 assert self.vertical_align == VerticalLM.ALIGN_EQUAL_GROWTH
-                h = size.y + extra_height*per_element
+                h = height + extra_height*per_element
                 next_y = y + h + self.margin
 
-            # Render and move on.
-            element.render(datatypes.Rectangle(x, y, w, h), data)
+            element_rects.append((element, datatypes.Rectangle(x, y, w, h)))
             y = next_y
+        element_rects.reverse()
+        return element_rects
+
+    def render(self, rect, data):
+        """
+        Displays the elements according to the align properties.
+        """
+        for element, element_rect in reversed(
+                self._get_element_rects(rect, data)
+                ):
+            root.render_element(element, element_rect, data)
 
+@root.add_layout_properties(['margin', 'vertical_align', 'horizontal_align'])
 class HorizontalLM(root.GroupLayoutManager):
     """
     Keeps a set of elements alongside one another. We can control
@@ -237,7 +278,7 @@ class HorizontalLM(root.GroupLayoutManager):
         width = 0
         min_height = 0
         for element in self.elements:
-            size = element.get_minimum_size(data)
+            size = root.get_cached_minimum_size(element, data)
             min_height = max(min_height, size.y)
             width += size.x
         width += (len(self.elements)-1)*self.margin
@@ -253,7 +294,7 @@ class HorizontalLM(root.GroupLayoutManager):
             raise ValueError('Vertical align is not valid.')
 
         # Work out the extra width we have to distribute
-        extra_width = rect.w - self.get_minimum_size(data).x
+        extra_width = rect.w - root.get_cached_minimum_size(self, data).x
         num_elements = len(self.elements)
         if num_elements == 0:
             return
@@ -272,7 +313,7 @@ class HorizontalLM(root.GroupLayoutManager):
 
         # Render each child element
         for element in self.elements:
-            size = element.get_minimum_size(data)
+            size = root.get_cached_minimum_size(element, data)
 
             # Work out the y-coordinates
             if self.vertical_align == HorizontalLM.ALIGN_TOP:
@@ -302,10 +343,11 @@ class HorizontalLM(root.GroupLayoutManager):
                 next_x = x + w + self.margin
 
             # Render and move on.
-            element.render(datatypes.Rectangle(x, y, w, h), data)
+            root.render_element(element, datatypes.Rectangle(x, y, w, h), data)
             x = next_x
 
 
+@root.add_layout_properties(['margin'])
 class EqualColumnsLM(root.GroupLayoutManager):
     """Arranges a set of elements into equally sized columns."""
 
@@ -321,7 +363,7 @@ class EqualColumnsLM(root.GroupLayoutManager):
         for element in self.elements:
             size = (
                 datatypes.Point(0, 0) if element is None
-                else element.get_minimum_size(data)
+                else root.get_cached_minimum_size(element, data)
                 )
             min_height = max(min_height, size.y)
             min_width = max(min_width, size.x)
@@ -337,11 +379,12 @@ class EqualColumnsLM(root.GroupLayoutManager):
         x = rect.x
         for element in self.elements:
             if element is not None:
-                element.render(datatypes.Rectangle(
+                root.render_element(element, datatypes.Rectangle(
                         x, rect.y, col_width, rect.h
                         ), data)
             x += col_width + self.margin
 
+@root.add_layout_properties(['margin'])
 class EqualRowsLM(root.GroupLayoutManager):
     """Arranges a set of elements into equally sized rows."""
     def __init__(self, margin=0, elements=[]):
@@ -356,7 +399,7 @@ class EqualRowsLM(root.GroupLayoutManager):
         for element in self.elements:
             size = (
                 datatypes.Point(0, 0) if element is None
-                else element.get_minimum_size(data)
+                else root.get_cached_minimum_size(element, data)
                 )
             min_height = max(min_height, size.y)
             min_width = max(min_width, size.x)
@@ -372,7 +415,7 @@ class EqualRowsLM(root.GroupLayoutManager):
         y = rect.y
         for element in reversed(self.elements):
             if element is not None:
-                element.render(datatypes.Rectangle(
+                root.render_element(element, datatypes.Rectangle(
                         rect.x, y, rect.w, row_height
                         ), data)
             y += row_height + self.margin
@@ -1,6 +1,7 @@
 from layout import datatypes
 from . import root
 
+@root.add_layout_properties(['size', 'element'])
 class FixedSizeLM(root.LayoutManager):
     """
     A layout manager that always renders its children at a specific
@@ -27,7 +28,7 @@ class FixedSizeLM(root.LayoutManager):
             rectangle.x, rectangle.y,
             self.size.x, self.size.y
             )
-        self.element.render(rect, data)
+        root.render_element(self.element, rect, data)
 
 class AbsolutePositionLM(root.LayoutManager):
     """
@@ -47,6 +48,8 @@ class AbsolutePositionLM(root.LayoutManager):
         """Sets the position of the given element. The same element
         can be added multiple times in different positions."""
         self.elements.append((element, rect))
+        self._adopt(element)
+        self.invalidate()
 
     def get_minimum_size(self):
         # To calculate this, we simply find its farthest right and
@@ -60,4 +63,4 @@ class AbsolutePositionLM(root.LayoutManager):
 
     def render(self, rectangle, data):
         for item, rect in self.elements:
-            item.render(rect, data)
+            root.render_element(item, rect, data)
@@ -0,0 +1,101 @@
+import weakref
+
+from layout import datatypes
+from . import root
+
+@root.add_layout_properties(['element', 'key'])
+class CachedFormLM(root.LayoutManager):
+    """
+    A layout manager that draws its child element once, into a form
+    stored by the output, such as a PDF form XObject, and then only
+    places that form each time it is rendered at the same size. A
+    letterhead repeated on thousands of pages is then laid out, drawn
+    and stored in the document only once.
+
+    Forms are kept by the output target, so can be shared across pages,
+    and by different managers holding the same element. The form is
+    drawn again if the element changes, or is rendered at a different
+    size. Forms are keyed by a weak reference to the element, so they
+    don't keep it alive, and are forgotten by the output once the
+    element is freed, or has changed, so they can be freed in turn.
+    Outputs that can't store forms draw the element each time, as
+    normal. If the element raises an error while it is being drawn into
+    a form, the form is discarded.
+
+    Anything the element draws outside the rectangle it is given is
+    clipped to it, so this shouldn't hold elements that are meant to
+    overlap their surroundings, such as those in
+    :mod:`~layout.managers.jitter`.
+    """
+    def __init__(self, element=None, key=None):
+        """
+        Arguments:
+
+        ``element``
+            The element to draw into the form.
+
+        ``key``
+            An optional hashable value naming the element's content.
+            By default forms are shared by renders of the same element,
+            but this allows separate elements that are known to draw
+            the same thing, such as ones built afresh for each page, to
+            share a form. Changes to the element are then not noticed.
+        """
+        super(CachedFormLM, self).__init__()
+        self.element = element
+        self.key = key
+
+    def _mark_changed(self):
+        super(CachedFormLM, self)._mark_changed()
+        # Forms of the element as it was won't be drawn again.
+        for output_ref, key in getattr(self, '_stored_forms', ()):
+            c = output_ref()
+            if c is not None:
+                c.forget_form(key)
+        # The outputs, held weakly, and keys of the forms stored of
+        # our element, when not given a key.
+        self._stored_forms = []
+
+    def get_minimum_size(self, data):
+        return root.get_cached_minimum_size(self.element, data)
+
+    def get_height_for_width(self, width, data):
+        return root.get_height_for_width(self.element, width, data)
+
+    def _get_form_key(self, rect, c):
+        """The key of the form holding the element at the size of the
+        given rectangle, in the given output."""
+        if self.key is not None:
+            return (self.key, rect.w, rect.h)
+
+        output_ref = weakref.ref(c)
+        def forget(element_ref):
+            # The element has been freed, so its form can be too.
+            output = output_ref()
+            if output is not None:
+                output.forget_form(key)
+        version = getattr(self.element, '_layout_version', 0)
+        key = (weakref.ref(self.element, forget), version, rect.w, rect.h)
+        return key
+
+    def render(self, rect, data):
+        c = data['output']
+        key = self._get_form_key(rect, c)
+        if not c.has_form(key):
+            if not c.begin_form(key, rect.w, rect.h):
+                root.render_element(self.element, rect, data)
+                return
+            try:
+                root.render_element(
+                    self.element,
+                    datatypes.Rectangle(0, 0, rect.w, rect.h), data
+                    )
+            except BaseException:
+                c.discard_form()
+                raise
+            c.end_form()
+            if self.key is None:
+                self._stored_forms.append((weakref.ref(c), key))
+        with c:
+            c.translate(rect.x, rect.y)
+            c.draw_form(key)
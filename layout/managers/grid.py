@@ -1,7 +1,10 @@
+import array
+import itertools
 import math
 from layout import datatypes
 from . import root
 
+@root.add_layout_properties(['rows', 'cols', 'margin'])
 class SimpleGridLM(root.GroupLayoutManager):
     """
     A simple grid takes a number of elements and arranges them
@@ -45,13 +48,16 @@ class SimpleGridLM(root.GroupLayoutManager):
                     return
                 element = self.elements[element_index]
                 if not element: continue
-                element.render(datatypes.Rectangle(
+                root.render_element(element, datatypes.Rectangle(
                         rectangle.x + col*(cell_width + self.margin),
                         rectangle.y + rectangle.h -
                             (row+1)*(cell_height) - row*self.margin,
                         cell_width, cell_height
                         ), data)
 
+@root.add_layout_properties([
+    'margin', 'outside_margin', 'scaling_row', 'scaling_col'
+    ])
 class GridLM(root.LayoutManager):
     """
     Lays out elements in a grid with flexible sized rows and columns.
@@ -82,6 +88,8 @@ class GridLM(root.LayoutManager):
 
         # Add the raw element record
         self.elements.append((col, row, cols, rows, element))
+        self._adopt(element)
+        self.invalidate()
 
     def add_rule(self, start_col, start_row, end_col, end_row,
                  width=0.5, color=(0,0,0)):
@@ -94,6 +102,7 @@ class GridLM(root.LayoutManager):
         self.rules.append(
             (start_col, start_row, end_col, end_row, width, color)
             )
+        self.invalidate()
 
     def _compile_dimension_size(self, base_index, array,
                                 property, sized_elements):
@@ -123,7 +132,10 @@ class GridLM(root.LayoutManager):
         # Gat a list of elements with their sizes, so we don't have to
         # recalculate that each time.
         sized_elements = [
-            (col, row, cols, rows, element, element.get_minimum_size(data))
+            (
+                col, row, cols, rows, element,
+                root.get_cached_minimum_size(element, data)
+            )
             for col, row, cols, rows, element in self.elements
             ]
 
@@ -140,34 +152,64 @@ class GridLM(root.LayoutManager):
             sum(self.row_heights) + (self.rows-1)*self.margin + om
             )
 
+    def _distribute(self, sizes, extra, scaling_index):
+        """Returns the given row heights or column widths with the
+        extra space added, either to the scaling row or column, or
+        spread equally."""
+        if scaling_index is None or not 0 <= scaling_index < len(sizes):
+            extra_each = extra / float(len(sizes))
+            return [size + extra_each for size in sizes]
+        else:
+            sizes = sizes[:]
+            sizes[scaling_index] += extra
+            return sizes
+
+    def _get_row_heights(self, col_widths, data):
+        """Finds the height of each row when the columns have the given
+        widths, from the height each element needs at its width."""
+        sized_elements = []
+        for col, row, cols, rows, element in self.elements:
+            width = sum(col_widths[col:col+cols]) + (cols-1)*self.margin
+            sized_elements.append((
+                col, row, cols, rows, element, datatypes.Point(
+                    width, root.get_height_for_width(element, width, data)
+                    )
+                ))
+        row_heights = [0] * self.rows
+        self._compile_dimension_size(1, row_heights, 'y', sized_elements)
+        return row_heights
+
+    def get_height_for_width(self, width, data):
+        """Finds the height of the grid when the columns are stretched
+        to fill the given width."""
+        size = self.get_minimum_size(data)
+        col_widths = self._distribute(
+            self.col_widths, width - size.x, self.scaling_col
+            )
+        row_heights = self._get_row_heights(col_widths, data)
+        return (
+            sum(row_heights) + (self.rows-1)*self.margin +
+            2*self.outside_margin
+            )
+
     def render(self, rect, data):
         """Draws the cells in grid."""
         size = self.get_minimum_size(data)
 
-        # Find how much extra space we have.
-        extra_width = rect.w - size.x
-        extra_height = rect.h - size.y
-
-        # Distribute the extra space into the correct rows and columns.
-        if self.scaling_col is None or not 0 <= self.scaling_col < self.cols:
-            width_per_col = extra_width / float(self.cols)
-            col_widths = [
-                width + width_per_col
-                for width in self.col_widths
-                ]
-        else:
-            col_widths = self.col_widths[:]
-            col_widths[self.scaling_col] += extra_width
-
-        if self.scaling_row is None or not 0 <= self.scaling_row < self.rows:
-            height_per_row = extra_height / float(self.rows)
-            row_heights = [
-                height + height_per_row
-                for height in self.row_heights
-                ]
-        else:
-            row_heights = self.row_heights[:]
-            row_heights[self.scaling_row] += extra_height
+        # Distribute the extra width into the correct columns, then
+        # find the height each row needs at those widths, and
+        # distribute the extra height into the correct rows.
+        col_widths = self._distribute(
+            self.col_widths, rect.w - size.x, self.scaling_col
+            )
+        row_heights = self._get_row_heights(col_widths, data)
+        extra_height = rect.h - (
+            sum(row_heights) + (self.rows-1)*self.margin +
+            2*self.outside_margin
+            )
+        row_heights = self._distribute(
+            row_heights, extra_height, self.scaling_row
+            )
 
         # Find the (start, end) positions of each row and column.
         col_xs = []
@@ -187,7 +229,7 @@ class GridLM(root.LayoutManager):
             y_start = row_ys[row][0]
             x_end = col_xs[col+cols-1][1]
             y_end = row_ys[row+rows-1][1]
-            element.render(datatypes.Rectangle(
+            root.render_element(element, datatypes.Rectangle(
                 x_start, y_end, x_end-x_start, y_start-y_end
                 ), data)
 
@@ -206,13 +248,18 @@ class GridLM(root.LayoutManager):
                 # Otherwise it is the blend of a start and end.
                 return (array[index-1][1] + array[index][0])*0.5
 
-        for start_col, start_row, end_col, end_row, width, color in self.rules:
-            x_start = _get_value(col_xs, start_col, 1)
-            y_start = _get_value(row_ys, start_row, -1)
-            x_end = _get_value(col_xs, end_col, 1)
-            y_end = _get_value(row_ys, end_row, -1)
-            data['output'].line(
-                x_start, y_start, x_end, y_end,
-                stroke=color,
-                stroke_width=width
+        # Consecutive rules of the same style are drawn together.
+        for (width, color), rules in itertools.groupby(
+                self.rules, key=lambda rule: rule[4:]
+                ):
+            coords = array.array('d')
+            for start_col, start_row, end_col, end_row, _, _ in rules:
+                coords.extend((
+                    _get_value(col_xs, start_col, 1),
+                    _get_value(row_ys, start_row, -1),
+                    _get_value(col_xs, end_col, 1),
+                    _get_value(row_ys, end_row, -1)
+                    ))
+            data['output'].draw_lines(
+                coords, stroke=color, stroke_width=width
                 )
@@ -1,8 +1,138 @@
+import array
+import hashlib
 import random
 import math
 from layout import datatypes
 from . import root
 
+try:
+    import numpy
+except ImportError:
+    # Batches of jitters are calculated one at a time instead.
+    numpy = None
+
+# Constants of the SplitMix64 generator, whose nth number can be
+# calculated directly from the seed.
+_MASK = 0xFFFFFFFFFFFFFFFF
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+_MIX_1 = 0xBF58476D1CE4E5B9
+_MIX_2 = 0x94D049BB133111EB
+
+# Converts 53 random bits into a float in [0, 1).
+_UNIT = 2.0 ** -53
+
+def _get_seed_value(seed):
+    """Returns a 64-bit integer from the given seed, which is the same
+    in every process, unlike the built-in hash of a string."""
+    if isinstance(seed, int):
+        return seed & _MASK
+    digest = hashlib.sha256(repr(seed).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def _get_uniform(seed_value, index):
+    """Returns the random number in [0, 1) with the given index in the
+    stream with the given seed value."""
+    z = (seed_value + (index + 1) * _GOLDEN_GAMMA) & _MASK
+    z = ((z ^ (z >> 30)) * _MIX_1) & _MASK
+    z = ((z ^ (z >> 27)) * _MIX_2) & _MASK
+    z ^= z >> 31
+    return (z >> 11) * _UNIT
+
+def _get_uniforms(seed_value, start, count):
+    """Returns a NumPy array of the given number of random numbers
+    from the given index on, equal to those from
+    :func:`_get_uniform`."""
+    uint = numpy.uint64
+    z = numpy.arange(start + 1, start + count + 1, dtype=uint)
+    with numpy.errstate(over='ignore'):
+        z = z * uint(_GOLDEN_GAMMA) + uint(seed_value)
+        z = (z ^ (z >> uint(30))) * uint(_MIX_1)
+        z = (z ^ (z >> uint(27))) * uint(_MIX_2)
+    z ^= z >> uint(31)
+    return (z >> uint(11)).astype(numpy.float64) * _UNIT
+
+class JitterStream:
+    """
+    A reproducible source of random jitters, binomially distributed
+    around 0 with half-sizes equal to the given maximums, as chosen by
+    :class:`RandomJitterLM`.
+
+    The seed can be any integer, string, or tuple of them, such as a
+    document's seed followed by the path to an element in the tree.
+    Each jitter depends only on the seed and its index, so the same
+    jitters are given in every run and every process, and they can be
+    calculated in any order, or thousands at once with
+    :meth:`get_jitters`. This makes jittered layouts safe to cache and
+    to render in parallel.
+    """
+    def __init__(self, seed,
+                 max_angle_jitter=0.1, max_x_jitter=5.0, max_y_jitter=5.0):
+        self.seed = seed
+        self.max_angle_jitter = max_angle_jitter
+        self.max_x_jitter = max_x_jitter
+        self.max_y_jitter = max_y_jitter
+        self._seed_value = _get_seed_value(seed)
+
+    def get_jitter(self, index):
+        """Returns the (angle, x, y) jitter with the given index."""
+        u = [
+            _get_uniform(self._seed_value, index*6 + offset)
+            for offset in range(6)
+            ]
+        return (
+            (u[0] - u[1]) * self.max_angle_jitter,
+            (u[2] - u[3]) * self.max_x_jitter,
+            (u[4] - u[5]) * self.max_y_jitter
+            )
+
+    def get_jitters(self, count, start=0):
+        """
+        Returns the angles, x offsets and y offsets of the given
+        number of jitters, from the given index on, as three arrays.
+
+        If NumPy is installed they are NumPy arrays, calculated in one
+        vectorized batch, otherwise they are ``array.array`` objects.
+        The values are the same either way, and the same as those
+        from :meth:`get_jitter`.
+        """
+        if numpy is None:
+            angles, xs, ys = [array.array('d') for _ in range(3)]
+            for index in range(start, start + count):
+                angle, x, y = self.get_jitter(index)
+                angles.append(angle)
+                xs.append(x)
+                ys.append(y)
+            return angles, xs, ys
+
+        u = _get_uniforms(
+            self._seed_value, start*6, count*6
+            ).reshape(count, 3, 2)
+        jitters = (u[:, :, 0] - u[:, :, 1]) * numpy.array([
+            self.max_angle_jitter, self.max_x_jitter, self.max_y_jitter
+            ])
+        return jitters[:, 0], jitters[:, 1], jitters[:, 2]
+
+def jitter_elements(elements, seed,
+                    max_angle_jitter=0.1, max_x_jitter=5.0,
+                    max_y_jitter=5.0):
+    """
+    Returns a :class:`JitterLM` holding each of the given elements,
+    jittered by the jitter with the same index in a
+    :class:`JitterStream` with the given seed and maximums. The jitters
+    are calculated in one batch, so this is quicker than making a
+    :class:`RandomJitterLM` for each element.
+    """
+    elements = list(elements)
+    stream = JitterStream(
+        seed, max_angle_jitter, max_x_jitter, max_y_jitter
+        )
+    return [
+        JitterLM(float(angle), float(x), float(y), element)
+        for element, angle, x, y in zip(
+            elements, *stream.get_jitters(len(elements))
+            )
+        ]
+
 class _JitterBase(root.LayoutManager):
     def _render_jittered(
         self, rectangle, data, angle_jitter, x_jitter, y_jitter
@@ -12,13 +142,17 @@ class _JitterBase(root.LayoutManager):
             c.translate(rectangle.center, rectangle.middle)
             c.translate(x_jitter, y_jitter)
             c.rotate(angle_jitter * 180.0 / math.pi)
-            self.element.render(
+            root.render_element(
+                self.element,
                 datatypes.Rectangle(
                     -rectangle.w*0.5, -rectangle.h*0.5,
                     rectangle.w, rectangle.h
                     ), data
                 )
 
+@root.add_layout_properties([
+    'angle_jitter', 'x_jitter', 'y_jitter', 'element'
+    ])
 class JitterLM(_JitterBase):
     """
     Displays its managed element slightly offset from its reserved space.
@@ -40,33 +174,65 @@ class JitterLM(_JitterBase):
         self.y_jitter = y_jitter
 
     def get_minimum_size(self, data):
-        return self.element.get_minimum_size(data)
+        return root.get_cached_minimum_size(self.element, data)
 
     def render(self, rectangle, data):
         self._render_jittered(
             rectangle, data, self.angle_jitter, self.x_jitter, self.y_jitter
             )
 
+@root.add_layout_properties([
+    'max_angle_jitter', 'max_x_jitter', 'max_y_jitter', 'element', 'seed'
+    ])
 class UnstableRandomJitterLM(_JitterBase):
     """
     A random jitter layout manager that does rerandomize its offsets
     each time it is called to render. Rendering the tree twice, therefore,
     may lead to different results.
+
+    If a ``seed`` is given, the offsets come from a
+    :class:`JitterStream` instead, seeded with the seed and the index
+    of the page being rendered (the data object's 'page_index' value).
+    Each time the manager is rendered on a page it takes the next
+    jitter in the page's stream, counted in the data object's
+    'jitter_indices' value. Each page is then jittered the same way
+    however many other pages are rendered before it, so pages can be
+    selected or rendered in parallel, while an element that appears
+    many times in the tree is still jittered differently each time.
     """
     def __init__(
         self,
         max_angle_jitter=0.1, max_x_jitter=5.0, max_y_jitter=5.0,
-        element=None
+        element=None, seed=None
         ):
         self.max_angle_jitter = max_angle_jitter
         self.max_x_jitter = max_x_jitter
         self.max_y_jitter = max_y_jitter
         self.element = element
+        self.seed = seed
 
     def get_minimum_size(self, data):
-        return self.element.get_minimum_size(data)
+        return root.get_cached_minimum_size(self.element, data)
+
+    def _get_next_jitter(self, data):
+        """Returns the next jitter in our stream for the current
+        page."""
+        page_index = data.get('page_index', 0)
+        indices = data.setdefault('jitter_indices', {})
+        # Only the count on the current page is kept.
+        counted_page, index = indices.get(self, (page_index, 0))
+        if counted_page != page_index:
+            index = 0
+        indices[self] = (page_index, index + 1)
+        return JitterStream(
+            (self.seed, page_index),
+            self.max_angle_jitter, self.max_x_jitter, self.max_y_jitter
+            ).get_jitter(index)
 
     def render(self, rect, data):
+        if self.seed is not None:
+            self._render_jittered(rect, data, *self._get_next_jitter(data))
+            return
         self._render_jittered(
             rect, data,
             (random.random()-random.random())*self.max_angle_jitter,
@@ -84,18 +250,28 @@ class RandomJitterLM(JitterLM):
     its offset each time it is called on to draw its content, only when
     it is constructed. The jitter is therefore consistent for the lifetime
     of an instance of this class.
+
+    If a ``seed`` is given, the jitter is the first from a
+    :class:`JitterStream` with that seed, so is the same each time the
+    layout is built. Use :func:`jitter_elements` to jitter many
+    elements at once.
     """
     def __init__(
         self,
         max_angle_jitter=0.1, max_x_jitter=5.0, max_y_jitter=5.0,
-        element=None
+        element=None, seed=None
         ):
-        super(RandomJitterLM, self).__init__(
-            (random.random()-random.random())*max_angle_jitter,
-            (random.random()-random.random())*max_x_jitter,
-            (random.random()-random.random())*max_y_jitter,
-            element
-            )
+        if seed is None:
+            jitter = (
+                (random.random()-random.random())*max_angle_jitter,
+                (random.random()-random.random())*max_x_jitter,
+                (random.random()-random.random())*max_y_jitter
+                )
+        else:
+            jitter = JitterStream(
+                seed, max_angle_jitter, max_x_jitter, max_y_jitter
+                ).get_jitter(0)
+        super(RandomJitterLM, self).__init__(*jitter, element=element)
 
 
 
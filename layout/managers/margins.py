@@ -2,6 +2,7 @@ from layout import datatypes
 from . import root
 
 @root.add_fields('_margins', ['top', 'right', 'bottom', 'left'])
+@root.add_layout_properties(['element'])
 class MarginsLM(root.LayoutManager):
     """
     A layout manager that has only one element, surrounded by the given
@@ -12,20 +13,21 @@ class MarginsLM(root.LayoutManager):
         self.element = element
 
     def get_minimum_size(self, data):
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
         return datatypes.Point(
             size.x + self.right + self.left,
             size.y + self.top + self.bottom
             )
 
     def render(self, rect, data):
-        self.element.render(datatypes.Rectangle(
+        root.render_element(self.element, datatypes.Rectangle(
             rect.x + self.left, rect.y + self.bottom,
             rect.w - self.left - self.right,
             rect.h - self.bottom - self.top
             ), data)
 
 @root.add_fields('_margins', ['top', 'right', 'bottom', 'left'])
+@root.add_layout_properties(['element'])
 class ProportionalMarginsLM(root.LayoutManager):
     """
     A layout manager that has only one element, surrounded by the given
@@ -51,14 +53,14 @@ class ProportionalMarginsLM(root.LayoutManager):
         height_scale = 1.0 - top - bottom
 
         # We divide the child element's size by these values.
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
         return datatypes.Point(
             size.x / width_scale,
             size.y / height_scale
             )
 
     def render(self, rect, data):
-        self.element.render(datatypes.Rectangle(
+        root.render_element(self.element, datatypes.Rectangle(
             rect.x + rect.w * self.left,
             rect.y + rect.h * self.bottom,
             rect.w * (1.0 - self.left - self.right),
@@ -93,6 +95,7 @@ class VanDeGraafCanonLM(ProportionalMarginsLM):
                 )
 
 @root.add_fields('_margins', ['top', 'right', 'bottom', 'left', 'width', 'height'])
+@root.add_layout_properties(['element'])
 class PaddedMarginsLM(root.LayoutManager):
     """
     A layout manager that surrounds its single element by margins
@@ -117,16 +120,16 @@ class PaddedMarginsLM(root.LayoutManager):
 
     def get_minimum_size(self, data):
         """Our minimum size is simply our element's minimum size."""
-        return self.element.get_minimum_size(data)
+        return root.get_cached_minimum_size(self.element, data)
 
     def render(self, rect, data):
         if self.element is None: return
 
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
         extra_width = max(0, rect.w - size.x)
         extra_height = max(0, rect.h - size.y)
 
-        self.element.render(datatypes.Rectangle(
+        root.render_element(self.element, datatypes.Rectangle(
                 rect.x + self._margins[3]*extra_width,
                 rect.y + self._margins[2]*extra_height,
                 rect.w - extra_width,
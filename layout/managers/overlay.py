@@ -21,4 +21,4 @@ class OverlayLM(root.GroupLayoutManager):
 
     def render(self, rect, data):
         for element in self.elements:
-            element.render(rect, data)
+            root.render_element(element, rect, data)
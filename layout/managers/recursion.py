@@ -1,6 +1,10 @@
 from layout import datatypes
 from . import root
+from . import transform
 
+@root.add_layout_properties([
+    'recursion_limit', 'element', 'size_limit', 'placeholder'
+    ])
 class RecursionStopperLM(root.LayoutManager):
     """
     Because you can arrange the layout tree in any way you choose,
@@ -21,12 +25,52 @@ class RecursionStopperLM(root.LayoutManager):
     the value after you've run the layout (if you want to render again
     using the same data object, for example). But you shouldn't mess with
     that value yourself.
+
+    The minimum size of the elements inside the loop depends on how deep
+    the recursion has got, so this class never has its size cached, and
+    each level of recursion measures its contents with a fresh
+    'minimum_size_cache' and 'height_for_width_cache', without
+    retaining any sizes between passes
+    (see :func:`layout.managers.root.get_cached_minimum_size`).
+
+    Loops that shrink their contents at each level, with the managers
+    in :mod:`~layout.managers.transform`, can also be stopped once
+    they are too small to see, by giving a ``size_limit``. Levels whose
+    rectangle is smaller than this on the page (see
+    :func:`layout.managers.transform.get_output_scale`) aren't
+    rendered, so the cost of rendering depends on how small the levels
+    can be seen, rather than on the recursion limit, which can then be
+    set high. It still limits measuring.
     """
-    def __init__(self, recursion_limit=2, element=None):
+    cache_minimum_size = False
+
+    def __init__(self, recursion_limit=2, element=None,
+                 size_limit=None, placeholder=None):
+        """
+        Arguments:
+
+        ``recursion_limit``
+            The number of times the loop can pass through this manager.
+
+        ``element``
+            The element in the loop.
+
+        ``size_limit``
+            If given, the element isn't rendered when both the width
+            and height of its rectangle on the page are less than this.
+
+        ``placeholder``
+            An element to render in place of the element when it is
+            smaller than the ``size_limit``, such as a
+            :class:`layout.elements.lines.Border` filled with the
+            element's average color. By default nothing is rendered.
+        """
         self.recursion_limit = recursion_limit
         self.element = element
+        self.size_limit = size_limit
+        self.placeholder = placeholder
 
-    def _do_recursion(self, data, method_name, default_return, *args):
+    def _do_recursion(self, data, function, default_return, *args):
         # Make sure we've got our data
         if 'recursion_stopper_count' not in data:
             data['recursion_stopper_count'] = {}
@@ -38,16 +82,48 @@ class RecursionStopperLM(root.LayoutManager):
         if counts[self] >= self.recursion_limit:
             return default_return
 
+        # Sizes measured at one depth aren't valid at another, so they
+        # can't be shared with the outer level or retained.
+        outer_cache = data.get('minimum_size_cache')
+        if outer_cache is not None:
+            data['minimum_size_cache'] = {}
+        outer_heights = data.get('height_for_width_cache')
+        if outer_heights is not None:
+            data['height_for_width_cache'] = {}
+        outer_retain = data.get('retain_minimum_sizes')
+        if outer_retain:
+            data['retain_minimum_sizes'] = False
+
         try:
             # Increment our count and recurse
             counts[self] += 1
-            return getattr(self.element, method_name)(*args)
+            return function(self.element, *args)
         finally:
             # Clean up regardless of what happened
             counts[self] -= 1
+            if outer_cache is not None:
+                data['minimum_size_cache'] = outer_cache
+            if outer_heights is not None:
+                data['height_for_width_cache'] = outer_heights
+            if outer_retain:
+                data['retain_minimum_sizes'] = outer_retain
 
     def get_minimum_size(self, data):
-        self._do_recursion(data, 'get_minimum_size', datatypes.Point(), data)
+        return self._do_recursion(
+            data, root.get_cached_minimum_size, datatypes.Point(), data
+            )
+
+    def _is_too_small(self, rect, data):
+        """Is the given rectangle smaller than the size limit on the
+        page?"""
+        if self.size_limit is None:
+            return False
+        scale = transform.get_output_scale(data)
+        return max(rect.w, rect.h) * scale < self.size_limit
 
     def render(self, rect, data):
-        self._do_recursion(data, 'render', None, rect, data)
+        if self._is_too_small(rect, data):
+            if self.placeholder is not None:
+                root.render_element(self.placeholder, rect, data)
+            return
+        self._do_recursion(data, root.render_element, None, rect, data)
@@ -1,11 +1,30 @@
 from layout import datatypes
+from layout.datatypes import output
+import collections
 import typing
+import weakref
+import math
 import abc
 
 class LayoutElement(abc.ABC):
     """
     A layout element has size data and can be asked to draw itself.
     """
+    #: Can the minimum size of this element be remembered for the rest
+    #: of a render pass? Elements whose size can change part way
+    #: through a pass should set this to False.
+    cache_minimum_size = True
+
+    # Incremented each time this element, or anything inside it, changes.
+    _layout_version = 0
+
+    # The size retained between render passes, as a (measure key,
+    # size) tuple, or None if the element has changed since.
+    _retained_minimum_size = None
+
+    # The managers that contain this element, held weakly.
+    _layout_parents = None
+
     @abc.abstractmethod
     def get_minimum_size(self, data) -> datatypes.Point:
         """How small can the element be? Should return a Point."""
@@ -16,6 +35,50 @@ class LayoutElement(abc.ABC):
         """Asks the element to render itself."""
         pass
 
+    def get_height_for_width(self, width:float, data) -> float:
+        """
+        How tall does the element need to be, if it is given the
+        width? By default this is its minimum height. Elements that
+        reflow to fit their width, such as paragraphs of text, and
+        managers that contain them, override this.
+        """
+        return get_cached_minimum_size(self, data).y
+
+    def invalidate(self) -> None:
+        """
+        Marks this element as changed, along with every manager that
+        contains it, all the way to the root of the tree. Their
+        retained sizes are discarded, so the next render pass measures
+        them again, while the rest of the tree keeps its sizes.
+
+        Properties, ``add_element`` methods and the fields created by
+        :func:`add_fields` call this for you. If you change an element
+        some other way (by editing a manager's ``elements`` list
+        directly, for example), call it yourself.
+        """
+        seen = set()
+        pending = [self]
+        while pending:
+            element = pending.pop()
+            if element in seen: continue
+            seen.add(element)
+            element._mark_changed()
+            if element._layout_parents:
+                pending.extend(element._layout_parents)
+
+    def _mark_changed(self):
+        """Discards anything calculated from this element's content."""
+        self._layout_version += 1
+        self._retained_minimum_size = None
+
+    def _adopt(self, element):
+        """Records that the given element is now contained in this
+        one, so changes to it are passed up to us."""
+        if not isinstance(element, LayoutElement): return
+        if element._layout_parents is None:
+            element._layout_parents = weakref.WeakSet()
+        element._layout_parents.add(self)
+
 class LayoutManager(LayoutElement):
     """
     Layout managers position and size content to fit some container,
@@ -23,14 +86,298 @@ class LayoutManager(LayoutElement):
     clearer naming when used as a parent class.
     """
 
+def get_cached_minimum_size(element, data):
+    """
+    Returns the minimum size of the given element, measuring it at
+    most once per render pass.
+
+    Layout managers call this rather than calling
+    ``get_minimum_size`` on their children directly. The sizes are
+    held in the data object, in a dictionary called
+    'minimum_size_cache', which the ``render_to_*`` helper functions
+    create at the start of each pass. If the data object has no cache,
+    or the element has opted out by setting ``cache_minimum_size`` to
+    False, the element is measured as normal.
+
+    If the data object's 'retain_minimum_sizes' value is true, sizes
+    are also kept on the elements themselves between passes, until
+    :meth:`LayoutElement.invalidate` is called. A later pass with an
+    output that measures text the same way (see
+    :func:`layout.datatypes.output.get_measure_key`) then only measures
+    the parts of the tree that have changed.
+    """
+    if not getattr(element, 'cache_minimum_size', True):
+        return element.get_minimum_size(data)
+    try:
+        cache = data['minimum_size_cache']
+    except (KeyError, TypeError):
+        return element.get_minimum_size(data)
+
+    size = cache.get(element)
+    if size is None:
+        retain = (
+            data.get('retain_minimum_sizes') and
+            isinstance(element, LayoutElement)
+            )
+        if retain:
+            measure_key = output.get_measure_key(data.get('output'))
+            retained = element._retained_minimum_size
+            if retained is not None and retained[0] == measure_key:
+                size = retained[1]
+        if size is None:
+            size = element.get_minimum_size(data)
+            if retain:
+                element._retained_minimum_size = (measure_key, size)
+        cache[element] = size
+    return size
+
+def get_height_for_width(element, width, data):
+    """
+    Returns the height the given element needs if it is given the
+    width. Layout managers call this rather than calling
+    ``get_height_for_width`` on their children directly, as elements
+    that are not :class:`LayoutElement` subclasses might not have it.
+
+    As with :func:`get_cached_minimum_size`, each element is measured
+    at most once per render pass for each width. The heights are held
+    in the data object, in a dictionary called 'height_for_width_cache',
+    keyed by the element and the width, which the ``render_to_*``
+    helper functions create at the start of each pass.
+    """
+    try:
+        get_height = element.get_height_for_width
+    except AttributeError:
+        return get_cached_minimum_size(element, data).y
+    if not getattr(element, 'cache_minimum_size', True):
+        return get_height(width, data)
+    try:
+        cache = data['height_for_width_cache']
+    except (KeyError, TypeError):
+        return get_height(width, data)
+
+    key = (element, width)
+    height = cache.get(key)
+    if height is None:
+        height = cache[key] = get_height(width, data)
+    return height
+
+def render_element(element, rectangle, data):
+    """
+    Asks the given element to render itself in the given rectangle.
+
+    Layout managers call this rather than calling ``render`` on their
+    children directly, so that :func:`arrange` can record where each
+    element was placed.
+    """
+    recorder = data.get('frame_recorder') if data is not None else None
+    if recorder is None:
+        element.render(rectangle, data)
+        return
+
+    recorder.begin_frame(element, rectangle)
+    try:
+        element.render(rectangle, data)
+    finally:
+        recorder.end_frame()
+
+class Frame(collections.namedtuple(
+        'Frame', ('element', 'rectangle', 'transform', 'content')
+        )):
+    """
+    The arranged geometry of one element in a layout tree, as returned
+    by :func:`arrange`.
+
+    ``element``
+        The element that was arranged.
+
+    ``rectangle``
+        The rectangle the element was given, in its own coordinates.
+
+    ``transform``
+        The (a, b, c, d, e, f) affine matrix that maps the element's
+        coordinates onto the page, with x' = ax + cy + e and
+        y' = bx + dy + f.
+
+    ``content``
+        A tuple of what the element output, in order. Each item is
+        either the :class:`Frame` of a child element, or an
+        ``(output_method_name, args, kwargs)`` tuple for something the
+        element drew itself, with ``kwargs`` as a tuple of pairs.
+
+    Frames can be given to the ``render_to_*`` helper functions in
+    place of a layout manager. They always paint where they were
+    arranged, so the rectangle they are given is ignored.
+    """
+    __slots__ = ()
+
+    def get_minimum_size(self, data):
+        return datatypes.Point(self.rectangle.w, self.rectangle.h)
+
+    def render(self, rectangle, data):
+        paint(self, data['output'])
+
+    def iter_frames(self):
+        """Yields this frame and all the frames inside it, parents
+        before their children."""
+        pending = [self]
+        while pending:
+            frame = pending.pop()
+            yield frame
+            pending.extend(reversed([
+                item for item in frame.content if isinstance(item, Frame)
+                ]))
+
+_IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+def _multiply(m, n):
+    """Returns the affine matrix that applies n and then m."""
+    a, b, c, d, e, f = m
+    na, nb, nc, nd, ne, nf = n
+    return (
+        a*na + c*nb, b*na + d*nb,
+        a*nc + c*nd, b*nc + d*nd,
+        a*ne + c*nf + e, b*ne + d*nf + f
+        )
+
+class _FrameRecorder(output.OutputTarget):
+    """
+    An output target that builds a frame tree rather than drawing. Text
+    is measured by the output target it wraps.
+    """
+    def __init__(self, measure_output):
+        self.measure_output = measure_output
+        self.transform = _IDENTITY
+        self._transform_stack = []
+
+        # Frames under construction, as [element, rectangle, transform,
+        # content] lists. The first collects the finished root frame.
+        self._frame_stack = [[None, None, _IDENTITY, []]]
+
+    def begin_frame(self, element, rectangle):
+        self._frame_stack.append([
+            element, datatypes.Rectangle(*rectangle.get_data()),
+            self.transform, []
+            ])
+
+    def end_frame(self):
+        element, rectangle, transform, content = self._frame_stack.pop()
+        self._frame_stack[-1][3].append(
+            Frame(element, rectangle, transform, tuple(content))
+            )
+
+    def get_root_frame(self):
+        return self._frame_stack[0][3][0]
+
+    def _record(self, method_name, args, kwargs):
+        self._frame_stack[-1][3].append(
+            (method_name, args, tuple(kwargs.items()))
+            )
+
+    def _save_state(self):
+        self._transform_stack.append(self.transform)
+        self._record('_save_state', (), {})
+
+    def _restore_state(self):
+        self.transform = self._transform_stack.pop()
+        self._record('_restore_state', (), {})
+
+    def translate(self, x, y):
+        self.transform = _multiply(self.transform, (1, 0, 0, 1, x, y))
+        self._record('translate', (x, y), {})
+
+    def scale(self, x, y):
+        self.transform = _multiply(self.transform, (x, 0, 0, y, 0, 0))
+        self._record('scale', (x, y), {})
+
+    def rotate(self, degrees):
+        radians = degrees * math.pi / 180.0
+        c, s = math.cos(radians), math.sin(radians)
+        self.transform = _multiply(self.transform, (c, s, -s, c, 0, 0))
+        self._record('rotate', (degrees,), {})
+
+    def text_width(self, text, *, font_name, font_size):
+        return self.measure_output.text_width(
+            text, font_name=font_name, font_size=font_size
+            )
+
+    def text_widths(self, strings, *, font_name, font_size):
+        return self.measure_output.text_widths(
+            strings, font_name=font_name, font_size=font_size
+            )
+
+    def draw_text(self, *args, **kwargs):
+        self._record('draw_text', args, kwargs)
+
+    def draw_text_lines(self, *args, **kwargs):
+        self._record('draw_text_lines', args, kwargs)
+
+    def draw_line(self, *args, **kwargs):
+        self._record('draw_line', args, kwargs)
+
+    def draw_rect(self, *args, **kwargs):
+        self._record('draw_rect', args, kwargs)
+
+    def draw_image(self, *args, **kwargs):
+        self._record('draw_image', args, kwargs)
+
+    def draw_polygon(self, *args, **kwargs):
+        self._record('draw_polygon', args, kwargs)
+
+    def draw_lines(self, *args, **kwargs):
+        self._record('draw_lines', args, kwargs)
+
+    def draw_rects(self, *args, **kwargs):
+        self._record('draw_rects', args, kwargs)
+
+    def draw_polygons(self, *args, **kwargs):
+        self._record('draw_polygons', args, kwargs)
+
+    def clip_rect(self, *args, **kwargs):
+        self._record('clip_rect', args, kwargs)
+
+    def end_page(self):
+        self._record('end_page', (), {})
+
+def arrange(element, rectangle, measure_output):
+    """
+    Measures and arranges the given element in the given rectangle,
+    without drawing anything, and returns its :class:`Frame`.
+
+    The ``measure_output`` is only used to measure text, so the
+    resulting frame tree can be painted with :func:`paint` onto any
+    number of output targets, without laying the tree out again.
+    """
+    recorder = _FrameRecorder(measure_output)
+    render_element(element, rectangle, dict(
+        output=recorder,
+        frame_recorder=recorder,
+        minimum_size_cache={},
+        height_for_width_cache={},
+        retain_minimum_sizes=True
+        ))
+    return recorder.get_root_frame()
+
+def paint(frame, output_target):
+    """Draws a :class:`Frame` from :func:`arrange` onto the given
+    output target."""
+    for item in frame.content:
+        if isinstance(item, Frame):
+            paint(item, output_target)
+        else:
+            method_name, args, kwargs = item
+            getattr(output_target, method_name)(*args, **dict(kwargs))
+
 def add_fields(store_name, field_names):
     """
     A class-decorator that creates layout managers with a set of named
-    fields.
+    fields. Setting a field marks the manager as changed.
     """
     def decorate(cls):
         def _add(index, name):
-            def _set_dir(self, value): getattr(self, store_name)[index] = value
+            def _set_dir(self, value):
+                getattr(self, store_name)[index] = value
+                self._adopt(value)
+                self.invalidate()
             def _get_dir(self): return getattr(self, store_name)[index]
             setattr(cls, name, property(_get_dir, _set_dir))
 
@@ -41,16 +388,48 @@ def add_fields(store_name, field_names):
 
     return decorate
 
+def add_layout_properties(field_names):
+    """
+    A class-decorator that turns each of the named attributes into a
+    property, stored in an attribute with a leading underscore. Setting
+    the property marks the element as changed and, if the new value
+    is itself an element, records that it is contained in this one.
+    """
+    def decorate(cls):
+        def _add(name):
+            store_name = '_' + name
+            def _set_field(self, value):
+                setattr(self, store_name, value)
+                self._adopt(value)
+                self.invalidate()
+            def _get_field(self): return getattr(self, store_name)
+            setattr(cls, name, property(_get_field, _set_field))
+
+        for field_name in field_names:
+            _add(field_name)
+
+        return cls
+
+    return decorate
+
 class GroupLayoutManager(LayoutManager):
     """
     A base class for layout managers that can have any number of
     elements.
+
+    Add elements with :meth:`add_element` so the manager knows it has
+    changed. If you edit the ``elements`` list directly, call
+    :meth:`invalidate` afterwards.
     """
     def __init__(self, elements:typing.Sequence[LayoutElement]=[]) -> None:
         self.elements = elements[:]
+        for element in self.elements:
+            self._adopt(element)
 
     def add_element(self, element):
         self.elements.append(element)
+        self._adopt(element)
+        self.invalidate()
 
     def _get_smallest_dimensions(self, data):
         """A utility method to return the minimum size needed to fit
@@ -59,7 +438,7 @@ class GroupLayoutManager(LayoutManager):
         min_height = 0
         for element in self.elements:
             if not element: continue
-            size = element.get_minimum_size(data)
+            size = get_cached_minimum_size(element, data)
             min_width = max(min_width, size.x)
             min_height = max(min_height, size.y)
         return datatypes.Point(min_width, min_height)
@@ -2,6 +2,34 @@ import math
 from layout import datatypes
 from . import root
 
+def get_output_scale(data):
+    """
+    Returns how much the element being rendered is scaled by the
+    :class:`ScaleLM`, :class:`FixedScaleLM` and :class:`FlexScaleLM`
+    managers it is inside: the product of their scales, held in the
+    data object's 'output_scale' value. Sizes in the element's
+    coordinates multiplied by this are their sizes on the page.
+    """
+    try:
+        return data['output_scale']
+    except (KeyError, TypeError):
+        return 1.0
+
+def _render_scaled(element, rect, data, scale):
+    """Renders the given element into the given rectangle, recording
+    that it is scaled by the given amount, once the output has been
+    scaled."""
+    outer_scale = data.get('output_scale')
+    data['output_scale'] = get_output_scale(data) * scale
+    try:
+        root.render_element(element, rect, data)
+    finally:
+        if outer_scale is None:
+            del data['output_scale']
+        else:
+            data['output_scale'] = outer_scale
+
+@root.add_layout_properties(['angle', 'element'])
 class RotateLM(root.LayoutManager):
     """
     A layout manager that holds one element and rotates it by the
@@ -42,7 +70,7 @@ class RotateLM(root.LayoutManager):
 
     def get_minimum_size(self, data):
         """Returns the rotated minimum size."""
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
         if self.angle in (RotateLM.NORMAL, RotateLM.UPSIDE_DOWN):
             return size
         else:
@@ -55,21 +83,24 @@ class RotateLM(root.LayoutManager):
 
         with c:
             if self.angle == RotateLM.NORMAL:
-                self.element.render(rect, data)
+                root.render_element(self.element, rect, data)
             else:
                 c.translate(*rect.cm)
                 c.rotate(self.angle * 90)
 
                 if self.angle == RotateLM.ANGLE_180:
-                    self.element.render(
+                    root.render_element(
+                        self.element,
                         datatypes.Rectangle(-w*0.5, -h*0.5, w, h), data
                         )
                 else:
                     assert (self.angle in (RotateLM.ANGLE_90, RotateLM.ANGLE_270))
-                    self.element.render(
+                    root.render_element(
+                        self.element,
                         datatypes.Rectangle(-h*0.5, -w*0.5, h, w), data
                         )
 
+@root.add_layout_properties(['angle', 'element'])
 class AnyRotationLM(root.LayoutManager):
     """
     A layout manager that allows its child element to be rotated to
@@ -102,7 +133,7 @@ class AnyRotationLM(root.LayoutManager):
         actual size needed to fit the rotated element if the original
         element is not rectangular."""
         return self._calculate_ms_from_base(
-            self.element.get_minimum_size(data)
+            root.get_cached_minimum_size(self.element, data)
             )
 
     def _calculate_ms_from_base(self, size):
@@ -126,7 +157,7 @@ class AnyRotationLM(root.LayoutManager):
 
         # First find the upscale we got going from our element to our
         # rotated minimum size.
-        base_ms = self.element.get_minimum_size(data)
+        base_ms = root.get_cached_minimum_size(self.element, data)
         rotated_ms = self._calculate_ms_from_base(base_ms)
 
         # Find the scale of the rect we're given and the limiting scale
@@ -144,8 +175,12 @@ class AnyRotationLM(root.LayoutManager):
         with c:
             c.translate(center.x, center.y)
             c.rotate(self.angle / math.pi * 180.0)
-            self.element.render(datatypes.Rectangle(-hw, -hh, hw*2.0, hh*2.0), data)
+            root.render_element(
+                self.element,
+                datatypes.Rectangle(-hw, -hh, hw*2.0, hh*2.0), data
+                )
 
+@root.add_layout_properties(['scale', 'element'])
 class FixedScaleLM(root.LayoutManager):
     """
     A layout manager that scales its one element by a fixed amount.
@@ -156,7 +191,7 @@ class FixedScaleLM(root.LayoutManager):
         self.element = element
 
     def get_minimum_size(self, data):
-        child_size = self.element.get_minimum_size(data)
+        child_size = root.get_cached_minimum_size(self.element, data)
         return datatypes.Point(
             child_size.x*self.scale, child_size.y*self.scale
             )
@@ -167,11 +202,13 @@ class FixedScaleLM(root.LayoutManager):
         with c:
             c.translate(rect.x, rect.y)
             c.scale(scale, scale)
-            self.element.render(
-                datatypes.Rectangle(0, 0, rect.x/scale, rect.y/scale),
-                data
+            _render_scaled(
+                self.element,
+                datatypes.Rectangle(0, 0, rect.w/scale, rect.h/scale),
+                data, scale
                 )
 
+@root.add_layout_properties(['element'])
 class ScaleLM(root.LayoutManager):
     """
     A layout manager that holds one element, and scales it down with
@@ -182,10 +219,10 @@ class ScaleLM(root.LayoutManager):
         self.element = element
 
     def get_minimum_size(self, data):
-        return self.element.get_minimum_size(data)
+        return root.get_cached_minimum_size(self.element, data)
 
     def render(self, rect, data):
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
 
         # The object is too big, work out the minimum scaling
         scale = min(
@@ -202,8 +239,12 @@ class ScaleLM(root.LayoutManager):
             c.translate(rect.x+extra_width*0.5, rect.y+extra_height*0.5)
             if scale < 1.0:
                 c.scale(scale, scale)
-            self.element.render(datatypes.Rectangle(0, 0, size.x, size.y), data)
+            _render_scaled(
+                self.element, datatypes.Rectangle(0, 0, size.x, size.y),
+                data, scale
+                )
 
+@root.add_layout_properties(['element'])
 class FlexScaleLM(root.LayoutManager):
     """
     A layout manager that holds one element, and scales it down with
@@ -217,10 +258,10 @@ class FlexScaleLM(root.LayoutManager):
         self.element = element
 
     def get_minimum_size(self, data):
-        return self.element.get_minimum_size(data)
+        return root.get_cached_minimum_size(self.element, data)
 
     def render(self, rect, data):
-        size = self.element.get_minimum_size(data)
+        size = root.get_cached_minimum_size(self.element, data)
         if size.x > rect.w or size.y > rect.h:
             # The object is too big, work out the minimum scaling
             scale = min(
@@ -233,8 +274,8 @@ class FlexScaleLM(root.LayoutManager):
             with c:
                 c.translate(rect.x, rect.y)
                 c.scale(scale, scale)
-                self.element.render(datatypes.Rectangle(
+                _render_scaled(self.element, datatypes.Rectangle(
                         0, 0, rect.w / scale, rect.h / scale
-                        ), data)
+                        ), data, scale)
         else:
-            self.element.render(rect, data)
+            root.render_element(self.element, rect, data)
@@ -0,0 +1,217 @@
+"""This module measures text without a canvas or drawing context, using
+the advance widths of the standard 14 PDF fonts, and of any TrueType
+fonts that are registered with it. This allows a layout to be measured
+before a document is created, or in worker processes that have no
+backend of their own.
+
+The widths match ReportLab's, so a :class:`FontMetrics` can stand in
+for a :class:`layout.rl_utils.ReportlabOutput` when measuring. Pass it
+as the ``metrics`` of an output target to measure with it, or as the
+``measure_output`` of :func:`layout.managers.root.arrange` or
+:class:`layout.recording.RecordingOutput`."""
+
+import array
+import struct
+
+from layout import _standard_font_widths
+
+#: The names of the standard 14 PDF fonts.
+STANDARD_FONTS = tuple(sorted(_standard_font_widths.WIDTHS))
+
+# Characters missing from the text fonts are taken from these, in turn.
+_SYMBOL_FONTS = ('Symbol', 'ZapfDingbats')
+
+class _CharWidths(dict):
+    """The width of each character in a font, at a font size of one
+    point. Characters not in the font are given the width of the first
+    fallback table that has them, or the default width."""
+    def __init__(self, widths, fallbacks, default):
+        super().__init__(widths)
+        self.fallbacks = fallbacks
+        self.default = default
+
+    def __missing__(self, character):
+        for fallback in self.fallbacks:
+            if character in fallback:
+                width = fallback[character]
+                break
+        else:
+            width = self.default
+        self[character] = width
+        return width
+
+def _read_standard_widths(font_name):
+    characters, widths = _standard_font_widths.WIDTHS[font_name]
+    return dict(zip(characters, [width * 0.001 for width in widths]))
+
+def _read_ttf_widths(filename):
+    """Reads the width of each character from the given TrueType file,
+    returning them with the width of glyphs that aren't in the font."""
+    with open(filename, 'rb') as f:
+        data = f.read()
+
+    num_tables, = struct.unpack_from('>H', data, 4)
+    tables = {}
+    for i in range(num_tables):
+        tag, _, offset, length = struct.unpack_from('>4sLLL', data, 12+16*i)
+        tables[tag] = offset
+    try:
+        head, hhea, maxp, hmtx, cmap = [
+            tables[tag]
+            for tag in (b'head', b'hhea', b'maxp', b'hmtx', b'cmap')
+            ]
+    except KeyError as e:
+        raise ValueError(
+            "%s is not a TrueType font: no %s table." % (filename, e.args[0])
+            )
+
+    units_per_em, = struct.unpack_from('>H', data, head + 18)
+    num_h_metrics, = struct.unpack_from('>H', data, hhea + 34)
+    num_glyphs, = struct.unpack_from('>H', data, maxp + 4)
+
+    advances = array.array('d', [
+        struct.unpack_from('>H', data, hmtx + 4*i)[0] / units_per_em
+        for i in range(num_h_metrics)
+        ])
+    # Glyphs after the last metric share its advance width.
+    advances.extend([advances[-1]] * (num_glyphs - num_h_metrics))
+
+    glyphs = _read_cmap(data, cmap, filename)
+    widths = {
+        chr(code): advances[glyph]
+        for code, glyph in glyphs.items()
+        if 0 < glyph < num_glyphs
+        }
+    # A no-break space has the width of a space.
+    if ' ' in widths:
+        widths.setdefault('\xa0', widths[' '])
+    elif '\xa0' in widths:
+        widths[' '] = widths['\xa0']
+    return widths, advances[0]
+
+def _read_cmap(data, cmap, filename):
+    """Returns a dictionary mapping unicode code points to glyph indices,
+    read from the best unicode subtable of the given cmap table."""
+    num_subtables, = struct.unpack_from('>H', data, cmap + 2)
+    subtables = {}
+    for i in range(num_subtables):
+        platform, encoding, offset = struct.unpack_from(
+            '>HHL', data, cmap + 4 + 8*i
+            )
+        subtables[platform, encoding] = cmap + offset
+
+    # Prefer the full unicode tables to the basic plane ones.
+    for key in ((3, 10), (0, 4), (3, 1), (0, 3), (0, 2), (0, 1), (0, 0)):
+        if key not in subtables:
+            continue
+        offset = subtables[key]
+        format, = struct.unpack_from('>H', data, offset)
+        if format == 4:
+            return _read_cmap_format_4(data, offset)
+        elif format == 12:
+            return _read_cmap_format_12(data, offset)
+    raise ValueError("%s has no supported unicode cmap." % filename)
+
+def _read_cmap_format_4(data, offset):
+    seg_count = struct.unpack_from('>H', data, offset + 6)[0] // 2
+    ends = offset + 14
+    starts = ends + 2*seg_count + 2
+    deltas = starts + 2*seg_count
+    range_offsets = deltas + 2*seg_count
+
+    glyphs = {}
+    for i in range(seg_count):
+        end, = struct.unpack_from('>H', data, ends + 2*i)
+        start, = struct.unpack_from('>H', data, starts + 2*i)
+        delta, = struct.unpack_from('>H', data, deltas + 2*i)
+        range_offset_at = range_offsets + 2*i
+        range_offset, = struct.unpack_from('>H', data, range_offset_at)
+        for code in range(start, min(end, 0xfffe) + 1):
+            if range_offset == 0:
+                glyph = (code + delta) & 0xffff
+            else:
+                glyph_at = range_offset_at + range_offset + 2*(code - start)
+                glyph, = struct.unpack_from('>H', data, glyph_at)
+                if glyph:
+                    glyph = (glyph + delta) & 0xffff
+            if glyph:
+                glyphs[code] = glyph
+    return glyphs
+
+def _read_cmap_format_12(data, offset):
+    num_groups, = struct.unpack_from('>L', data, offset + 12)
+    glyphs = {}
+    for i in range(num_groups):
+        start, end, glyph = struct.unpack_from(
+            '>LLL', data, offset + 16 + 12*i
+            )
+        for code in range(start, end + 1):
+            glyphs[code] = glyph + code - start
+    return glyphs
+
+class FontMetrics:
+    """
+    Measures text in the standard 14 PDF fonts, and in any TrueType
+    fonts registered with :meth:`register_ttf`.
+
+    The widths of each font are only read the first time the font is
+    measured. Kerning is ignored, as it is by ReportLab. Instances can
+    be pickled, so they can be sent to worker processes.
+    """
+    def __init__(self) -> None:
+        self._ttf_filenames = {}
+        self._tables = {}
+        self._update_measure_key()
+
+    def _update_measure_key(self):
+        #: Identifies the widths these metrics give, for
+        #: :func:`layout.datatypes.output.get_measure_key`.
+        self.measure_key = (
+            type(self), tuple(sorted(self._ttf_filenames.items()))
+            )
+
+    def register_ttf(self, font_name:str, filename:str) -> None:
+        """Makes the TrueType font in the given file available under
+        the given name. The file isn't read until the font is
+        measured."""
+        self._ttf_filenames[font_name] = filename
+        self._tables.pop(font_name, None)
+        self._update_measure_key()
+
+    def _get_table(self, font_name):
+        try:
+            return self._tables[font_name]
+        except KeyError:
+            pass
+
+        if font_name in self._ttf_filenames:
+            widths, default = _read_ttf_widths(self._ttf_filenames[font_name])
+            table = _CharWidths(widths, (), default)
+        elif font_name in _standard_font_widths.WIDTHS:
+            if font_name in _SYMBOL_FONTS:
+                fallbacks = ()
+            else:
+                fallbacks = tuple(map(self._get_table, _SYMBOL_FONTS))
+            table = _CharWidths(
+                _read_standard_widths(font_name),
+                fallbacks,
+                _standard_font_widths.MISSING_WIDTH * 0.001
+                )
+        else:
+            raise ValueError("Font %s has not been registered." % font_name)
+
+        self._tables[font_name] = table
+        return table
+
+    def text_width(self, text:str, *, font_name:str, font_size:float) -> float:
+        """The width of the given text string."""
+        return sum(map(self._get_table(font_name).__getitem__, text)) * \
+            font_size
+
+    def text_widths(self, strings, *, font_name:str, font_size:float
+                    ) -> array.array:
+        """The widths of each of the given text strings, as an array."""
+        width_of = self._get_table(font_name).__getitem__
+        return array.array('d', [
+            sum(map(width_of, text)) * font_size for text in strings
+            ])
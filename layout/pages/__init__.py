@@ -1,2 +1,3 @@
 from .imposition import *
-from .output import *
\ No newline at end of file
+from .output import *
+from .variable import *
\ No newline at end of file
@@ -1,15 +1,321 @@
+import collections.abc
+
+from layout import datatypes
+from layout.datatypes import output
+import layout.managers.directional as directional
 import layout.managers.overlay as overlay
+import layout.managers.root as root
+
+class _SkippedPageOutput(output.OutputTarget):
+    """Measures text with another output, but draws nothing, for
+    pages that must be laid out but are not output."""
+    def __init__(self, measure_output):
+        self.measure_output = measure_output
+
+    def _save_state(self):
+        pass
+
+    def _restore_state(self):
+        pass
+
+    def translate(self, x, y):
+        pass
+
+    def scale(self, x, y):
+        pass
+
+    def rotate(self, degrees):
+        pass
+
+    def text_width(self, text, *, font_name, font_size):
+        return self.measure_output.text_width(
+            text, font_name=font_name, font_size=font_size
+            )
+
+    def text_widths(self, strings, *, font_name, font_size):
+        return self.measure_output.text_widths(
+            strings, font_name=font_name, font_size=font_size
+            )
+
+    def draw_text(self, *args, **kwargs):
+        pass
+
+    def draw_text_lines(self, *args, **kwargs):
+        pass
+
+    def draw_line(self, *args, **kwargs):
+        pass
+
+    def draw_rect(self, *args, **kwargs):
+        pass
+
+    def draw_image(self, *args, **kwargs):
+        pass
+
+    def draw_polygon(self, *args, **kwargs):
+        pass
+
+    def draw_lines(self, *args, **kwargs):
+        pass
+
+    def draw_rects(self, *args, **kwargs):
+        pass
+
+    def draw_polygons(self, *args, **kwargs):
+        pass
+
+    def clip_rect(self, *args, **kwargs):
+        pass
+
+    def end_page(self):
+        pass
+
+def _is_page_selected(data):
+    """Is the current page one of the pages to output?"""
+    pages = data.get('pages')
+    return pages is None or data.get('page_index', 0) in pages
+
+def _is_past_selected_pages(data):
+    """Have all the pages to output been output?"""
+    pages = data.get('pages')
+    if pages is None:
+        return False
+    last_page = data.get('last_page')
+    if last_page is None:
+        last_page = data['last_page'] = max(pages, default=-1)
+    return data.get('page_index', 0) > last_page
+
+def _render_page(element, rect, data):
+    """Renders the given element as the current page, if it is to be
+    output, or lays it out without drawing it, if it must be
+    fast-forwarded."""
+    if _is_page_selected(data):
+        root.render_element(element, rect, data)
+    elif getattr(element, 'fast_forward', False):
+        skipped_data = dict(
+            data,
+            output=_SkippedPageOutput(data['output']),
+            retain_minimum_sizes=False
+            )
+        root.render_element(element, rect, skipped_data)
+
+def _end_page(data):
+    """Ends the current page, if it is being output, and moves on to
+    the next."""
+    if _is_page_selected(data):
+        data['output'].end_page()
+    data['page_index'] = data.get('page_index', 0) + 1
 
 class PagesLM(overlay.OverlayLM):
     """
     A layout manager that puts each element in its content list
     on separate pages of a ReportLab document.
+
+    If the data object has a 'pages' value, only the pages whose
+    zero-based indices it contains (a ``range``, for example) are
+    output, and rendering stops after the last of them. Other pages are
+    neither measured nor drawn, unless their element has a true
+    ``fast_forward`` attribute, in which case it is laid out without
+    being drawn. Use this for pages whose layout affects the pages after
+    them, such as those holding the frames of a
+    :class:`layout.elements.text.TextFlow`. Elements with a true
+    ``paginates`` attribute, such as :class:`PaginatedVerticalLM`,
+    output several pages themselves, and are always rendered.
     """
+    def __init__(self, elements=[], num_pages=None):
+        """
+        Arguments:
+
+        ``elements``
+            The pages. This can be a list of elements, any other
+            iterable of elements, such as a generator, or a function
+            that takes a zero-based page index and returns that page.
+            Iterables are only read as the pages are rendered, and
+            functions are only called for pages that are output, so
+            only one page need exist at a time. A generator can only
+            be rendered once.
+
+        ``num_pages``
+            The number of pages, if ``elements`` is a function.
+        """
+        if isinstance(elements, collections.abc.Sequence):
+            super(PagesLM, self).__init__(elements)
+            self.page_source = None
+        else:
+            super(PagesLM, self).__init__()
+            self.page_source = elements
+            if callable(elements) and num_pages is None:
+                raise ValueError('A page function needs a number of pages.')
+        self.num_pages = num_pages
+
+    def _iter_elements(self, data):
+        """Yields each page, or None for pages that haven't been made
+        because they won't be output."""
+        if self.page_source is None:
+            return iter(self.elements)
+        elif callable(self.page_source):
+            return (
+                self.page_source(index) if _is_page_selected(data) else None
+                for index in range(self.num_pages)
+                )
+        else:
+            return iter(self.page_source)
+
     def render(self, rect, data):
         """Render the pages into the given rectangle on subsequent
         pages of the output. This actually outputs the page change,
         so the rectangle given should be the whole page rectangle,
         not a portion of it."""
+        for element in self._iter_elements(data):
+            if _is_past_selected_pages(data):
+                break
+            if self.page_source is not None:
+                # Pages that are made on demand are never measured
+                # again, so forget their sizes to let them be freed.
+                for name in ('minimum_size_cache', 'height_for_width_cache'):
+                    if name in data:
+                        data[name].clear()
+            if getattr(element, 'paginates', False):
+                root.render_element(element, rect, data)
+            elif element:
+                _render_page(element, rect, data)
+            _end_page(data)
+
+class PaginatedVerticalLM(directional.VerticalLM):
+    """
+    Keeps a set of elements above one another, like
+    :class:`layout.managers.directional.VerticalLM`, but starts a new
+    page whenever the next element will not fit on the current one.
+    Elements are never split across pages.
+
+    Each element is measured once, at the width it will be given, and
+    the page breaks are found in a single pass over the running total
+    of the heights. Pages are made lazily by :meth:`iter_pages`, as a
+    vertical layout manager per page, so very long reports don't need
+    every page to exist at once.
+
+    When rendered, the pages are output in the given rectangle on
+    subsequent pages of the output, so it can be placed in a
+    :class:`PagesLM` (which ends the last page, and can choose which
+    pages are output), but not inside any other manager that
+    transforms the output.
+    """
+
+    #: Outputs several pages when rendered.
+    paginates = True
+    def __init__(self, margin=0,
+                 horizontal_align=directional.VerticalLM.ALIGN_GROW,
+                 vertical_align=directional.VerticalLM.ALIGN_TOP,
+                 elements=[]):
+        """
+        Arguments:
+
+        ``margin``
+            The amount of space to place between elements on a page.
+
+        ``horizontal_align``
+            How elements should be aligned horizontally on each page
+            (default: :data:`ALIGN_GROW`).
+
+        ``vertical_align``
+            How elements should be aligned vertically on each page
+            (default: :data:`ALIGN_TOP`).
+        """
+        super(PaginatedVerticalLM, self).__init__(
+            margin, horizontal_align, vertical_align, elements
+            )
+
+        #: The indices of elements that must be on the same page as the
+        #: element after them.
+        self.keep_with_next = set()
+
+    def add_element(self, element, keep_with_next=False):
+        """Adds the given element, which will be kept on the same page
+        as the next element if ``keep_with_next`` is true."""
+        if keep_with_next:
+            self.keep_with_next.add(len(self.elements))
+        super(PaginatedVerticalLM, self).add_element(element)
+
+    def add_kept_together(self, elements):
+        """Adds the given elements, which will all be kept on the same
+        page if they fit on one."""
+        for index, element in enumerate(elements):
+            self.add_element(element, index < len(elements) - 1)
+
+    def get_minimum_size(self, data):
+        """
+        Minimum height is the tallest element, as each page must hold
+        at least one, minimum width is the largest width.
+        """
+        min_width = 0
+        min_height = 0
         for element in self.elements:
-            if element: element.render(rect, data)
-            data['output'].end_page()
+            size = root.get_cached_minimum_size(element, data)
+            min_width = max(min_width, size.x)
+            min_height = max(min_height, size.y)
+        return datatypes.Point(min_width, min_height)
+
+    def get_height_for_width(self, width, data):
+        """The height of the tallest element at the width it will be
+        given."""
+        return max([0] + [
+            root.get_height_for_width(element, w, data)
+            for element, (_, w) in zip(
+                self.elements, self._get_element_widths(width, data)
+                )
+            ])
+
+    def _iter_breaks(self, rect, data):
+        """Yields the (start, end) indices of the elements on each page
+        of the given size."""
+        # The total height of the elements before each index, with the
+        # margin after each.
+        totals = [0]
+        for element, (_, w) in zip(
+                self.elements, self._get_element_widths(rect.w, data)
+                ):
+            height = root.get_height_for_width(element, w, data)
+            totals.append(totals[-1] + height + self.margin)
+
+        num_elements = len(self.elements)
+        start = 0
+        while start < num_elements:
+            # Fit as many elements as we can, but at least one.
+            end = start + 1
+            while end < num_elements and \
+                    totals[end+1] - totals[start] - self.margin <= rect.h:
+                end += 1
+
+            # Move elements to the next page with the elements they are
+            # kept with, unless they fill the whole page.
+            kept_end = end
+            while kept_end > start and kept_end < num_elements and \
+                    kept_end-1 in self.keep_with_next:
+                kept_end -= 1
+            if kept_end > start:
+                end = kept_end
+
+            yield start, end
+            start = end
+
+    def iter_pages(self, rect, data):
+        """
+        Yields a vertical layout manager for each page, holding the
+        elements that fit on it when the pages are the size of the
+        given rectangle.
+        """
+        for start, end in self._iter_breaks(rect, data):
+            yield directional.VerticalLM(
+                self.margin, self.horizontal_align, self.vertical_align,
+                elements=self.elements[start:end]
+                )
+
+    def render(self, rect, data):
+        """Renders each page into the given rectangle, ending the page
+        between them."""
+        for index, page in enumerate(self.iter_pages(rect, data)):
+            if index:
+                _end_page(data)
+            if _is_past_selected_pages(data):
+                break
+            _render_page(page, rect, data)
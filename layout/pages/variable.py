@@ -0,0 +1,265 @@
+"""
+This module prints variable data jobs, such as numbered tickets,
+badges and labels, where a copy of the same template is output for
+each of a list of records, with only a few fields changing between
+them.
+
+The template is laid out once for each arrangement of copies on a
+sheet, and split into a static layer, holding everything that is the
+same for every record, and a dynamic layer, holding the
+:class:`Field` elements. The static layer is output once, as a form if
+the output can store forms, and drawn on each sheet with that
+arrangement. Only the fields are drawn for each record, so the cost of
+a record depends on the number of fields, not the size of the
+template.
+"""
+import itertools
+
+from layout import datatypes
+import layout.elements.text as text
+import layout.managers.form as form
+import layout.managers.grid as grid
+import layout.managers.root as root
+from layout.pages.output import (
+    _end_page, _is_page_selected, _is_past_selected_pages
+    )
+
+# The outputs that change the state in which later output is drawn.
+_STATE_METHODS = frozenset([
+    '_save_state', '_restore_state', 'translate', 'scale', 'rotate',
+    'clip_rect'
+    ])
+
+class Field(text.TextLine):
+    """
+    A line of text whose text comes from each record of a variable
+    data job.
+
+    The field is laid out with its sample text, which should be as
+    wide as any value it will hold, as the layout isn't changed for
+    each record. When rendered as part of an ordinary layout, it draws
+    the value from the data object's 'record' mapping, if there is
+    one, or the sample text otherwise.
+    """
+    def __init__(self, name, sample_text='',
+                 font_name="Helvetica", font_size=11,
+                 color=(0,0,0), align=text.TextBase.ALIGN_LEFT):
+        """
+        Arguments:
+
+        ``name``
+            The key of the field's value in each record.
+
+        ``sample_text``
+            The text the field is laid out with.
+        """
+        super(Field, self).__init__(
+            sample_text, font_name, font_size, color, align
+            )
+        self.name = name
+
+    def draw_value(self, value, rect, output_target):
+        """Draws the given value of the field in the given rectangle,
+        aligned to the value's own width."""
+        x = rect.left
+        if self.align != Field.ALIGN_LEFT:
+            align = 1 if self.align == Field.ALIGN_RIGHT else 0.5
+            width = output_target.text_width(
+                value, font_name=self.font_name, font_size=self.font_size
+                )
+            x += (rect.w - width) * align
+        output_target.draw_text(
+            value, x, rect.y + self.font_size*0.2,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            fill=self.color
+            )
+
+    def render(self, rect, data):
+        record = data.get('record')
+        value = self.text if record is None else str(record[self.name])
+        self.draw_value(value, rect, data['output'])
+
+def _prune(items):
+    """Removes the saved states that no field is drawn inside, along
+    with everything output in them."""
+    pruned = []
+    fields = 0
+    # The index in pruned of each unrestored save, and the number of
+    # fields before it.
+    saves = []
+    for item in items:
+        if isinstance(item, root.Frame):
+            fields += 1
+        elif item[0] == '_save_state':
+            saves.append((len(pruned), fields))
+        elif item[0] == '_restore_state' and saves:
+            start, fields_before = saves.pop()
+            if fields == fields_before:
+                del pruned[start:]
+                continue
+        pruned.append(item)
+    return pruned
+
+def _split(frame, dynamic):
+    """Returns a copy of the given frame without its fields, and adds
+    the fields, and the outputs they are drawn after, to the dynamic
+    list."""
+    content = []
+    for item in frame.content:
+        if isinstance(item, root.Frame):
+            if isinstance(item.element, Field):
+                dynamic.append(item)
+            else:
+                content.append(_split(item, dynamic))
+        else:
+            content.append(item)
+            if item[0] in _STATE_METHODS:
+                dynamic.append(item)
+    return frame._replace(content=tuple(content))
+
+def split_layers(frame):
+    """
+    Splits a :class:`layout.managers.root.Frame`, from
+    :func:`layout.managers.root.arrange`, into its static and dynamic
+    layers.
+
+    Returns the frame without any :class:`Field` elements in it, and
+    a list of the frames of the fields, in order, along with the
+    changes to the output state that they are drawn inside, as
+    ``(output_method_name, args, kwargs)`` tuples. Draw the dynamic
+    layer for a record with :func:`paint_fields`.
+    """
+    if isinstance(frame.element, Field):
+        return frame._replace(content=()), [frame]
+    dynamic = []
+    static = _split(frame, dynamic)
+    return static, _prune(dynamic)
+
+def paint_fields(dynamic, record, output_target):
+    """Draws the dynamic layer returned by :func:`split_layers` onto
+    the given output target, with each field's value from the given
+    record."""
+    for item in dynamic:
+        if isinstance(item, root.Frame):
+            field = item.element
+            field.draw_value(
+                str(record[field.name]), item.rectangle, output_target
+                )
+        else:
+            method_name, args, kwargs = item
+            getattr(output_target, method_name)(*args, **dict(kwargs))
+
+@root.add_layout_properties(['template', 'columns', 'rows', 'margin'])
+class VariableDataLM(root.LayoutManager):
+    """
+    Outputs a copy of a template for each of a list of records, with
+    the :class:`Field` elements in it filled in from the record. The
+    copies are arranged in a grid of rows and columns on each page, as
+    by a :class:`layout.managers.grid.SimpleGridLM`.
+
+    The template is laid out and split into layers (see
+    :func:`split_layers`) once for a full page, and once more for a
+    partly full last page. The static layer of each is output at most
+    once, as a form, if the output can store them (see
+    :class:`layout.managers.form.CachedFormLM`), then only the fields
+    are drawn for each record.
+
+    Like :class:`layout.pages.output.PaginatedVerticalLM`, this outputs
+    a page for each grid of records, so should be placed in a
+    :class:`layout.pages.output.PagesLM`, but not inside any other
+    manager that transforms the output.
+    """
+
+    #: Outputs several pages when rendered.
+    paginates = True
+
+    def __init__(self, template=None, records=[], columns=1, rows=1,
+                 margin=0):
+        """
+        Arguments:
+
+        ``template``
+            The element to output for each record.
+
+        ``records``
+            The records, as mappings from field names to values. Any
+            iterable of records can be given, such as a generator, and
+            they are only read as the pages are rendered.
+
+        ``columns``, ``rows``
+            The number of copies of the template across and down each
+            page.
+
+        ``margin``
+            The space between copies.
+        """
+        super(VariableDataLM, self).__init__()
+        self.template = template
+        self.records = records
+        self.columns = columns
+        self.rows = rows
+        self.margin = margin
+
+    def _get_grid(self, count):
+        """The layout of a page holding the given number of copies."""
+        return grid.SimpleGridLM(
+            self.columns, self.rows, self.margin,
+            elements=[self.template] * count
+            )
+
+    def get_minimum_size(self, data):
+        return self._get_grid(self.columns * self.rows).get_minimum_size(
+            data
+            )
+
+    def _get_layers(self, count, size, data):
+        """Lays out a page holding the given number of copies, and
+        returns its static layer, and the dynamic layer of each
+        copy."""
+        sheet = root.arrange(
+            self._get_grid(count), datatypes.Rectangle(0, 0, *size),
+            data['output']
+            )
+        # The grid draws nothing itself, only the copies.
+        static = []
+        dynamic = []
+        for copy in sheet.content:
+            copy_static, copy_dynamic = split_layers(copy)
+            static.append(copy_static)
+            dynamic.append(copy_dynamic)
+        return sheet._replace(content=tuple(static)), dynamic
+
+    def render(self, rect, data):
+        """Renders each page of records into the given rectangle,
+        ending the page between them."""
+        per_page = self.columns * self.rows
+        size = (rect.w, rect.h)
+        layers = {}
+        records = iter(self.records)
+        for index in itertools.count():
+            page_records = list(itertools.islice(records, per_page))
+            if not page_records:
+                break
+            if index:
+                _end_page(data)
+            if _is_past_selected_pages(data):
+                break
+            if not _is_page_selected(data):
+                continue
+
+            count = len(page_records)
+            if count not in layers:
+                layers[count] = self._get_layers(count, size, data)
+            static, dynamic = layers[count]
+
+            c = data['output']
+            with c:
+                c.translate(rect.x, rect.y)
+                # Keyed by this manager, so changes to the template
+                # output new forms.
+                form.CachedFormLM(static, key=(
+                    self, self._layout_version, count, size
+                    )).render(datatypes.Rectangle(0, 0, *size), data)
+                for copy_dynamic, record in zip(dynamic, page_records):
+                    paint_fields(copy_dynamic, record, c)
@@ -0,0 +1,714 @@
+"""This module provides an output target that writes PDF files itself,
+without ReportLab or Cairo. Each page is written to the file as soon as
+it ends, so documents of any length can be output with the memory
+needed for a single page.
+
+Text is measured and drawn in the standard 14 PDF fonts, which don't
+need embedding. JPEG images, and PNG images without transparency or
+interlacing, can be drawn, and are stored in the file only once
+however many pages use them."""
+
+import array
+import concurrent.futures
+import math
+import queue
+import struct
+import threading
+import zlib
+
+from layout.datatypes import output, Rectangle
+from layout.metrics import FontMetrics, STANDARD_FONTS
+
+def render_to_pdf_file(f, papersize_tuple, layout, pages=None, threads=2):
+    """Renders the given layout manager as a PDF document written to
+    the given binary file object, which isn't closed.
+
+    If ``pages`` is given, only the pages of a
+    :class:`layout.pages.output.PagesLM` whose zero-based indices it
+    contains are output. Pages are compressed and written by the given
+    number of background threads, as described in :class:`PDFOutput`.
+    """
+    pdf = PDFOutput(f, papersize_tuple, threads=threads)
+    try:
+        layout.render(
+            Rectangle(0, 0, *papersize_tuple),
+            dict(
+                output=pdf,
+                minimum_size_cache={},
+                height_for_width_cache={},
+                retain_minimum_sizes=True,
+                pages=pages
+                )
+            )
+    except BaseException:
+        pdf.abort()
+        raise
+    pdf.close()
+
+def render_to_pdf_document(output_filename, papersize_tuple, layout,
+                           pages=None, threads=2):
+    """Create and save a document with contents of the given layout
+    manager, optionally only the given pages."""
+    with open(output_filename, 'wb') as f:
+        render_to_pdf_file(f, papersize_tuple, layout, pages, threads)
+
+# Fonts with their own encoding, rather than WinAnsiEncoding.
+_SYMBOL_FONTS = ('Symbol', 'ZapfDingbats')
+
+# The objects written before any page.
+_CATALOG = 1
+_PAGES = 2
+
+def _number(value):
+    """Formats the given number as compactly as PDF allows."""
+    if value == int(value):
+        return '%d' % value
+    text = ('%.4f' % value).rstrip('0').rstrip('.')
+    return '0' if text == '-0' else text
+
+def _numbers(*values):
+    return ' '.join(map(_number, values))
+
+def _string(data):
+    """Formats the given bytes as a PDF literal string."""
+    return b'(' + data.replace(b'\\', b'\\\\').replace(
+        b'(', b'\\('
+        ).replace(b')', b'\\)').replace(b'\r', b'\\r') + b')'
+
+def _encode(text, font_name):
+    """Encodes the given text for the given standard font."""
+    if font_name in _SYMBOL_FONTS:
+        return text.encode('latin-1', 'replace')
+    return text.encode('cp1252', 'replace')
+
+def _read_jpeg(data, filename):
+    """Returns the image dictionary entries for the given JPEG file,
+    which is stored as it is."""
+    inverted = False
+    position = 2
+    while position < len(data):
+        marker, length = struct.unpack_from('>xBH', data, position)
+        if marker == 0xee and data[position+4:position+9] == b'Adobe':
+            # Adobe's CMYK JPEGs are stored inverted.
+            inverted = True
+        elif 0xc0 <= marker <= 0xcf and marker not in (0xc4, 0xc8, 0xcc):
+            bits, height, width, components = struct.unpack_from(
+                '>BHHB', data, position + 4
+                )
+            break
+        position += 2 + length
+    else:
+        raise ValueError("%s is not a valid JPEG file." % filename)
+
+    color_space = {1: '/DeviceGray', 3: '/DeviceRGB', 4: '/DeviceCMYK'}
+    entries = (
+        '/Width %d /Height %d /BitsPerComponent %d /ColorSpace %s '
+        '/Filter /DCTDecode' % (width, height, bits, color_space[components])
+        )
+    if components == 4 and inverted:
+        entries += ' /Decode [1 0 1 0 1 0 1 0]'
+    return entries, data
+
+def _read_png(data, filename):
+    """Returns the image dictionary entries for the given PNG file, whose
+    compressed data is stored as it is."""
+    width, height, bits, color_type, interlace = struct.unpack_from(
+        '>LLBB2xB', data, 16
+        )
+    if color_type not in (0, 2, 3) or interlace:
+        raise ValueError(
+            "%s: PNG images with transparency or interlacing "
+            "are not supported." % filename
+            )
+
+    palette = None
+    chunks = []
+    position = 8
+    while position < len(data):
+        length, kind = struct.unpack_from('>L4s', data, position)
+        chunk = data[position+8:position+8+length]
+        if kind == b'PLTE':
+            palette = chunk
+        elif kind == b'IDAT':
+            chunks.append(chunk)
+        elif kind == b'IEND':
+            break
+        position += 12 + length
+
+    colors = 3 if color_type == 2 else 1
+    if color_type == 0:
+        color_space = '/DeviceGray'
+    elif color_type == 2:
+        color_space = '/DeviceRGB'
+    else:
+        color_space = '[/Indexed /DeviceRGB %d <%s>]' % (
+            len(palette) // 3 - 1, palette.hex()
+            )
+    entries = (
+        '/Width %d /Height %d /BitsPerComponent %d /ColorSpace %s '
+        '/Filter /FlateDecode /DecodeParms << /Predictor 15 /Colors %d '
+        '/BitsPerComponent %d /Columns %d >>' % (
+            width, height, bits, color_space, colors, bits, width
+            )
+        )
+    return entries, b''.join(chunks)
+
+def _read_image(filename):
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if data.startswith(b'\xff\xd8'):
+        return _read_jpeg(data, filename)
+    elif data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return _read_png(data, filename)
+    raise ValueError("%s is not a JPEG or PNG image." % filename)
+
+class _BackgroundWriter:
+    """
+    Compresses streams on a pool of threads, and writes objects to the
+    file on another thread, in the order they are given.
+
+    zlib releases the GIL while it compresses, as do file writes, so
+    both can run while the next page is being laid out. At most
+    ``max_pending`` objects wait to be written, after which adding
+    another waits for the writer to catch up, so memory stays bounded
+    however far ahead layout runs.
+    """
+    def __init__(self, write_object, threads, max_pending):
+        self._write_object = write_object
+        self._compressor = concurrent.futures.ThreadPoolExecutor(threads)
+        self._pending = queue.Queue(max_pending)
+        self._error = None
+        self._aborted = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def compress(self, data):
+        """Returns a future holding the compressed data."""
+        return self._compressor.submit(zlib.compress, data)
+
+    def write_object(self, number, body, stream=None):
+        """Queues the given object to be written. The stream may be a
+        future returned by :meth:`compress`."""
+        if self._error is not None:
+            raise self._error
+        self._pending.put((number, body, stream))
+
+    def _run(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            if self._error is not None or self._aborted:
+                continue
+            number, body, stream = item
+            try:
+                if isinstance(stream, concurrent.futures.Future):
+                    stream = stream.result()
+                self._write_object(number, body, stream)
+            except BaseException as e:
+                self._error = e
+
+    def close(self):
+        """Waits for every object to be written, raising any error
+        that stopped the writer."""
+        self._pending.put(None)
+        self._thread.join()
+        self._compressor.shutdown()
+        if self._error is not None:
+            raise self._error
+
+    def abort(self):
+        """Discards any objects still waiting to be written and stops
+        the threads."""
+        self._aborted = True
+        self._pending.put(None)
+        self._thread.join()
+        self._compressor.shutdown()
+
+class PDFOutput(output.OutputTarget):
+    """
+    An output target that writes a PDF document to a binary file
+    object, one page at a time.
+
+    Only the drawing operations of the current page are held in
+    memory. When the page ends, its content is written to the file,
+    along with any fonts and images it is the first to use, which are
+    then shared by all the pages after it. The list of pages and the
+    cross-reference table are written when the document is closed, so
+    :meth:`close` must be called once everything has been drawn. The
+    file need not be seekable. Colors, fonts and line styles are only
+    written when they change, tracked in a
+    :class:`layout.datatypes.output.GraphicsState`.
+
+    If ``threads`` is more than zero, each finished page is compressed
+    on a pool of that many threads, and everything is written to the
+    file by one more, so the next page can be laid out while the last
+    is compressed and written. Errors writing the file are raised by
+    the next page, or by :meth:`close`. If the document can't be
+    finished, call :meth:`abort` instead, to stop the threads.
+
+    Text is measured with the given ``metrics``, by default a new
+    :class:`layout.metrics.FontMetrics`, and must be in one of the
+    standard 14 fonts. Text in the other fonts is written in
+    WinAnsiEncoding, with characters it doesn't have replaced by
+    question marks. Text in Symbol and ZapfDingbats should only use
+    characters below 256, which are written as they are, as codes in
+    the font's own encoding.
+    """
+    #: The number of objects that can wait to be written, per thread.
+    pending_per_thread = 4
+
+    def __init__(self, f, papersize_tuple, metrics=None, compress=True,
+                 threads=0):
+        """
+        Arguments:
+
+        ``f``
+            The binary file object to write to.
+
+        ``papersize_tuple``
+            The width and height of each page.
+
+        ``metrics``
+            The object used to measure text.
+
+        ``compress``
+            Whether the content of each page is compressed.
+
+        ``threads``
+            The number of threads compressing pages in the background,
+            or zero to compress and write them as they end.
+        """
+        self.f = f
+        self.papersize = tuple(papersize_tuple)
+        self.metrics = metrics if metrics is not None else FontMetrics()
+        self.compress = compress
+
+        #: The drawing settings of the current page.
+        self.state = output.GraphicsState()
+
+        # The position in the file of each object, by object number
+        # less one.
+        self._offsets = array.array('q', [0, 0])
+        self._position = 0
+        self._page_numbers = array.array('q')
+
+        # Resource names and object numbers of fonts and images.
+        self._fonts = {}
+        self._images = {}
+
+        # Resource names and object numbers of forms, by key, the
+        # content of the pages or forms that the forms being stored
+        # are inside, and the number of forms stored, which numbers
+        # their names.
+        self._forms = {}
+        self._form_stack = []
+        self._form_count = 0
+
+        # The content of the current page, and the fonts and external
+        # objects (images and forms) it uses, by resource name.
+        self._content = []
+        self._page_fonts = {}
+        self._page_xobjects = {}
+
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+        self._writer = None
+        if threads > 0:
+            self._writer = _BackgroundWriter(
+                self._write_object_now, threads,
+                threads * self.pending_per_thread
+                )
+
+    # Writing objects.
+
+    def _write(self, data):
+        self.f.write(data)
+        self._position += len(data)
+
+    def _new_object_number(self):
+        self._offsets.append(0)
+        return len(self._offsets)
+
+    def _write_object(self, number, body, stream=None):
+        """Writes the object with the given number, whose dictionary or
+        other value is the given string, followed by the given stream,
+        if any, or queues it to be written in the background."""
+        if self._writer is not None:
+            self._writer.write_object(number, body, stream)
+        else:
+            self._write_object_now(number, body, stream)
+
+    def _write_object_now(self, number, body, stream):
+        self._offsets[number - 1] = self._position
+        if stream is None:
+            self._write(('%d 0 obj\n%s\nendobj\n' % (number, body)).encode())
+        else:
+            self._write((
+                '%d 0 obj\n<< %s /Length %d >>\nstream\n' % (
+                    number, body, len(stream)
+                    )
+                ).encode())
+            self._write(stream)
+            self._write(b'\nendstream\nendobj\n')
+
+    def _get_font(self, font_name):
+        """Returns the resource name of the given font, writing it to
+        the file the first time it is used."""
+        try:
+            resource = self._fonts[font_name]
+        except KeyError:
+            if font_name not in STANDARD_FONTS:
+                raise ValueError(
+                    "Font %s is not one of the standard 14 PDF fonts." %
+                    font_name
+                    )
+            number = self._new_object_number()
+            encoding = '' if font_name in _SYMBOL_FONTS else \
+                ' /Encoding /WinAnsiEncoding'
+            self._write_object(
+                number,
+                '<< /Type /Font /Subtype /Type1 /BaseFont /%s%s >>' % (
+                    font_name, encoding
+                    )
+                )
+            resource = self._fonts[font_name] = \
+                ('F%d' % (len(self._fonts) + 1), number)
+        self._page_fonts[resource[0]] = resource
+        return resource[0]
+
+    def _get_image(self, img_filename):
+        """Returns the resource name of the given image, writing it to
+        the file the first time it is used."""
+        try:
+            resource = self._images[img_filename]
+        except KeyError:
+            entries, data = _read_image(img_filename)
+            number = self._new_object_number()
+            self._write_object(
+                number, '/Type /XObject /Subtype /Image ' + entries, data
+                )
+            resource = self._images[img_filename] = \
+                ('Im%d' % (len(self._images) + 1), number)
+        self._page_xobjects[resource[0]] = resource
+        return resource[0]
+
+    def _emit(self, *operations):
+        self._content.append(' '.join(operations).encode('latin-1'))
+
+    # Output target interface.
+
+    def _save_state(self):
+        self._emit('q')
+        self.state.save()
+
+    def _restore_state(self):
+        self._emit('Q')
+        self.state.restore()
+
+    def translate(self, x, y):
+        self._emit(_numbers(1, 0, 0, 1, x, y), 'cm')
+
+    def scale(self, x, y):
+        self._emit(_numbers(x, 0, 0, y, 0, 0), 'cm')
+
+    def rotate(self, degrees):
+        radians = math.radians(degrees)
+        cos, sin = math.cos(radians), math.sin(radians)
+        self._emit(_numbers(cos, sin, -sin, cos, 0, 0), 'cm')
+
+    def text_width(self, text, *, font_name, font_size):
+        return self.metrics.text_width(
+            text, font_name=font_name, font_size=font_size
+            )
+
+    def text_widths(self, strings, *, font_name, font_size):
+        return self.metrics.text_widths(
+            strings, font_name=font_name, font_size=font_size
+            )
+
+    def draw_text(self, text, x, y, *, font_name, font_size, fill):
+        font = self._get_font(font_name)
+        data = _encode(text, font_name)
+        self._set_fill(fill)
+        if self.state.changed('font', (font_name, font_size)):
+            self._emit('BT /%s' % font, _number(font_size), 'Tf')
+        else:
+            self._emit('BT')
+        self._emit(_numbers(x, y), 'Td')
+        self._content.append(_string(data) + b' Tj ET')
+
+    def draw_text_lines(self, lines, *, font_name, font_size, fill):
+        """Draws the given lines as a single text object, moving from
+        the start of each line to the next."""
+        lines = list(lines)
+        if not lines:
+            return
+        font = self._get_font(font_name)
+        self._set_fill(fill)
+        if self.state.changed('font', (font_name, font_size)):
+            self._emit('BT /%s' % font, _number(font_size), 'Tf')
+        else:
+            self._emit('BT')
+        last_x = last_y = 0
+        for text, x, y in lines:
+            self._emit(_numbers(x - last_x, y - last_y), 'Td')
+            self._content.append(
+                _string(_encode(text, font_name)) + b' Tj'
+                )
+            last_x, last_y = x, y
+        self._emit('ET')
+
+    def _set_fill(self, fill):
+        if self.state.changed('fill', fill):
+            self._emit(_numbers(*fill), 'rg')
+
+    def _set_stroke(self, stroke, stroke_width, stroke_dash):
+        state = self.state
+        if state.changed('stroke', stroke):
+            self._emit(_numbers(*stroke), 'RG')
+        if state.changed('stroke_width', stroke_width):
+            self._emit(_number(stroke_width), 'w')
+        if isinstance(stroke_dash, (int, float)):
+            stroke_dash = (stroke_dash, stroke_dash)
+        stroke_dash = tuple(stroke_dash or ())
+        if state.changed('stroke_dash', stroke_dash):
+            self._emit('[%s] 0 d' % _numbers(*stroke_dash))
+
+    def _paint(self, stroke, fill):
+        if stroke is not None and fill is not None:
+            self._emit('B')
+        elif stroke is not None:
+            self._emit('S')
+        elif fill is not None:
+            self._emit('f')
+        else:
+            self._emit('n')
+
+    def _begin_shape(self, stroke, stroke_width, stroke_dash, fill):
+        if stroke is not None:
+            self._set_stroke(stroke, stroke_width, stroke_dash)
+        if fill is not None:
+            self._set_fill(fill)
+
+    def draw_line(
+            self, x0, y0, x1, y1, *,
+            stroke,
+            stroke_width=1,
+            stroke_dash=None):
+        self._begin_shape(stroke, stroke_width, stroke_dash, None)
+        self._emit(_numbers(x0, y0), 'm', _numbers(x1, y1), 'l')
+        self._paint(stroke, None)
+
+    def draw_rect(
+            self, x, y, w, h, *,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        self._begin_shape(stroke, stroke_width, stroke_dash, fill)
+        self._emit(_numbers(x, y, w, h), 're')
+        self._paint(stroke, fill)
+
+    def draw_image(self, img_filename, x, y, w, h):
+        image = self._get_image(img_filename)
+        self._emit('q', _numbers(w, 0, 0, h, x, y), 'cm /%s Do Q' % image)
+
+    def draw_polygon(
+            self,
+            *pts,
+            close_path=True,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        self._begin_shape(stroke, stroke_width, stroke_dash, fill)
+        operator = 'm'
+        for x, y in zip(*[iter(pts)]*2):
+            self._emit(_numbers(x, y), operator)
+            operator = 'l'
+        if close_path:
+            self._emit('h')
+        self._paint(stroke, fill)
+
+    def draw_lines(
+            self, coords, *,
+            stroke,
+            stroke_width=1,
+            stroke_dash=None):
+        """Draws the given lines as a single path."""
+        self._begin_shape(stroke, stroke_width, stroke_dash, None)
+        for x0, y0, x1, y1 in output.group_coordinates(coords, 4):
+            self._emit(_numbers(x0, y0), 'm', _numbers(x1, y1), 'l')
+        self._paint(stroke, None)
+
+    def draw_rects(
+            self, coords, *,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        """Draws the given rectangles as a single path."""
+        self._begin_shape(stroke, stroke_width, stroke_dash, fill)
+        for x, y, w, h in output.group_coordinates(coords, 4):
+            self._emit(_numbers(x, y, w, h), 're')
+        self._paint(stroke, fill)
+
+    def draw_polygons(
+            self, polygons, *,
+            close_path=True,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        """Draws the given polygons, setting their style once."""
+        self._begin_shape(stroke, stroke_width, stroke_dash, fill)
+        for pts in polygons:
+            operator = 'm'
+            for x, y in output.group_coordinates(pts, 2):
+                self._emit(_numbers(x, y), operator)
+                operator = 'l'
+            if close_path:
+                self._emit('h')
+            self._paint(stroke, fill)
+
+    def clip_rect(self, x, y, w, h):
+        self._emit(_numbers(x, y, w, h), 're W n')
+
+    def _write_content(self, number, entries, content):
+        """Writes the given list of content lines, compressed if
+        needed, as a stream object with the given number, whose
+        dictionary has the given entries."""
+        content = b'\n'.join(content)
+        if self.compress:
+            if self._writer is not None:
+                content = self._writer.compress(content)
+            else:
+                content = zlib.compress(content)
+            entries += ' /Filter /FlateDecode'
+        self._write_object(number, entries.lstrip(), content)
+
+    def _get_resources(self):
+        """Returns the resource dictionary of the current page or
+        form."""
+        resources = []
+        if self._page_fonts:
+            resources.append('/Font << %s >>' % ' '.join(
+                '/%s %d 0 R' % resource
+                for resource in self._page_fonts.values()
+                ))
+        if self._page_xobjects:
+            resources.append('/XObject << %s >>' % ' '.join(
+                '/%s %d 0 R' % resource
+                for resource in self._page_xobjects.values()
+                ))
+        return '<< %s >>' % ' '.join(resources)
+
+    def has_form(self, key):
+        return key in self._forms
+
+    def begin_form(self, key, w, h):
+        """Starts a form, which is written to the file as a form
+        XObject when it ends."""
+        self._form_stack.append((
+            key, w, h, self._content, self._page_fonts,
+            self._page_xobjects, self.state
+            ))
+        self._content = []
+        self._page_fonts = {}
+        self._page_xobjects = {}
+        self.state = output.GraphicsState()
+        return True
+
+    def end_form(self):
+        key, w, h = self._form_stack[-1][:3]
+        number = self._new_object_number()
+        self._write_content(
+            number, '/Type /XObject /Subtype /Form /BBox [0 0 %s] '
+            '/Resources %s' % (_numbers(w, h), self._get_resources()),
+            self._content
+            )
+        (_, _, _, self._content, self._page_fonts, self._page_xobjects,
+         self.state) = self._form_stack.pop()
+        self._form_count += 1
+        self._forms[key] = ('Fm%d' % self._form_count, number)
+
+    def discard_form(self):
+        """Abandons the form without writing it."""
+        (_, _, _, self._content, self._page_fonts, self._page_xobjects,
+         self.state) = self._form_stack.pop()
+
+    def forget_form(self, key):
+        self._forms.pop(key, None)
+
+    def draw_form(self, key):
+        resource = self._forms[key]
+        self._page_xobjects[resource[0]] = resource
+        self._emit('/%s Do' % resource[0])
+
+    def end_page(self):
+        """Writes the current page to the file."""
+        content_number = self._new_object_number()
+        self._write_content(content_number, '', self._content)
+        page_number = self._new_object_number()
+        self._write_object(
+            page_number,
+            '<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s] '
+            '/Contents %d 0 R /Resources %s >>' % (
+                _PAGES, _numbers(*self.papersize), content_number,
+                self._get_resources()
+                )
+            )
+        self._page_numbers.append(page_number)
+
+        self._content = []
+        self._page_fonts = {}
+        self._page_xobjects = {}
+        self.state.reset()
+
+    def abort(self):
+        """Stops writing the document, after an error, without ending
+        it. Any background threads are stopped, and anything still
+        waiting to be written is discarded, so the file is left
+        incomplete."""
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.abort()
+
+    def close(self):
+        """Ends the last page, if anything has been drawn on it, and
+        writes the end of the document. The file itself isn't closed.
+        A document with nothing drawn has a single empty page."""
+        if self._content or not self._page_numbers:
+            self.end_page()
+
+        self._write_object(
+            _PAGES, '<< /Type /Pages /Kids [%s] /Count %d >>' % (
+                ' '.join('%d 0 R' % number for number in self._page_numbers),
+                len(self._page_numbers)
+                )
+            )
+        self._write_object(
+            _CATALOG, '<< /Type /Catalog /Pages %d 0 R >>' % _PAGES
+            )
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+
+        xref = self._position
+        self._write(('xref\n0 %d\n0000000000 65535 f \n' % (
+            len(self._offsets) + 1
+            )).encode())
+        self._write(b''.join(
+            b'%010d 00000 n \n' % offset for offset in self._offsets
+            ))
+        self._write((
+            'trailer\n<< /Size %d /Root %d 0 R >>\n'
+            'startxref\n%d\n%%%%EOF\n' % (
+                len(self._offsets) + 1, _CATALOG, xref
+                )
+            ).encode())
@@ -0,0 +1,392 @@
+"""This module provides an output target that records what is drawn
+into a compact display list, rather than drawing it. The recording can
+then be replayed onto any other output target as many times as
+needed, or placed into a layout as an element, without laying out or
+walking the original layout tree again."""
+
+import array
+import itertools
+
+from layout.datatypes import output, Point, Rectangle
+import layout.managers.root as root
+
+# Operation codes in the display list.
+_SAVE = 0
+_RESTORE = 1
+_TRANSLATE = 2
+_SCALE = 3
+_ROTATE = 4
+_TEXT = 5
+_LINE = 6
+_RECT = 7
+_IMAGE = 8
+_POLYGON = 9
+_CLIP = 10
+_END_PAGE = 11
+_LINES = 12
+_RECTS = 13
+_POLYGONS = 14
+_TEXT_LINES = 15
+
+def _flatten(coords, n):
+    """Returns a flat list of the given coordinates, in groups of n."""
+    return list(itertools.chain.from_iterable(
+        output.group_coordinates(coords, n)
+        ))
+
+def render_to_recording(recording, papersize_tuple, layout):
+    """Renders the given layout manager into the given
+    :class:`RecordingOutput`."""
+    layout.render(
+        Rectangle(0, 0, *papersize_tuple),
+        dict(
+            output=recording,
+            minimum_size_cache={},
+            height_for_width_cache={},
+            retain_minimum_sizes=True
+            )
+        )
+
+class RecordingOutput(output.OutputTarget):
+    """
+    An output target that records every operation into a display list.
+
+    The display list is held in three arrays: one byte per operation,
+    the numeric arguments of all operations as doubles, and indices
+    into a table of the other values (text, font names, colors, dash
+    patterns and image filenames). Each distinct value is stored in
+    the table only once.
+
+    Text is measured with the ``measure_output`` given, if any, so a
+    recording made for one backend should normally be measured with
+    that backend.
+    """
+    def __init__(self, measure_output=None):
+        self.measure_output = measure_output
+        self.ops = array.array('B')
+        self.numbers = array.array('d')
+        self.refs = array.array('l')
+        self.values = []
+        self._value_indices = {}
+
+    def _ref(self, value):
+        """Adds the given value to the value table, if needed, and
+        records its index."""
+        if isinstance(value, list):
+            value = tuple(value)
+        # Keyed by type as well, so True and 1 are stored separately.
+        key = (type(value), value)
+        index = self._value_indices.get(key)
+        if index is None:
+            index = self._value_indices[key] = len(self.values)
+            self.values.append(value)
+        self.refs.append(index)
+
+    def _save_state(self):
+        self.ops.append(_SAVE)
+
+    def _restore_state(self):
+        self.ops.append(_RESTORE)
+
+    def translate(self, x, y):
+        self.ops.append(_TRANSLATE)
+        self.numbers.extend((x, y))
+
+    def scale(self, x, y):
+        self.ops.append(_SCALE)
+        self.numbers.extend((x, y))
+
+    def rotate(self, degrees):
+        self.ops.append(_ROTATE)
+        self.numbers.append(degrees)
+
+    def _get_measure_output(self):
+        if self.measure_output is None:
+            raise ValueError("This recording has no output to measure text.")
+        return self.measure_output
+
+    def text_width(self, text, *, font_name, font_size):
+        return self._get_measure_output().text_width(
+            text, font_name=font_name, font_size=font_size
+            )
+
+    def text_widths(self, strings, *, font_name, font_size):
+        return self._get_measure_output().text_widths(
+            strings, font_name=font_name, font_size=font_size
+            )
+
+    def draw_text(self, text, x, y, *, font_name, font_size, fill):
+        self.ops.append(_TEXT)
+        self.numbers.extend((x, y, font_size))
+        self._ref(text)
+        self._ref(font_name)
+        self._ref(fill)
+
+    def draw_text_lines(self, lines, *, font_name, font_size, fill):
+        lines = list(lines)
+        self.ops.append(_TEXT_LINES)
+        self.refs.append(len(lines))
+        for text, x, y in lines:
+            self.numbers.extend((x, y))
+            self._ref(text)
+        self.numbers.append(font_size)
+        self._ref(font_name)
+        self._ref(fill)
+
+    def draw_line(
+            self, x0, y0, x1, y1, *,
+            stroke,
+            stroke_width=1,
+            stroke_dash=None):
+        self.ops.append(_LINE)
+        self.numbers.extend((x0, y0, x1, y1, stroke_width))
+        self._ref(stroke)
+        self._ref(stroke_dash)
+
+    def draw_rect(
+            self, x, y, w, h, *,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        self.ops.append(_RECT)
+        self.numbers.extend((x, y, w, h, stroke_width))
+        self._ref(stroke)
+        self._ref(stroke_dash)
+        self._ref(fill)
+
+    def draw_image(self, img_filename, x, y, w, h):
+        self.ops.append(_IMAGE)
+        self.numbers.extend((x, y, w, h))
+        self._ref(img_filename)
+
+    def draw_polygon(
+            self,
+            *pts,
+            close_path=True,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        self.ops.append(_POLYGON)
+        self.refs.append(len(pts))
+        self.numbers.extend(pts)
+        self.numbers.append(stroke_width)
+        self._ref(bool(close_path))
+        self._ref(stroke)
+        self._ref(stroke_dash)
+        self._ref(fill)
+
+    def draw_lines(
+            self, coords, *,
+            stroke,
+            stroke_width=1,
+            stroke_dash=None):
+        coords = _flatten(coords, 4)
+        self.ops.append(_LINES)
+        self.refs.append(len(coords))
+        self.numbers.extend(coords)
+        self.numbers.append(stroke_width)
+        self._ref(stroke)
+        self._ref(stroke_dash)
+
+    def draw_rects(
+            self, coords, *,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        coords = _flatten(coords, 4)
+        self.ops.append(_RECTS)
+        self.refs.append(len(coords))
+        self.numbers.extend(coords)
+        self.numbers.append(stroke_width)
+        self._ref(stroke)
+        self._ref(stroke_dash)
+        self._ref(fill)
+
+    def draw_polygons(
+            self, polygons, *,
+            close_path=True,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ):
+        polygons = [_flatten(pts, 2) for pts in polygons]
+        self.ops.append(_POLYGONS)
+        self.refs.append(len(polygons))
+        for pts in polygons:
+            self.refs.append(len(pts))
+            self.numbers.extend(pts)
+        self.numbers.append(stroke_width)
+        self._ref(bool(close_path))
+        self._ref(stroke)
+        self._ref(stroke_dash)
+        self._ref(fill)
+
+    def clip_rect(self, x, y, w, h):
+        self.ops.append(_CLIP)
+        self.numbers.extend((x, y, w, h))
+
+    def end_page(self):
+        self.ops.append(_END_PAGE)
+
+    def replay(self, output_target):
+        """Performs every recorded operation on the given output
+        target."""
+        numbers = self.numbers
+        refs = self.refs
+        values = self.values
+        n = r = 0
+        for op in self.ops:
+            if op == _SAVE:
+                output_target._save_state()
+            elif op == _RESTORE:
+                output_target._restore_state()
+            elif op == _TRANSLATE:
+                output_target.translate(numbers[n], numbers[n+1])
+                n += 2
+            elif op == _SCALE:
+                output_target.scale(numbers[n], numbers[n+1])
+                n += 2
+            elif op == _ROTATE:
+                output_target.rotate(numbers[n])
+                n += 1
+            elif op == _TEXT:
+                output_target.draw_text(
+                    values[refs[r]], numbers[n], numbers[n+1],
+                    font_name=values[refs[r+1]],
+                    font_size=numbers[n+2],
+                    fill=values[refs[r+2]]
+                    )
+                n += 3
+                r += 3
+            elif op == _LINE:
+                output_target.draw_line(
+                    *numbers[n:n+4],
+                    stroke=values[refs[r]],
+                    stroke_width=numbers[n+4],
+                    stroke_dash=values[refs[r+1]]
+                    )
+                n += 5
+                r += 2
+            elif op == _RECT:
+                output_target.draw_rect(
+                    *numbers[n:n+4],
+                    stroke=values[refs[r]],
+                    stroke_width=numbers[n+4],
+                    stroke_dash=values[refs[r+1]],
+                    fill=values[refs[r+2]]
+                    )
+                n += 5
+                r += 3
+            elif op == _IMAGE:
+                output_target.draw_image(
+                    values[refs[r]], *numbers[n:n+4]
+                    )
+                n += 4
+                r += 1
+            elif op == _POLYGON:
+                num_pts = refs[r]
+                output_target.draw_polygon(
+                    *numbers[n:n+num_pts],
+                    close_path=values[refs[r+1]],
+                    stroke=values[refs[r+2]],
+                    stroke_width=numbers[n+num_pts],
+                    stroke_dash=values[refs[r+3]],
+                    fill=values[refs[r+4]]
+                    )
+                n += num_pts + 1
+                r += 5
+            elif op == _CLIP:
+                output_target.clip_rect(*numbers[n:n+4])
+                n += 4
+            elif op == _TEXT_LINES:
+                num_lines = refs[r]
+                lines = [
+                    (values[refs[r+1+i]], numbers[n+2*i], numbers[n+2*i+1])
+                    for i in range(num_lines)
+                    ]
+                n += 2*num_lines
+                r += 1 + num_lines
+                output_target.draw_text_lines(
+                    lines,
+                    font_name=values[refs[r]],
+                    font_size=numbers[n],
+                    fill=values[refs[r+1]]
+                    )
+                n += 1
+                r += 2
+            elif op == _LINES:
+                num_coords = refs[r]
+                output_target.draw_lines(
+                    numbers[n:n+num_coords],
+                    stroke=values[refs[r+1]],
+                    stroke_width=numbers[n+num_coords],
+                    stroke_dash=values[refs[r+2]]
+                    )
+                n += num_coords + 1
+                r += 3
+            elif op == _RECTS:
+                num_coords = refs[r]
+                output_target.draw_rects(
+                    numbers[n:n+num_coords],
+                    stroke=values[refs[r+1]],
+                    stroke_width=numbers[n+num_coords],
+                    stroke_dash=values[refs[r+2]],
+                    fill=values[refs[r+3]]
+                    )
+                n += num_coords + 1
+                r += 4
+            elif op == _POLYGONS:
+                num_polygons = refs[r]
+                r += 1
+                polygons = []
+                for num_pts in refs[r:r+num_polygons]:
+                    polygons.append(numbers[n:n+num_pts])
+                    n += num_pts
+                r += num_polygons
+                output_target.draw_polygons(
+                    polygons,
+                    close_path=values[refs[r]],
+                    stroke=values[refs[r+1]],
+                    stroke_width=numbers[n],
+                    stroke_dash=values[refs[r+2]],
+                    fill=values[refs[r+3]]
+                    )
+                n += 1
+                r += 4
+            else:
+                assert op == _END_PAGE
+                output_target.end_page()
+
+class RecordedElement(root.LayoutElement):
+    """
+    Displays a :class:`RecordingOutput` as an element in a layout, for
+    example to place one recorded page into many imposition slots.
+
+    The recording is scaled to fit the space it is given, keeping the
+    aspect ratio of the size it was recorded at. The recording should
+    not contain page breaks.
+    """
+    def __init__(self, recording, papersize_tuple):
+        self.recording = recording
+        self.size = Point(*papersize_tuple)
+
+    def get_minimum_size(self, data):
+        return self.size
+
+    def render(self, rect, data):
+        scale = min(rect.w / self.size.x, rect.h / self.size.y)
+        extra_x = (rect.w - self.size.x * scale) * 0.5
+        extra_y = (rect.h - self.size.y * scale) * 0.5
+
+        c = data['output']
+        with c:
+            c.translate(rect.x + extra_x, rect.y + extra_y)
+            c.scale(scale, scale)
+            self.recording.replay(c)
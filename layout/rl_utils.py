@@ -3,11 +3,18 @@ more pages of a reportlab canvas. To create multi-page documents, use
 the :class:`layout.pages.output.PagesLM` class to wrap a series of
 single-page managers."""
 
+import concurrent.futures
+import math
+import os
+import shutil
+import tempfile
+
 from layout.datatypes import output, Point, Rectangle
 import layout.managers.root as root
 
 try:
     from reportlab.pdfgen.canvas import Canvas
+    from reportlab.pdfbase.pdfmetrics import stringWidth
 except ImportError:
     import warnings
     warnings.warn(
@@ -15,31 +22,81 @@ except ImportError:
         ImportWarning
         )
 
-def render_to_reportlab_canvas(rl_canvas, papersize_tuple, layout):
-    """Renders the given layout manager on a page of the given canvas."""
+def render_to_reportlab_canvas(rl_canvas, papersize_tuple, layout,
+                               pages=None):
+    """Renders the given layout manager on a page of the given canvas.
+
+    If ``pages`` is given, only the pages of a
+    :class:`layout.pages.output.PagesLM` whose zero-based indices it
+    contains are output."""
     rl_canvas.setPageSize(papersize_tuple)
     layout.render(
         Rectangle(0, 0, *papersize_tuple),
-        dict(output=ReportlabOutput(rl_canvas))
+        dict(
+            output=ReportlabOutput(rl_canvas),
+            minimum_size_cache={},
+            height_for_width_cache={},
+            retain_minimum_sizes=True,
+            pages=pages
+            )
         )
 
-def render_to_reportlab_document(output_filename, papersize_tuple, layout):
-    """Create and save a document with contents of the given layout manager."""
+def render_to_reportlab_document(output_filename, papersize_tuple, layout,
+                                 pages=None):
+    """Create and save a document with contents of the given layout
+    manager, optionally only the given pages."""
     c = Canvas(output_filename, papersize_tuple)
-    render_to_reportlab_canvas(c, papersize_tuple, layout)
+    render_to_reportlab_canvas(c, papersize_tuple, layout, pages)
     c.save()
 
+# ReportLab's code for the nonzero winding fill rule.
+_FILL_NON_ZERO = 1
+
+def _unit_string_width(text, font_name):
+    return stringWidth(text, font_name, 1)
+
 class ReportlabOutput(output.OutputTarget):
-    """An output adapter for ReportLab."""
+    """An output adapter for ReportLab.
+
+    The font, colors, line width and dash pattern are tracked in a
+    :class:`layout.datatypes.output.GraphicsState`, and only set on the
+    canvas when they change, so shapes are drawn without saving and
+    restoring the canvas state around each one.
+
+    Text widths are held in :attr:`text_width_cache` and
+    :attr:`glyph_widths`, which are shared by every instance of this
+    class. If a ``metrics`` object, such as a
+    :class:`layout.metrics.FontMetrics`, is given, text is measured
+    with that instead.
+    """
 
-    def __init__(self, rl_canvas):
+    #: The :class:`layout.datatypes.output.TextWidthCache` used to
+    #: measure text.
+    text_width_cache = output.TextWidthCache()
+
+    #: The :class:`layout.datatypes.output.GlyphWidths` used to
+    #: measure batches of text.
+    glyph_widths = output.GlyphWidths()
+
+    def __init__(self, rl_canvas, metrics=None):
         self.c = rl_canvas
+        self.metrics = metrics
+        self.state = output.GraphicsState()
+
+        # The name of each stored form, by key, the settings of the
+        # pages or forms that the forms being stored are inside, and
+        # the number of forms begun, which numbers their names.
+        self._forms = {}
+        self._form_stack = []
+        self._form_count = 0
 
     def _save_state(self):
         self.c.saveState()
+        self.state.save()
 
     def _restore_state(self):
         self.c.restoreState()
+        self.state.restore()
 
     def translate(self, x, y):
         self.c.translate(x, y)
@@ -51,28 +108,70 @@ class ReportlabOutput(output.OutputTarget):
         self.c.rotate(degrees)
 
     def text_width(self, text, *, font_name, font_size):
-        return self.c.stringWidth(text, font_name, font_size)
+        if self.metrics is not None:
+            return self.metrics.text_width(
+                text, font_name=font_name, font_size=font_size
+                )
+        return self.text_width_cache.get_width(
+            text, font_name, font_size, _unit_string_width
+            )
+
+    def text_widths(self, strings, *, font_name, font_size):
+        if self.metrics is not None:
+            return self.metrics.text_widths(
+                strings, font_name=font_name, font_size=font_size
+                )
+        return self.glyph_widths.get_widths(
+            strings, font_name, font_size, _unit_string_width
+            )
+
+    def _set_fill(self, fill):
+        if self.state.changed('fill', fill):
+            self.c.setFillColorRGB(*fill)
+
+    def _set_stroke(self, stroke, stroke_width, stroke_dash):
+        c = self.c
+        state = self.state
+        if state.changed('stroke', stroke):
+            c.setStrokeColorRGB(*stroke)
+        if state.changed('stroke_width', stroke_width):
+            c.setLineWidth(stroke_width)
+        stroke_dash = tuple(stroke_dash or ())
+        if state.changed('stroke_dash', stroke_dash):
+            c.setDash(stroke_dash)
 
     def draw_text(self, text, x, y, *, font_name, font_size, fill):
         c = self.c
-        c.saveState()
-        c.setFont(font_name, font_size)
-        c.setFillColorRGB(*fill)
+        if self.state.changed('font', (font_name, font_size)):
+            c.setFont(font_name, font_size)
+        self._set_fill(fill)
         c.drawString(x, y, text)
-        c.restoreState()
+
+    def draw_text_lines(self, lines, *, font_name, font_size, fill):
+        """Draws the given lines as a single text object, moving from
+        the start of each line to the next."""
+        c = self.c
+        if self.state.changed('font', (font_name, font_size)):
+            c.setFont(font_name, font_size)
+        self._set_fill(fill)
+        t = None
+        for text, x, y in lines:
+            if t is None:
+                t = c.beginText(x, y)
+            else:
+                t.moveCursor(x - last_x, last_y - y)
+            t.textOut(text)
+            last_x, last_y = x, y
+        if t is not None:
+            c.drawText(t)
 
     def draw_line(
             self, x0, y0, x1, y1, *,
             stroke,
             stroke_width=1,
             stroke_dash=None):
-        c = self.c
-        c.saveState()
-        c.setStrokeColorRGB(*stroke)
-        c.setLineWidth(stroke_width)
-        c.setDash(stroke_dash)
-        c.line(x0, y0, x1, y1)
-        c.restoreState()
+        self._set_stroke(stroke, stroke_width, stroke_dash)
+        self.c.line(x0, y0, x1, y1)
 
     def draw_rect(
             self, x, y, w, h, *,
@@ -81,16 +180,13 @@ class ReportlabOutput(output.OutputTarget):
             stroke_dash=None,
             fill=None
             ) -> None:
-        c = self.c
-        c.saveState()
         if stroke is not None:
-            c.setStrokeColorRGB(*stroke)
-            c.setLineWidth(stroke_width)
-            c.setDash(stroke_dash)
+            self._set_stroke(stroke, stroke_width, stroke_dash)
         if fill is not None:
-            c.setFillColorRGB(*fill)
-        c.rect(x,y, w,h, stroke=(stroke is not None), fill=(fill is not None))
-        c.restoreState()
+            self._set_fill(fill)
+        self.c.rect(
+            x,y, w,h, stroke=(stroke is not None), fill=(fill is not None)
+            )
 
     def draw_image(self, img_filename, x, y, w, h):
         self.c.drawImage(img_filename, x, y, w, h)
@@ -106,14 +202,10 @@ class ReportlabOutput(output.OutputTarget):
             ) -> None:
         """Draws the given polygon."""
         c = self.c
-        c.saveState()
-
         if stroke is not None:
-            c.setStrokeColorRGB(*stroke)
-            c.setLineWidth(stroke_width)
-            c.setDash(stroke_dash)
+            self._set_stroke(stroke, stroke_width, stroke_dash)
         if fill is not None:
-            c.setFillColorRGB(*fill)
+            self._set_fill(fill)
 
         p = c.beginPath()
         fn = p.moveTo
@@ -124,10 +216,101 @@ class ReportlabOutput(output.OutputTarget):
             p.close()
 
         c.drawPath(p, stroke=(stroke is not None), fill=(fill is not None))
-        c.restoreState()
+
+    def draw_lines(
+            self, coords, *,
+            stroke,
+            stroke_width=1,
+            stroke_dash=None):
+        """Draws the given lines as a single path."""
+        c = self.c
+        self._set_stroke(stroke, stroke_width, stroke_dash)
+        p = c.beginPath()
+        for x0, y0, x1, y1 in output.group_coordinates(coords, 4):
+            p.moveTo(x0, y0)
+            p.lineTo(x1, y1)
+        c.drawPath(p, stroke=True, fill=False)
+
+    def draw_rects(
+            self, coords, *,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ) -> None:
+        """Draws the given rectangles as a single path."""
+        c = self.c
+        if stroke is not None:
+            self._set_stroke(stroke, stroke_width, stroke_dash)
+        if fill is not None:
+            self._set_fill(fill)
+        p = c.beginPath()
+        for x, y, w, h in output.group_coordinates(coords, 4):
+            p.rect(x, y, w, h)
+        c.drawPath(
+            p, stroke=(stroke is not None), fill=(fill is not None),
+            fillMode=_FILL_NON_ZERO
+            )
+
+    def draw_polygons(
+            self, polygons, *,
+            close_path=True,
+            stroke=None,
+            stroke_width=1,
+            stroke_dash=None,
+            fill=None
+            ) -> None:
+        """Draws the given polygons, setting their style once."""
+        c = self.c
+        if stroke is not None:
+            self._set_stroke(stroke, stroke_width, stroke_dash)
+        if fill is not None:
+            self._set_fill(fill)
+        for pts in polygons:
+            p = c.beginPath()
+            fn = p.moveTo
+            for x,y in output.group_coordinates(pts, 2):
+                fn(x, y)
+                fn = p.lineTo
+            if close_path:
+                p.close()
+            c.drawPath(
+                p, stroke=(stroke is not None), fill=(fill is not None)
+                )
+
+    def has_form(self, key):
+        return key in self._forms
+
+    def begin_form(self, key, w, h):
+        """Starts a ReportLab form, which is written to the document
+        once, as a form XObject."""
+        self._form_count += 1
+        name = 'LayoutForm%d' % self._form_count
+        self._form_stack.append((key, name, self.state))
+        self.state = output.GraphicsState()
+        self.c.beginForm(name, 0, 0, w, h)
+        return True
+
+    def end_form(self):
+        key, name, self.state = self._form_stack.pop()
+        self.c.endForm()
+        self._forms[key] = name
+
+    def discard_form(self):
+        """Ends the form without storing it. ReportLab still writes it
+        to the document, but nothing draws it."""
+        _, _, self.state = self._form_stack.pop()
+        self.c.endForm()
+
+    def forget_form(self, key):
+        self._forms.pop(key, None)
+
+    def draw_form(self, key):
+        self.c.doForm(self._forms[key])
 
     def end_page(self):
         self.c.showPage()
+        self.state.reset()
 
     def clip_rect(self, x, y, w, h):
         c = self.c
@@ -144,7 +327,7 @@ class ReportlabOutput(output.OutputTarget):
 # ----------------------------------------------------------------------
 
 try:
-    from pdfrw import PdfReader
+    from pdfrw import PdfReader, PdfWriter
     from pdfrw.buildxobj import pagexobj
     from pdfrw.toreportlab import makerl
 except ImportError:
@@ -191,3 +374,99 @@ class PDFImage(root.LayoutElement):
         c.translate(page.BBox[0], page.BBox[1])
         c.doForm(makerl(c, page))
         c.restoreState()
+
+# ----------------------------------------------------------------------
+# Parallel rendering.
+# ----------------------------------------------------------------------
+
+def _render_chunk(render_document, filename, papersize_tuple, create_layout,
+                  pages):
+    """Renders the given pages of a new layout to their own document.
+    Runs in a worker process."""
+    render_document(filename, papersize_tuple, create_layout(), pages)
+    return filename
+
+def merge_documents(output_filename, filenames):
+    """Saves the pages of each of the given PDF files, in order, as one
+    document."""
+    writer = PdfWriter()
+    for filename in filenames:
+        writer.addpages(PdfReader(filename).pages)
+    writer.write(output_filename)
+
+def render_to_document_in_parallel(
+        output_filename, papersize_tuple, create_layout, num_pages, *,
+        render_document=render_to_reportlab_document,
+        pages_per_chunk=None,
+        max_workers=None,
+        merge=merge_documents):
+    """
+    Renders a multi-page document using a pool of worker processes,
+    each rendering a chunk of consecutive pages to its own document.
+    The chunks are then merged, in order, into the output file.
+
+    Layouts can't be sent between processes, so each worker calls
+    ``create_layout`` to build its own copy. It must take no arguments
+    and return a layout whose pages can be selected, such as a
+    :class:`layout.pages.output.PagesLM`. Each worker only makes and
+    draws the pages in its chunk, so it is best given a function that
+    makes each page on demand, for example::
+
+        def create_layout():
+            return PagesLM(create_page, num_pages=10000)
+
+    Both functions must be defined at the top level of a module, so
+    they can be sent to the workers.
+
+    Arguments:
+
+    ``create_layout``
+        A function that returns the layout to render.
+
+    ``num_pages``
+        The number of pages in the layout.
+
+    ``render_document``
+        The function used to render each chunk, which takes the same
+        arguments as :func:`render_to_reportlab_document` (the default).
+        Use :func:`layout.cairo_utils.render_to_cairo_document` to
+        render with Cairo.
+
+    ``pages_per_chunk``
+        The number of pages each worker renders at a time. By default
+        the pages are split into four chunks per worker, so that
+        workers that finish early can take on more.
+
+    ``max_workers``
+        The number of worker processes (default: the number of CPUs).
+
+    ``merge``
+        The function used to join the chunks into the output file,
+        which takes the same arguments as :func:`merge_documents` (the
+        default, which needs pdfrw).
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if pages_per_chunk is None:
+        pages_per_chunk = max(1, math.ceil(num_pages / (max_workers * 4)))
+
+    directory = tempfile.mkdtemp()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers) as executor:
+            futures = [
+                executor.submit(
+                    _render_chunk,
+                    render_document,
+                    os.path.join(directory, 'chunk-%06d.pdf' % index),
+                    papersize_tuple,
+                    create_layout,
+                    range(start, min(start + pages_per_chunk, num_pages))
+                    )
+                for index, start in enumerate(
+                    range(0, num_pages, pages_per_chunk)
+                    )
+                ]
+            filenames = [future.result() for future in futures]
+        merge(output_filename, filenames)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,82 @@
+import unittest
+from unittest import mock
+from layout import cairo_utils
+
+class StubContext(object):
+    """Records the calls made to a Cairo context."""
+    def __init__(self):
+        self.calls = []
+    def __getattr__(self, name):
+        def record(*args):
+            self.calls.append((name,) + args)
+        return record
+
+class StubCairo(object):
+    @staticmethod
+    def Matrix(*args):
+        return ('Matrix',) + args
+
+class TestCairoState(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(
+            cairo_utils, 'cairo', StubCairo, create=True
+            )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.context = StubContext()
+        self.output = cairo_utils.CairoOutput(self.context)
+
+    def _settings(self):
+        return [
+            call for call in self.context.calls
+            if call[0].startswith('set') or call[0] == 'select_font_face'
+            ]
+
+    def test_settings_sent_once(self):
+        o = self.output
+        o.draw_text('a', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_text('b', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        # Fills and strokes share the source color.
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        o.draw_line(0, 0, 1, 1, stroke=(0,0,1), stroke_dash=None)
+        o.draw_line(0, 0, 1, 1, stroke=(0,0,1), stroke_dash=())
+        self.assertEqual(self._settings(), [
+            ('select_font_face', 'Courier'),
+            ('set_font_matrix', ('Matrix', 10, 0, 0, -10, 0, 0)),
+            ('set_source_rgb', 1, 0, 0),
+            ('set_source_rgb', 0, 0, 1),
+            ('set_line_width', 1),
+            ('set_dash', ())
+            ])
+
+    def test_save_and_restore(self):
+        o = self.output
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        with o:
+            o.draw_rect(0, 0, 1, 1, fill=(0,1,0))
+            o.draw_rect(0, 0, 1, 1, fill=(0,1,0))
+        # The context is back to red, so it isn't sent again...
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        # ...but green must be.
+        o.draw_rect(0, 0, 1, 1, fill=(0,1,0))
+        self.assertEqual([
+            call for call in self.context.calls
+            if call[0] in ('save', 'restore', 'set_source_rgb')
+            ], [
+            ('set_source_rgb', 1, 0, 0),
+            ('save',),
+            ('set_source_rgb', 0, 1, 0),
+            ('restore',),
+            ('set_source_rgb', 0, 1, 0)
+            ])
+
+    def test_end_page_resets(self):
+        o = self.output
+        o.draw_text('a', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_line(0, 0, 1, 1, stroke=(1,0,0), stroke_width=2)
+        o.end_page()
+        o.draw_text('a', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_line(0, 0, 1, 1, stroke=(1,0,0), stroke_width=2)
+        settings = self._settings()
+        self.assertEqual(len(settings), 10)
+        self.assertEqual(settings[:5], settings[5:])
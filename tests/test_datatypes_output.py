@@ -0,0 +1,103 @@
+import array
+import unittest
+from layout.datatypes.output import *
+
+class TestTextWidthCache(unittest.TestCase):
+    def setUp(self):
+        self.measured = []
+
+    def _measure(self, text, font_name):
+        self.measured.append((font_name, text))
+        return len(text) * 0.5
+
+    def test_scaled_by_font_size(self):
+        cache = TextWidthCache()
+        self.assertEqual(cache.get_width('abcd', 'F', 10, self._measure), 20)
+        self.assertEqual(cache.get_width('abcd', 'F', 2, self._measure), 4)
+        self.assertEqual(self.measured, [('F', 'abcd')])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_keyed_by_font(self):
+        cache = TextWidthCache()
+        cache.get_width('abcd', 'F', 10, self._measure)
+        cache.get_width('abcd', 'G', 10, self._measure)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.misses, 2)
+
+    def test_least_recently_used_discarded(self):
+        cache = TextWidthCache(max_size=2)
+        cache.get_width('a', 'F', 1, self._measure)
+        cache.get_width('b', 'F', 1, self._measure)
+        cache.get_width('a', 'F', 1, self._measure)
+        cache.get_width('c', 'F', 1, self._measure)
+        self.assertEqual(len(cache), 2)
+        cache.get_width('a', 'F', 1, self._measure)
+        cache.get_width('b', 'F', 1, self._measure)
+        self.assertEqual(
+            self.measured, [('F', 'a'), ('F', 'b'), ('F', 'c'), ('F', 'b')]
+            )
+
+    def test_clear(self):
+        cache = TextWidthCache()
+        cache.get_width('a', 'F', 1, self._measure)
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+class TestGlyphWidths(unittest.TestCase):
+    def setUp(self):
+        self.measured = []
+
+    def _measure(self, character, font_name):
+        self.measured.append(character)
+        return 0.5 if character == ' ' else 0.25
+
+    def test_widths(self):
+        glyphs = GlyphWidths()
+        widths = glyphs.get_widths(['ab', 'b a', ''], 'F', 4, self._measure)
+        self.assertEqual(list(widths), [2, 4, 0])
+        self.assertEqual(sorted(self.measured), [' ', 'a', 'b'])
+
+    def test_characters_measured_once(self):
+        glyphs = GlyphWidths()
+        glyphs.get_widths(['ab'], 'F', 1, self._measure)
+        glyphs.get_widths(['abc', 'ba'], 'F', 1, self._measure)
+        glyphs.get_widths(['ab'], 'G', 1, self._measure)
+        self.assertEqual(sorted(self.measured), ['a', 'a', 'b', 'b', 'c'])
+
+class TestGraphicsState(unittest.TestCase):
+    def test_changed(self):
+        state = GraphicsState()
+        self.assertTrue(state.changed('fill', (0, 0, 0)))
+        self.assertFalse(state.changed('fill', (0, 0, 0)))
+        self.assertTrue(state.changed('fill', (1, 0, 0)))
+
+    def test_restore(self):
+        state = GraphicsState()
+        state.changed('fill', (0, 0, 0))
+        state.save()
+        state.changed('fill', (1, 0, 0))
+        state.changed('stroke', (1, 0, 0))
+        state.restore()
+        self.assertFalse(state.changed('fill', (0, 0, 0)))
+        self.assertTrue(state.changed('stroke', (1, 0, 0)))
+
+    def test_reset(self):
+        state = GraphicsState()
+        state.changed('fill', (0, 0, 0))
+        state.reset()
+        self.assertTrue(state.changed('fill', (0, 0, 0)))
+
+class TestGroupCoordinates(unittest.TestCase):
+    def test_groups(self):
+        self.assertEqual(
+            list(group_coordinates([1, 2, 3, 4, 5, 6], 2)),
+            [(1, 2), (3, 4), (5, 6)]
+            )
+
+    def test_flattens_arrays_with_shape(self):
+        class Array2D(object):
+            def ravel(self):
+                return array.array('d', [1, 2, 3, 4])
+        self.assertEqual(
+            list(group_coordinates(Array2D(), 4)), [(1, 2, 3, 4)]
+            )
@@ -0,0 +1,23 @@
+import unittest
+from layout.elements.lines import *
+from layout.datatypes import *
+
+class ListOutput(object):
+    def __init__(self):
+        self.calls = []
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+    def __enter__(self):
+        self._save_state()
+    def __exit__(self, type, value, traceback):
+        self._restore_state()
+
+class TestBorder(unittest.TestCase):
+    def test_partial_border_drawn_together(self):
+        output = ListOutput()
+        Border(top=False, left=False).render(
+            Rectangle(0, 0, 10, 20), dict(output=output)
+            )
+        self.assertEqual(output.calls[1], ('draw_lines', (
+            [10, 20, 10, 0, 10, 0, 0, 0],
+            ), dict(stroke=(0, 0, 0), stroke_width=1, stroke_dash=None)))
@@ -0,0 +1,331 @@
+import gc
+import unittest
+import weakref
+from layout.elements.text import *
+from layout.elements.space import *
+from layout.managers.box import *
+from layout.managers.directional import *
+from layout.managers.grid import *
+from layout.datatypes import *
+from layout.metrics import FontMetrics
+
+TEXT = (
+    "Aaa bb cc ddddd eee f ggggg hh iiiii jjj kk llll mmmmmm n oo "
+    "ppp qqqqq rr ssss t uuuuu vv www xxxxx yy zzz"
+    )
+
+class TestParagraphBreaking(unittest.TestCase):
+    def setUp(self):
+        self.data = dict(output=FontMetrics())
+
+    def _paragraph(self, text, width, **kwargs):
+        # Courier is 6 points per character at this size.
+        return Paragraph(text, width, font_name='Courier', font_size=10,
+                         paragraph_indent=False, **kwargs)
+
+    def _lines(self, paragraph):
+        paragraph.get_minimum_size(self.data)
+        return [' '.join(line) for line in paragraph._layout]
+
+    def test_greedy(self):
+        p = self._paragraph('aaa bb cc ddddd', 36)
+        self.assertEqual(self._lines(p), ['aaa bb', 'cc', 'ddddd'])
+
+    def test_optimal(self):
+        p = self._paragraph('aaa bb cc ddddd', 36,
+                            line_breaking=Paragraph.BREAK_OPTIMAL)
+        self.assertEqual(self._lines(p), ['aaa', 'bb cc', 'ddddd'])
+        self.assertEqual(p.get_minimum_size(self.data).y, 10 + 2*13)
+
+    def test_optimal_keeps_words(self):
+        p = self._paragraph(TEXT, 120, line_breaking=Paragraph.BREAK_OPTIMAL)
+        lines = self._lines(p)
+        self.assertEqual(' '.join(lines), TEXT)
+        self.assertTrue(max(len(line) for line in lines) <= 20)
+
+    def test_optimal_overlong_word(self):
+        p = self._paragraph('a bbbbbbbbbbbbbbbb c', 60,
+                            line_breaking=Paragraph.BREAK_OPTIMAL)
+        self.assertEqual(self._lines(p), ['a', 'bbbbbbbbbbbbbbbb', 'c'])
+
+    def test_changing_mode_relayouts(self):
+        p = self._paragraph('aaa bb cc ddddd', 36)
+        self.assertEqual(len(self._lines(p)[1]), 2)
+        p.line_breaking = Paragraph.BREAK_OPTIMAL
+        self.assertEqual(len(self._lines(p)[1]), 5)
+
+class CountingMetrics(FontMetrics):
+    def __init__(self):
+        super().__init__()
+        self.measured = 0
+    def text_widths(self, strings, **kwargs):
+        self.measured += len(strings)
+        return super().text_widths(strings, **kwargs)
+
+class TestParagraphLayoutCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ParagraphLayoutCache(max_size=2)
+        self.data = dict(output=CountingMetrics())
+
+    def _paragraph(self, text, width=100, **kwargs):
+        p = Paragraph(text, width, **kwargs)
+        p.layout_cache = self.cache
+        return p
+
+    def test_shared_between_paragraphs(self):
+        first = self._paragraph(TEXT)
+        second = self._paragraph(TEXT)
+        size = first.get_minimum_size(self.data)
+        measured = self.data['output'].measured
+        self.assertEqual(second.get_minimum_size(self.data), size)
+        self.assertEqual(second._layout, first._layout)
+        self.assertEqual(self.data['output'].measured, measured)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_geometry_in_key(self):
+        self._paragraph(TEXT).get_minimum_size(self.data)
+        self._paragraph(TEXT, leading=2).get_minimum_size(self.data)
+        self._paragraph(TEXT, 200).get_minimum_size(self.data)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 3))
+
+    def test_least_recently_used_discarded(self):
+        for text in ('a', 'b', 'a', 'c', 'a', 'b'):
+            self._paragraph(text).get_minimum_size(self.data)
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 4))
+
+class DrawingMetrics(CountingMetrics):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+    def __enter__(self):
+        pass
+    def __exit__(self, type, value, traceback):
+        pass
+    def draw_text(self, text, x, y, **kwargs):
+        self.lines.append(text)
+    def draw_text_lines(self, lines, **kwargs):
+        for text, x, y in lines:
+            self.draw_text(text, x, y, **kwargs)
+
+class TestHeightForWidth(unittest.TestCase):
+    def setUp(self):
+        self.data = dict(output=DrawingMetrics(), minimum_size_cache={})
+
+    def _paragraph(self):
+        # Four lines at its own width, two at twice that.
+        p = Paragraph('aaa bb cc ddddd ee ff', 36, font_name='Courier',
+                      font_size=10, paragraph_indent=False)
+        p.layout_cache = ParagraphLayoutCache()
+        return p
+
+    def test_memoized_per_width(self):
+        p = self._paragraph()
+        self.assertEqual(p.get_height_for_width(72, self.data), 23)
+        self.assertEqual(p.get_height_for_width(36, self.data), 49)
+        measured = self.data['output'].measured
+        self.assertEqual(p.get_height_for_width(72, self.data), 23)
+        self.assertEqual(self.data['output'].measured, measured)
+        self.assertEqual(p.get_minimum_size(self.data), Point(36, 49))
+
+    def test_memo_bounded(self):
+        p = self._paragraph()
+        for width in range(36, 136):
+            p.get_height_for_width(width, self.data)
+        self.assertEqual(len(p._width_layouts), p._max_width_layouts)
+
+    def test_memo_cleared_on_change(self):
+        p = self._paragraph()
+        p.get_height_for_width(72, self.data)
+        p.text = 'aaa'
+        self.assertEqual(p.get_height_for_width(72, self.data), 10)
+
+    def test_vertical(self):
+        p = self._paragraph()
+        other = self._paragraph()
+        lm = VerticalLM(vertical_align=VerticalLM.ALIGN_TOP,
+                        elements=[p, other])
+        self.assertEqual(lm.get_height_for_width(72, self.data), 46)
+        lm.render(Rectangle(0, 0, 72, 100), self.data)
+        self.assertEqual(self.data['output'].lines, [
+            'aaa bb cc', 'ddddd ee ff'
+            ] * 2)
+
+    def test_vertical_without_growth(self):
+        lm = VerticalLM(horizontal_align=VerticalLM.ALIGN_LEFT,
+                        elements=[self._paragraph()])
+        self.assertEqual(lm.get_height_for_width(72, self.data), 49)
+
+    def test_box(self):
+        lm = BoxLM(margin=2, top=self._paragraph(), center=self._paragraph(),
+                   left=Spacer(12, 10))
+        # The center is 72 - 12 - 2 wide, so breaks into three lines.
+        self.assertEqual(lm.get_height_for_width(72, self.data),
+                         23 + 2 + 36)
+
+    def test_grid(self):
+        lm = GridLM()
+        lm.add_element(self._paragraph(), 0, 0)
+        lm.add_element(self._paragraph(), 0, 1)
+        self.assertEqual(lm.get_height_for_width(72, self.data), 46)
+
+class TestIncrementalBreaking(unittest.TestCase):
+    def setUp(self):
+        self.data = dict(output=CountingMetrics())
+
+    def _paragraph(self, text, font_name='Courier'):
+        p = Paragraph(text, 60, font_name=font_name, font_size=10)
+        p.layout_cache = ParagraphLayoutCache()
+        p.get_minimum_size(self.data)
+        return p
+
+    def _check_edit(self, p, text):
+        measured = self.data['output'].measured
+        p.text = text
+        size = p.get_minimum_size(self.data)
+        measured = self.data['output'].measured - measured
+        fresh = self._paragraph(text, p.font_name)
+        self.assertEqual(p._layout, fresh._layout)
+        self.assertEqual(size, fresh.get_minimum_size(self.data))
+        return measured
+
+    def test_only_edited_words_measured(self):
+        p = self._paragraph(TEXT)
+        self.assertEqual(self._check_edit(p, TEXT.replace('mmmmmm', 'm')), 1)
+
+    def test_edit_pulls_word_onto_previous_line(self):
+        p = self._paragraph('aaaa bbbbbbb cc dd')
+        self._check_edit(p, 'aaaa b cc dd')
+
+    def test_insert_and_delete(self):
+        p = self._paragraph(TEXT)
+        self._check_edit(p, 'xxxxxxxxxxxxxxxxxxx ' + TEXT)
+        self._check_edit(p, TEXT[20:])
+        self._check_edit(p, TEXT + ' z')
+        self._check_edit(p, '')
+
+    def test_font_change_remeasures(self):
+        p = self._paragraph(TEXT)
+        p.font_name = 'Helvetica'
+        self.assertEqual(self._check_edit(p, TEXT), len(TEXT.split()))
+
+class TestTextFlow(unittest.TestCase):
+    def setUp(self):
+        self.data = dict(output=DrawingMetrics())
+
+    def _flow(self, text):
+        # Lines are 10 points high, 13 apart, so three fit in 36 points,
+        # and each holds up to 10 characters.
+        return TextFlow(text, font_name='Courier', font_size=10,
+                        paragraph_indent=False)
+
+    def _create_page(self, flow):
+        return EqualColumnsLM(margin=10, elements=[
+            flow.create_frame(), flow.create_frame()
+            ])
+
+    def test_columns(self):
+        flow = self._flow(TEXT)
+        self._create_page(flow).render(Rectangle(0, 0, 130, 36), self.data)
+        lines = self.data['output'].lines
+        self.assertEqual(len(lines), 6)
+        self.assertTrue(TEXT.startswith(' '.join(lines)))
+        self.assertFalse(flow.is_finished())
+
+    def test_pages(self):
+        flow = self._flow(TEXT + '\n\n' + TEXT)
+        pages = 0
+        for page in flow.iter_pages(self._create_page):
+            page.render(Rectangle(0, 0, 130, 36), self.data)
+            pages += 1
+        lines = self.data['output'].lines
+        self.assertEqual(pages, (len(lines) + 5) // 6)
+        self.assertEqual(' '.join(lines), TEXT + ' ' + TEXT)
+        # The second paragraph starts on a new line.
+        self.assertTrue(lines[-(len(lines)//2)].startswith('Aaa'))
+
+    def _render_pages(self, flow):
+        pages = 0
+        del self.data['output'].lines[:]
+        for page in flow.iter_pages(self._create_page):
+            page.render(Rectangle(0, 0, 130, 36), self.data)
+            pages += 1
+        return pages, self.data['output'].lines[:]
+
+    def test_pages_rendered_twice(self):
+        flow = self._flow(TEXT + '\n\n' + TEXT)
+        first = self._render_pages(flow)
+        self.assertEqual(self._render_pages(flow), first)
+
+    def test_pages_after_change(self):
+        flow = self._flow(TEXT)
+        pages, lines = self._render_pages(flow)
+        flow.font_size = 5
+        smaller_pages, smaller_lines = self._render_pages(flow)
+        self.assertTrue(smaller_pages < pages)
+        self.assertEqual(' '.join(smaller_lines), TEXT)
+
+    def test_lazy_measurement(self):
+        flow = self._flow(TEXT * 100)
+        self._create_page(flow).render(Rectangle(0, 0, 130, 36), self.data)
+        self.assertTrue(
+            self.data['output'].measured < len(TEXT.split()) * 20
+            )
+
+    def test_rerender_and_order(self):
+        flow = self._flow(TEXT)
+        first = flow.create_frame()
+        second = flow.create_frame()
+        with self.assertRaises(ValueError):
+            second.render(Rectangle(0, 0, 60, 36), self.data)
+        first.render(Rectangle(0, 0, 60, 36), self.data)
+        second.render(Rectangle(0, 0, 60, 36), self.data)
+        before = self.data['output'].lines[:]
+        first.render(Rectangle(0, 0, 60, 36), self.data)
+        second.render(Rectangle(0, 0, 60, 36), self.data)
+        self.assertEqual(self.data['output'].lines, before * 2)
+
+    def test_same_lines_as_paragraph(self):
+        text = 'aaaaaaaaaaaa ' + TEXT + ' bbbbbbbbbbbbbbbb c'
+        for indent in (False, True):
+            paragraph = Paragraph(text, 60, font_name='Courier',
+                                  font_size=10, paragraph_indent=indent)
+            paragraph.get_minimum_size(dict(output=FontMetrics()))
+            flow = TextFlow(text, font_name='Courier', font_size=10,
+                            paragraph_indent=indent)
+            flow.render(Rectangle(0, 0, 60, 1000), self.data)
+            self.assertEqual(self.data['output'].lines, [
+                ' '.join(line) for line in paragraph._layout
+                ])
+            del self.data['output'].lines[:]
+
+    def test_frames_not_kept(self):
+        flow = self._flow(TEXT)
+        frame = weakref.ref(flow.create_frame())
+        gc.collect()
+        self.assertIsNone(frame())
+
+    def test_pages_must_be_rendered(self):
+        flow = self._flow(TEXT)
+        with self.assertRaises(ValueError):
+            list(flow.iter_pages(self._create_page))
+
+class BlockMetrics(FontMetrics):
+    def __init__(self):
+        super().__init__()
+        self.blocks = []
+    def draw_text_lines(self, lines, *, font_name, **kwargs):
+        self.blocks.append((font_name, lines))
+
+class TestTextBlock(unittest.TestCase):
+    def test_lines_drawn_by_font(self):
+        block = TextBlock(['+Title', 'one', 'two'], font_name='Courier',
+                          font_size=10, gap=2)
+        output = BlockMetrics()
+        block.render(Rectangle(0, 0, 100, 34), dict(
+            output=output, minimum_size_cache={}
+            ))
+        self.assertEqual(output.blocks, [
+            ('Courier-Bold', [('Title', 0, 26)]),
+            ('Courier', [('one', 0, 14), ('two', 0, 2)])
+            ])
@@ -47,6 +47,13 @@ class BoxLMTest(unittest.TestCase):
         b.right = DummyElement(Point(2,4))
         b.margin = 1
         self.assertEqual(b.get_minimum_size(None), Point(9,10))
-        
-    
-        
+
+    def test_height_for_width_margins(self):
+        for names in ('top', 'top bottom', 'top center', 'left top right'):
+            b = BoxLM(margin=1)
+            for name in names.split():
+                setattr(b, name, DummyElement(Point(2,3)))
+            self.assertEqual(
+                b.get_height_for_width(10, None),
+                b.get_minimum_size(None).y
+                )
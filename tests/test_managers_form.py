@@ -0,0 +1,108 @@
+import gc
+import io
+import unittest
+import weakref
+from layout.managers.form import *
+from layout.managers.root import LayoutElement
+from layout.pdf_utils import PDFOutput
+from layout.recording import RecordingOutput
+from layout.datatypes import *
+
+class Letterhead(LayoutElement):
+    def __init__(self):
+        self.rects = []
+    def get_minimum_size(self, data):
+        return Point(10, 10)
+    def render(self, rect, data):
+        self.rects.append(rect)
+        data['output'].draw_rect(rect.x, rect.y, rect.w, rect.h,
+                                 fill=(1, 0, 0))
+
+class TestCachedFormLM(unittest.TestCase):
+    def setUp(self):
+        self.f = io.BytesIO()
+        self.pdf = PDFOutput(self.f, (100, 100), compress=False)
+        self.data = dict(output=self.pdf)
+
+    def _render(self, lm, *rects):
+        for rect in rects:
+            lm.render(rect, self.data)
+            self.pdf.end_page()
+        self.pdf.close()
+        return self.f.getvalue()
+
+    def test_drawn_once(self):
+        letterhead = Letterhead()
+        pdf = self._render(
+            CachedFormLM(letterhead),
+            Rectangle(5, 5, 20, 10), Rectangle(50, 5, 20, 10),
+            Rectangle(5, 5, 20, 10)
+            )
+        self.assertEqual(letterhead.rects, [Rectangle(0, 0, 20, 10)])
+        self.assertEqual(pdf.count(b'/Subtype /Form /BBox [0 0 20 10]'), 1)
+        self.assertIn(b'q\n1 0 0 1 50 5 cm\n/Fm1 Do\nQ', pdf)
+        self.assertEqual(pdf.count(b'/XObject << /Fm1 '), 3)
+
+    def test_redrawn_when_changed(self):
+        letterhead = Letterhead()
+        lm = CachedFormLM(letterhead)
+        lm.render(Rectangle(0, 0, 20, 10), self.data)
+        lm.render(Rectangle(0, 0, 30, 10), self.data)
+        letterhead.invalidate()
+        self._render(lm, Rectangle(0, 0, 30, 10))
+        self.assertEqual(len(letterhead.rects), 3)
+
+    def test_changed_forms_forgotten(self):
+        letterhead = Letterhead()
+        lm = CachedFormLM(letterhead)
+        lm.render(Rectangle(0, 0, 20, 10), self.data)
+        lm.render(Rectangle(0, 0, 30, 10), self.data)
+        letterhead.invalidate()
+        lm.render(Rectangle(0, 0, 30, 10), self.data)
+        self.assertEqual(len(self.pdf._forms), 1)
+
+    def test_element_not_kept(self):
+        letterhead = Letterhead()
+        CachedFormLM(letterhead).render(Rectangle(0, 0, 20, 10), self.data)
+        self.assertEqual(len(self.pdf._forms), 1)
+        freed = weakref.ref(letterhead)
+        del letterhead
+        gc.collect()
+        self.assertIsNone(freed())
+        self.assertEqual(self.pdf._forms, {})
+
+    def test_discarded_on_error(self):
+        class Failing(Letterhead):
+            def render(self, rect, data):
+                super(Failing, self).render(rect, data)
+                raise ValueError('Rendering failed.')
+        failing = Failing()
+        lm = CachedFormLM(failing)
+        with self.assertRaises(ValueError):
+            lm.render(Rectangle(0, 0, 20, 10), self.data)
+        self.assertEqual(self.pdf._forms, {})
+        self.assertEqual(self.pdf._form_stack, [])
+        self.assertEqual(self.pdf._content, [])
+        with self.assertRaises(ValueError):
+            lm.render(Rectangle(0, 0, 20, 10), self.data)
+        self.assertEqual(len(failing.rects), 2)
+
+    def test_shared_by_key(self):
+        first, second = Letterhead(), Letterhead()
+        CachedFormLM(first, 'letterhead').render(
+            Rectangle(0, 0, 20, 10), self.data
+            )
+        pdf = self._render(
+            CachedFormLM(second, 'letterhead'), Rectangle(0, 0, 20, 10)
+            )
+        self.assertEqual((len(first.rects), len(second.rects)), (1, 0))
+        self.assertEqual(pdf.count(b'/Subtype /Form'), 1)
+
+    def test_output_without_forms(self):
+        letterhead = Letterhead()
+        lm = CachedFormLM(letterhead)
+        data = dict(output=RecordingOutput())
+        for _ in range(2):
+            lm.render(Rectangle(5, 5, 20, 10), data)
+        self.assertEqual(letterhead.rects, [Rectangle(5, 5, 20, 10)] * 2)
+        self.assertEqual(lm.get_minimum_size(data), Point(10, 10))
@@ -0,0 +1,31 @@
+import unittest
+from layout.managers.grid import *
+from layout.elements.lines import Border
+from layout.datatypes import *
+
+class ListOutput(object):
+    def __init__(self):
+        self.calls = []
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+    def __enter__(self):
+        self._save_state()
+    def __exit__(self, type, value, traceback):
+        self._restore_state()
+
+class TestGridRules(unittest.TestCase):
+    def test_rules_drawn_together(self):
+        grid = GridLM()
+        grid.add_element(Border(color=None), 0, 0, 2, 2)
+        grid.add_rule(0, 1, 2, 1)
+        grid.add_rule(1, 0, 1, 2)
+        grid.add_rule(0, 0, 2, 0, width=2)
+        output = ListOutput()
+        grid.render(Rectangle(0, 0, 10, 20), dict(output=output))
+
+        lines = [call for call in output.calls if call[0] == 'draw_lines']
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(list(lines[0][1][0]), [0, 10, 10, 10, 5, 20, 5, 0])
+        self.assertEqual(lines[0][2], dict(stroke=(0, 0, 0), stroke_width=0.5))
+        self.assertEqual(list(lines[1][1][0]), [0, 20, 10, 20])
+        self.assertEqual(lines[1][2]['stroke_width'], 2)
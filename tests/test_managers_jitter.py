@@ -0,0 +1,115 @@
+import unittest
+from layout.managers import jitter
+from layout.managers.jitter import *
+from layout.datatypes import *
+from layout.pages.output import PagesLM
+
+class Output(object):
+    def __init__(self):
+        self.calls = []
+    def __enter__(self):
+        pass
+    def __exit__(self, type, value, traceback):
+        pass
+    def translate(self, x, y):
+        self.calls.append(('translate', x, y))
+    def rotate(self, degrees):
+        self.calls.append(('rotate', degrees))
+
+class PageOutput(Output):
+    def __init__(self):
+        super(PageOutput, self).__init__()
+        self.pages = []
+    def end_page(self):
+        self.pages.append(self.calls)
+        self.calls = []
+
+class Element(object):
+    def get_minimum_size(self, data):
+        return Point(10, 10)
+    def render(self, rect, data):
+        pass
+
+class TestJitterStream(unittest.TestCase):
+    def test_reproducible(self):
+        first = JitterStream(('document', 3, 'photo'))
+        second = JitterStream(('document', 3, 'photo'))
+        self.assertEqual(first.get_jitter(5), second.get_jitter(5))
+        self.assertNotEqual(first.get_jitter(5), first.get_jitter(6))
+        self.assertNotEqual(
+            first.get_jitter(0), JitterStream(('document', 4)).get_jitter(0)
+            )
+
+    def test_known_values(self):
+        # The first SplitMix64 number from a seed of zero, the same in
+        # every process and on every platform.
+        self.assertEqual(
+            jitter._get_uniform(0, 0), (0xe220a8397b1dcdaf >> 11) / 2.0**53
+            )
+
+    def test_range(self):
+        stream = JitterStream(1, 0.1, 5, 2)
+        for index in range(100):
+            angle, x, y = stream.get_jitter(index)
+            self.assertTrue(-0.1 < angle < 0.1)
+            self.assertTrue(-5 < x < 5)
+            self.assertTrue(-2 < y < 2)
+
+    def test_batch(self):
+        stream = JitterStream('seed')
+        angles, xs, ys = stream.get_jitters(50, start=10)
+        self.assertEqual(
+            list(zip(angles, xs, ys)),
+            [stream.get_jitter(index) for index in range(10, 60)]
+            )
+        self.assertEqual([len(a) for a in stream.get_jitters(0)], [0] * 3)
+
+class TestSeededJitter(unittest.TestCase):
+    def test_random_jitter(self):
+        first = RandomJitterLM(seed=7)
+        second = RandomJitterLM(seed=7)
+        self.assertEqual(
+            (first.angle_jitter, first.x_jitter, first.y_jitter),
+            JitterStream(7).get_jitter(0)
+            )
+        self.assertEqual(first.x_jitter, second.x_jitter)
+
+    def test_jitter_elements(self):
+        elements = [Element() for _ in range(20)]
+        managers = jitter_elements(elements, 'page', max_x_jitter=2)
+        self.assertEqual([lm.element for lm in managers], elements)
+        stream = JitterStream('page', max_x_jitter=2)
+        self.assertEqual(
+            (managers[3].angle_jitter, managers[3].x_jitter,
+             managers[3].y_jitter),
+            stream.get_jitter(3)
+            )
+
+    def test_unstable_jitter(self):
+        def render():
+            lm = UnstableRandomJitterLM(element=Element(), seed='s')
+            output = Output()
+            data = dict(output=output)
+            lm.render(Rectangle(0, 0, 10, 10), data)
+            lm.render(Rectangle(0, 0, 10, 10), data)
+            return output.calls
+        calls = render()
+        self.assertEqual(calls, render())
+        # Each render in a pass takes the next jitter.
+        self.assertNotEqual(calls[1:3], calls[4:6])
+        self.assertEqual(
+            calls[1][1:], JitterStream(('s', 0)).get_jitter(0)[1:]
+            )
+
+    def test_unstable_jitter_pages(self):
+        def render(pages):
+            lm = UnstableRandomJitterLM(element=Element(), seed='s')
+            output = PageOutput()
+            PagesLM([lm, lm, lm]).render(
+                Rectangle(0, 0, 10, 10), dict(output=output, pages=pages)
+                )
+            return output.pages
+        full = render(None)
+        self.assertEqual(render([2]), full[2:])
+        self.assertEqual(render([0, 2]), full[0:1] + full[2:])
+        self.assertNotEqual(full[0], full[2])
@@ -0,0 +1,62 @@
+import unittest
+from layout.managers.recursion import *
+from layout.managers.fixed import *
+from layout.managers.overlay import *
+from layout.managers.transform import *
+from layout.datatypes import *
+
+class Output(object):
+    def __enter__(self):
+        pass
+    def __exit__(self, type, value, traceback):
+        pass
+    def translate(self, x, y):
+        pass
+    def scale(self, x, y):
+        pass
+
+class RenderedElement(object):
+    def __init__(self):
+        self.scales = []
+    def get_minimum_size(self, data):
+        return Point(0, 0)
+    def render(self, rect, data):
+        self.scales.append(get_output_scale(data))
+
+class TestRecursionStopperLM(unittest.TestCase):
+    def _render(self, stopper):
+        # Each level of the loop is drawn at half the size of the last.
+        leaf = RenderedElement()
+        stopper.element = FixedScaleLM(0.5, FixedSizeLM(
+            Point(100, 100), OverlayLM([leaf, stopper])
+            ))
+        data = dict(output=Output())
+        stopper.render(Rectangle(0, 0, 100, 100), data)
+        self.assertNotIn('output_scale', data)
+        return leaf.scales
+
+    def test_recursion_limit(self):
+        self.assertEqual(len(self._render(RecursionStopperLM(20))), 20)
+
+    def test_size_limit(self):
+        scales = self._render(RecursionStopperLM(20, size_limit=1))
+        # Levels are 100, 50, ... 1.5625 points wide.
+        self.assertEqual(scales, [0.5 ** level for level in range(1, 8)])
+
+    def test_placeholder(self):
+        placeholder = RenderedElement()
+        self._render(RecursionStopperLM(
+            20, size_limit=10, placeholder=placeholder
+            ))
+        self.assertEqual(placeholder.scales, [1 / 16.0])
+
+    def test_scale_lm(self):
+        stopper = RecursionStopperLM(20, size_limit=1)
+        leaf = RenderedElement()
+        stopper.element = ScaleLM(FixedSizeLM(Point(200, 200), OverlayLM([
+            leaf, FixedSizeLM(Point(100, 100), stopper)
+            ])))
+        stopper.render(Rectangle(0, 0, 100, 100), dict(output=Output()))
+        # ScaleLM fits each 200 point level into the 100 points left
+        # for it by the last.
+        self.assertEqual(len(leaf.scales), 7)
@@ -0,0 +1,175 @@
+import unittest
+from layout.managers.root import *
+from layout.managers.directional import *
+from layout.managers.recursion import *
+from layout.managers.transform import *
+from layout.datatypes import *
+
+class CountingElement(object):
+    def __init__(self, size):
+        self.size = size
+        self.measured = 0
+    def get_minimum_size(self, data):
+        self.measured += 1
+        return self.size
+    def render(self, rect, data):
+        self.rect = rect
+
+class CountingHeightElement(CountingElement):
+    def __init__(self, size):
+        super(CountingHeightElement, self).__init__(size)
+        self.heights = 0
+    def get_height_for_width(self, width, data):
+        self.heights += 1
+        return self.size.y
+
+class TestMinimumSizeCache(unittest.TestCase):
+    def _create_tree(self, leaf, depth):
+        tree = leaf
+        for _ in range(depth):
+            tree = VerticalLM(elements=[tree, VerticalLM(elements=[tree])])
+        return tree
+
+    def test_measured_once_per_pass(self):
+        leaf = CountingElement(Point(1, 2))
+        tree = self._create_tree(leaf, 4)
+        tree.render(Rectangle(0, 0, 10, 100), dict(minimum_size_cache={}))
+        self.assertEqual(leaf.measured, 1)
+
+    def test_height_measured_once_per_pass(self):
+        leaf = CountingHeightElement(Point(1, 2))
+        tree = self._create_tree(leaf, 10)
+        tree.render(Rectangle(0, 0, 10, 100), dict(
+            minimum_size_cache={}, height_for_width_cache={}
+            ))
+        self.assertEqual(leaf.heights, 1)
+
+    def test_no_cache_without_data(self):
+        leaf = CountingElement(Point(1, 2))
+        tree = self._create_tree(leaf, 2)
+        tree.render(Rectangle(0, 0, 10, 100), None)
+        self.assertTrue(leaf.measured > 1)
+
+    def test_opt_out(self):
+        leaf = CountingElement(Point(1, 2))
+        leaf.cache_minimum_size = False
+        data = dict(minimum_size_cache={})
+        get_cached_minimum_size(leaf, data)
+        get_cached_minimum_size(leaf, data)
+        self.assertEqual(leaf.measured, 2)
+        self.assertEqual(data['minimum_size_cache'], {})
+
+    def test_recursion_levels_measured_separately(self):
+        stopper = RecursionStopperLM(2)
+        tree = VerticalLM(elements=[CountingElement(Point(1, 2)), stopper])
+        stopper.element = tree
+        data = dict(minimum_size_cache={})
+        self.assertEqual(get_cached_minimum_size(tree, data), Point(1, 6))
+        self.assertEqual(data['recursion_stopper_count'][stopper], 0)
+
+@add_layout_properties(['size'])
+class CountingLayoutElement(LayoutElement):
+    def __init__(self, size):
+        self.size = size
+        self.measured = 0
+    def get_minimum_size(self, data):
+        self.measured += 1
+        return self.size
+    def render(self, rect, data):
+        self.rect = rect
+
+class TestRetainedMinimumSizes(unittest.TestCase):
+    def _render(self, tree):
+        tree.render(Rectangle(0, 0, 10, 100), dict(
+            minimum_size_cache={}, retain_minimum_sizes=True
+            ))
+
+    def test_only_changed_path_remeasured(self):
+        changed = CountingLayoutElement(Point(1, 2))
+        unchanged = CountingLayoutElement(Point(3, 4))
+        tree = VerticalLM(elements=[
+            VerticalLM(elements=[changed]),
+            HorizontalLM(elements=[unchanged])
+            ])
+        self._render(tree)
+        self.assertEqual((changed.measured, unchanged.measured), (1, 1))
+
+        self._render(tree)
+        self.assertEqual((changed.measured, unchanged.measured), (1, 1))
+
+        changed.size = Point(5, 2)
+        self._render(tree)
+        self.assertEqual((changed.measured, unchanged.measured), (2, 1))
+        self.assertEqual(changed.rect, Rectangle(0, 4+94*0.5, 10, 2+94*0.5))
+
+    def test_add_element_invalidates(self):
+        tree = VerticalLM(elements=[CountingLayoutElement(Point(1, 2))])
+        self._render(tree)
+        version = tree._layout_version
+        tree.add_element(CountingLayoutElement(Point(3, 4)))
+        self.assertTrue(tree._layout_version > version)
+        self._render(tree)
+        self.assertEqual(tree.elements[1].measured, 1)
+
+    def test_cycles_terminate(self):
+        stopper = RecursionStopperLM(2)
+        leaf = CountingLayoutElement(Point(1, 2))
+        tree = VerticalLM(elements=[leaf, stopper])
+        stopper.element = tree
+        leaf.size = Point(2, 2)
+        self.assertTrue(stopper._layout_version > 0)
+
+class ListOutput(object):
+    def __init__(self):
+        self.calls = []
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+    def __enter__(self):
+        self._save_state()
+    def __exit__(self, type, value, traceback):
+        self._restore_state()
+
+class BoxElement(LayoutElement):
+    def get_minimum_size(self, data):
+        return Point(2, 1)
+    def render(self, rect, data):
+        data['output'].draw_rect(*rect.get_data(), fill=(0,0,0))
+
+class TestArrange(unittest.TestCase):
+    def test_frames(self):
+        box = BoxElement()
+        tree = RotateLM(RotateLM.ANGLE_90, VerticalLM(elements=[box]))
+        frame = arrange(tree, Rectangle(0, 0, 4, 6), ListOutput())
+        self.assertIs(frame.element, tree)
+        frames = list(frame.iter_frames())
+        self.assertEqual(len(frames), 3)
+        self.assertIs(frames[2].element, box)
+        self.assertEqual(frames[2].rectangle, Rectangle(-3, -2, 6, 4))
+        a, b, c, d, e, f = frames[2].transform
+        self.assertAlmostEqual(b, 1)
+        self.assertAlmostEqual(c, -1)
+        self.assertEqual((e, f), (2, 3))
+
+    def test_paint_matches_render(self):
+        tree = RotateLM(RotateLM.ANGLE_90, VerticalLM(elements=[
+            BoxElement(), BoxElement()
+            ]))
+        rendered = ListOutput()
+        tree.render(Rectangle(0, 0, 4, 6), dict(output=rendered))
+        frame = arrange(tree, Rectangle(0, 0, 4, 6), ListOutput())
+        for _ in range(2):
+            painted = ListOutput()
+            paint(frame, painted)
+            self.assertEqual(painted.calls, rendered.calls)
+
+class FailingElement(BoxElement):
+    def render(self, rect, data):
+        raise ZeroDivisionError()
+
+class TestRenderElement(unittest.TestCase):
+    def test_errors_not_chained(self):
+        tree = VerticalLM(elements=[VerticalLM(elements=[FailingElement()])])
+        for data in (dict(output=ListOutput()), None):
+            with self.assertRaises(ZeroDivisionError) as raised:
+                tree.render(Rectangle(0, 0, 4, 6), data)
+            self.assertIsNone(raised.exception.__context__)
@@ -0,0 +1,149 @@
+import os
+import pickle
+import struct
+import tempfile
+import unittest
+from layout.metrics import *
+from layout.datatypes.output import get_measure_key
+from layout.elements.text import Paragraph, ParagraphLayoutCache, TextLine
+from layout.managers.root import get_cached_minimum_size
+from layout.recording import RecordingOutput
+from layout.rl_utils import ReportlabOutput
+
+def _build_ttf(units_per_em, advances, first, last):
+    """Builds just enough of a TrueType file to be measured, mapping
+    the characters from first to last onto glyphs from one upwards."""
+    # A format 4 cmap with one segment, and the final segment required
+    # by the format.
+    ends, starts, deltas = (ord(last), 0xffff), (ord(first), 0xffff), (
+        (1 - ord(first)) & 0xffff, 1
+        )
+    cmap_subtable = struct.pack('>7H', 4, 0, 0, 4, 0, 0, 0) + \
+        struct.pack('>2H', *ends) + b'\0\0' + struct.pack('>2H', *starts) + \
+        struct.pack('>2H', *deltas) + b'\0\0' * 2
+    tables = {
+        b'head': b'\0' * 18 + struct.pack('>H', units_per_em) + b'\0' * 32,
+        b'hhea': b'\0' * 34 + struct.pack('>H', len(advances)),
+        b'maxp': struct.pack('>LH', 0x5000, len(advances) + 1),
+        b'hmtx': b''.join(struct.pack('>Hh', a, 0) for a in advances),
+        b'cmap': struct.pack('>HHHHL', 0, 1, 3, 1, 12) + cmap_subtable,
+        }
+    offset = 12 + 16 * len(tables)
+    directory = struct.pack('>LHHHH', 0x10000, len(tables), 0, 0, 0)
+    body = b''
+    for tag, table in sorted(tables.items()):
+        directory += struct.pack(
+            '>4sLLL', tag, 0, offset + len(body), len(table)
+            )
+        body += table + b'\0' * (-len(table) % 4)
+    return directory + body
+
+class TestStandardFonts(unittest.TestCase):
+    def setUp(self):
+        self.metrics = FontMetrics()
+
+    def test_width(self):
+        self.assertAlmostEqual(
+            self.metrics.text_width(
+                'Hello World', font_name='Helvetica', font_size=11
+                ),
+            56.837
+            )
+
+    def test_widths(self):
+        widths = self.metrics.text_widths(
+            ['Hello', '', 'iii'], font_name='Courier', font_size=10
+            )
+        self.assertEqual(list(widths), [30, 0, 18])
+
+    def test_fallback(self):
+        # Greek letters are found in the Symbol font.
+        self.assertAlmostEqual(
+            self.metrics.text_width('α', font_name='Times-Roman',
+                                    font_size=1),
+            0.631
+            )
+        self.assertAlmostEqual(
+            self.metrics.text_width('一', font_name='Symbol',
+                                    font_size=1),
+            0.761
+            )
+
+    def test_unknown_font(self):
+        with self.assertRaises(ValueError):
+            self.metrics.text_width('a', font_name='Nonsuch', font_size=1)
+
+    def test_pickle(self):
+        self.metrics.text_width('a', font_name='Helvetica', font_size=1)
+        metrics = pickle.loads(pickle.dumps(self.metrics))
+        self.assertEqual(
+            metrics.text_width('☃a', font_name='Helvetica', font_size=1),
+            self.metrics.text_width('☃a', font_name='Helvetica',
+                                    font_size=1)
+            )
+
+class TestTrueTypeFonts(unittest.TestCase):
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.ttf')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(_build_ttf(2048, [1024, 512, 2048], 'a', 'c'))
+        self.metrics = FontMetrics()
+        self.metrics.register_ttf('Test', self.filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_widths(self):
+        # Glyphs after the last metric share its width, and characters
+        # that aren't in the font have the width of glyph zero.
+        widths = self.metrics.text_widths(
+            ['a', 'b', 'c', 'z', 'abc'], font_name='Test', font_size=10
+            )
+        self.assertEqual(list(widths), [2.5, 10, 10, 5, 22.5])
+
+class TestMeasureKey(unittest.TestCase):
+    def setUp(self):
+        handle, self.filename = tempfile.mkstemp(suffix='.ttf')
+        with os.fdopen(handle, 'wb') as f:
+            # Characters from a to z are twice as wide as in Courier.
+            f.write(_build_ttf(1000, [1200], 'a', 'z'))
+        self.wide = FontMetrics()
+        self.wide.register_ttf('Courier', self.filename)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_keys(self):
+        self.assertEqual(
+            get_measure_key(FontMetrics()), get_measure_key(FontMetrics())
+            )
+        self.assertNotEqual(
+            get_measure_key(FontMetrics()), get_measure_key(self.wide)
+            )
+        self.assertEqual(
+            get_measure_key(ReportlabOutput(None, metrics=self.wide)),
+            get_measure_key(RecordingOutput(self.wide))
+            )
+        self.assertEqual(
+            get_measure_key(ReportlabOutput(None)), ReportlabOutput
+            )
+
+    def test_layouts_not_shared(self):
+        def get_height(metrics):
+            p = Paragraph('a ' * 20, 60, font_name='Courier', font_size=10)
+            p.layout_cache = layout_cache
+            return p.get_minimum_size(dict(
+                output=ReportlabOutput(None, metrics=metrics)
+                )).y
+        layout_cache = ParagraphLayoutCache()
+        self.assertTrue(get_height(self.wide) > get_height(FontMetrics()))
+
+    def test_retained_sizes_not_shared(self):
+        line = TextLine('abc', font_name='Courier', font_size=10)
+        def get_width(metrics):
+            return get_cached_minimum_size(line, dict(
+                output=ReportlabOutput(None, metrics=metrics),
+                minimum_size_cache={}, retain_minimum_sizes=True
+                )).x
+        self.assertEqual(get_width(FontMetrics()), 18)
+        self.assertEqual(get_width(self.wide), 36)
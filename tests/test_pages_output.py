@@ -0,0 +1,168 @@
+import unittest
+from layout.pages.output import *
+from layout.pages.output import _SkippedPageOutput
+from layout.datatypes import *
+import layout.managers.directional as directional
+
+class SizedElement(object):
+    def __init__(self, height):
+        self.height = height
+    def get_minimum_size(self, data):
+        return Point(10, self.height)
+    def render(self, rect, data):
+        self.rendered_with = type(data['output'])
+        if isinstance(data['output'], ListOutput):
+            data['output'].calls.append(('render', self, rect))
+
+class ListOutput(object):
+    def __init__(self):
+        self.calls = []
+    def end_page(self):
+        self.calls.append(('end_page',))
+
+class TestPaginatedVerticalLM(unittest.TestCase):
+    def _pages(self, lm, height=100):
+        return [
+            [lm.elements.index(element) for element in page.elements]
+            for page in lm.iter_pages(Rectangle(0, 0, 50, height), None)
+            ]
+
+    def test_breaks(self):
+        lm = PaginatedVerticalLM(margin=10, elements=[
+            SizedElement(h) for h in (40, 40, 40, 100, 150, 10, 10)
+            ])
+        self.assertEqual(self._pages(lm), [[0, 1], [2], [3], [4], [5, 6]])
+
+    def test_keep_with_next(self):
+        lm = PaginatedVerticalLM(elements=[
+            SizedElement(h) for h in (40, 45)
+            ])
+        lm.add_kept_together([SizedElement(10), SizedElement(10)])
+        self.assertEqual(self._pages(lm), [[0, 1], [2, 3]])
+
+    def test_kept_elements_too_tall_for_page(self):
+        lm = PaginatedVerticalLM()
+        lm.add_kept_together([SizedElement(60) for _ in range(3)])
+        self.assertEqual(self._pages(lm), [[0], [1], [2]])
+
+    def test_minimum_size(self):
+        lm = PaginatedVerticalLM(elements=[
+            SizedElement(h) for h in (40, 60, 20)
+            ])
+        self.assertEqual(lm.get_minimum_size(None), Point(10, 60))
+
+    def test_render(self):
+        elements = [SizedElement(h) for h in (60, 60, 60)]
+        output = ListOutput()
+        PagesLM(elements=[PaginatedVerticalLM(elements=elements)]).render(
+            Rectangle(0, 0, 50, 100), dict(output=output)
+            )
+        self.assertEqual(output.calls, [
+            ('render', elements[0], Rectangle(0, 40, 50, 60)),
+            ('end_page',),
+            ('render', elements[1], Rectangle(0, 40, 50, 60)),
+            ('end_page',),
+            ('render', elements[2], Rectangle(0, 40, 50, 60)),
+            ('end_page',),
+            ])
+
+class TestPageSelection(unittest.TestCase):
+    def _render(self, lm, pages):
+        output = ListOutput()
+        data = dict(output=output, pages=pages)
+        lm.render(Rectangle(0, 0, 50, 100), data)
+        return output.calls, data
+
+    def test_selected_pages(self):
+        elements = [SizedElement(10) for _ in range(10)]
+        calls, data = self._render(PagesLM(elements=elements), range(3, 5))
+        self.assertEqual([call[:2] for call in calls], [
+            ('render', elements[3]), ('end_page',),
+            ('render', elements[4]), ('end_page',)
+            ])
+        # Rendering stops after the last selected page.
+        self.assertEqual(data['page_index'], 5)
+
+    def test_paginated_pages(self):
+        elements = [SizedElement(60) for _ in range(5)]
+        lm = PagesLM(elements=[
+            SizedElement(10), PaginatedVerticalLM(elements=elements)
+            ])
+        calls, _ = self._render(lm, [2, 3])
+        self.assertEqual([call[:2] for call in calls], [
+            ('render', elements[1]), ('end_page',),
+            ('render', elements[2]), ('end_page',)
+            ])
+
+    def test_fast_forward(self):
+        skipped = SizedElement(10)
+        skipped.fast_forward = True
+        calls, _ = self._render(
+            PagesLM(elements=[skipped, SizedElement(10)]), [1]
+            )
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(skipped.rendered_with, _SkippedPageOutput)
+
+class TestPageSources(unittest.TestCase):
+    def test_generator(self):
+        made = []
+        def pages():
+            for index in range(5):
+                # Each page is made after the one before is output.
+                made.append(len(output.calls))
+                yield SizedElement(10)
+        output = ListOutput()
+        PagesLM(pages()).render(Rectangle(0, 0, 50, 100), dict(output=output))
+        self.assertEqual(made, [0, 2, 4, 6, 8])
+        self.assertEqual(len(output.calls), 10)
+
+    def test_function(self):
+        made = []
+        def page(index):
+            made.append(index)
+            return SizedElement(10)
+        output = ListOutput()
+        PagesLM(page, 100).render(
+            Rectangle(0, 0, 50, 100), dict(output=output, pages=[3, 7])
+            )
+        self.assertEqual(made, [3, 7])
+        self.assertEqual(len(output.calls), 4)
+
+    def test_made_pages_not_cached(self):
+        cache = {}
+        def page(index):
+            return directional.VerticalLM(elements=[SizedElement(10)])
+        PagesLM(page, 50).render(Rectangle(0, 0, 50, 100), dict(
+            output=ListOutput(), minimum_size_cache=cache
+            ))
+        # Only the sizes measured on the last page are kept.
+        self.assertEqual(len(cache), 1)
+
+    def test_function_needs_num_pages(self):
+        with self.assertRaises(ValueError):
+            PagesLM(lambda index: None)
+
+    def test_text_flow(self):
+        from layout.elements.text import TextFlow
+        from layout.metrics import FontMetrics
+        class FlowOutput(FontMetrics):
+            def __init__(self):
+                super().__init__()
+                self.lines = []
+                self.pages = 0
+            def __enter__(self):
+                pass
+            def __exit__(self, type, value, traceback):
+                pass
+            def draw_text_lines(self, lines, **kwargs):
+                self.lines.extend(text for text, x, y in lines)
+            def end_page(self):
+                self.pages += 1
+        text = ' '.join(['word'] * 100)
+        flow = TextFlow(text, font_name='Courier', font_size=10)
+        output = FlowOutput()
+        PagesLM(flow.iter_pages(lambda flow: flow.create_frame())).render(
+            Rectangle(0, 0, 60, 36), dict(output=output)
+            )
+        self.assertEqual(' '.join(output.lines), text)
+        self.assertEqual(output.pages, 17)
@@ -0,0 +1,117 @@
+import io
+import unittest
+from layout.pages.variable import *
+from layout.pages.output import PagesLM
+from layout.elements.text import TextLine
+from layout.managers.directional import VerticalLM
+from layout.managers.transform import RotateLM
+from layout.managers.root import Frame, arrange
+from layout.metrics import FontMetrics
+from layout.pdf_utils import PDFOutput
+from layout.datatypes import *
+
+class CountingLine(TextLine):
+    rendered = 0
+    def render(self, rect, data):
+        CountingLine.rendered += 1
+        super(CountingLine, self).render(rect, data)
+
+def _template():
+    return VerticalLM(elements=[
+        CountingLine('Ticket', font_name='Courier', font_size=10),
+        RotateLM(RotateLM.UPSIDE_DOWN, Field(
+            'number', '0000', font_name='Courier', font_size=10,
+            align=Field.ALIGN_RIGHT
+            )),
+        Field('name', 'Sample', font_name='Courier', font_size=10)
+        ])
+
+class TestSplitLayers(unittest.TestCase):
+    def test_layers(self):
+        frame = arrange(_template(), Rectangle(0, 0, 60, 30), FontMetrics())
+        static, dynamic = split_layers(frame)
+        self.assertFalse(any(
+            isinstance(f.element, Field) for f in static.iter_frames()
+            ))
+        fields = [item for item in dynamic if isinstance(item, Frame)]
+        # Drawn from the bottom up, with only the rotation of the number
+        # field kept.
+        self.assertEqual([f.element.name for f in fields], ['name', 'number'])
+        self.assertEqual(dynamic[1:], [
+            ('_save_state', (), ()), ('translate', (30, 15), ()),
+            ('rotate', (180,), ()), fields[1], ('_restore_state', (), ())
+            ])
+
+    def test_paint_fields(self):
+        class TextOutput(FontMetrics):
+            def __init__(self):
+                super(TextOutput, self).__init__()
+                self.drawn = []
+            def draw_text(self, text, x, y, **kwargs):
+                self.drawn.append((text, x, y))
+        field = Field('number', '0000', font_name='Courier', font_size=10,
+                      align=Field.ALIGN_RIGHT)
+        _, dynamic = split_layers(
+            arrange(field, Rectangle(0, 0, 60, 10), FontMetrics())
+            )
+        output = TextOutput()
+        paint_fields(dynamic, dict(number=7), output)
+        self.assertEqual(output.drawn, [('7', 54, 2)])
+
+class TestVariableDataLM(unittest.TestCase):
+    def test_pages(self):
+        CountingLine.rendered = 0
+        lm = VariableDataLM(_template(), (
+            dict(number=index, name='Name %d' % index)
+            for index in range(5)
+            ), columns=2, rows=2, margin=5)
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (125, 65), compress=False)
+        PagesLM([lm]).render(Rectangle(0, 0, 125, 65), dict(output=pdf))
+        pdf.close()
+        pdf = f.getvalue()
+
+        # A full page and the last, with one record, laid out once each.
+        self.assertEqual(CountingLine.rendered, 5)
+        self.assertEqual(pdf.count(b'/Subtype /Form'), 2)
+        self.assertEqual(pdf.count(b'(Ticket)'), 5)
+        self.assertEqual(pdf.count(b'/Type /Page '), 2)
+        for index in range(5):
+            self.assertEqual(pdf.count(b'(Name %d)' % index), 1)
+        self.assertEqual(pdf.count(b'(Sample)'), 0)
+
+    def test_selected_pages(self):
+        lm = VariableDataLM(_template(), [
+            dict(number=index, name='Name %d' % index)
+            for index in range(5)
+            ], columns=2)
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (125, 65), compress=False)
+        PagesLM([lm]).render(Rectangle(0, 0, 125, 65), dict(
+            output=pdf, pages=[1]
+            ))
+        pdf.close()
+        self.assertEqual(f.getvalue().count(b'/Type /Page '), 1)
+        self.assertIn(b'(Name 3)', f.getvalue())
+        self.assertNotIn(b'(Name 4)', f.getvalue())
+
+    def test_ordinary_render(self):
+        class TextOutput(FontMetrics):
+            def draw_text(self, text, x, y, **kwargs):
+                self.text = text
+        field = Field('name', 'Sample')
+        output = TextOutput()
+        field.render(Rectangle(0, 0, 60, 10), dict(output=output))
+        self.assertEqual(output.text, 'Sample')
+        field.render(Rectangle(0, 0, 60, 10), dict(
+            output=output, record=dict(name='Name')
+            ))
+        self.assertEqual(output.text, 'Name')
+
+    def test_minimum_size(self):
+        lm = VariableDataLM(_template(), columns=2, rows=3, margin=5)
+        size = _template().get_minimum_size(dict(output=FontMetrics()))
+        self.assertEqual(
+            lm.get_minimum_size(dict(output=FontMetrics())),
+            Point(size.x * 2 + 5, size.y * 3 + 10)
+            )
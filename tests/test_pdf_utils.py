@@ -0,0 +1,237 @@
+import io
+import os
+import re
+import struct
+import tempfile
+import threading
+import unittest
+import zlib
+from layout.pdf_utils import *
+from layout.pages.output import PagesLM
+from layout.datatypes import *
+
+def _read_objects(pdf):
+    """Returns the text of each object in the given document, by object
+    number, found through the cross-reference table."""
+    xref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', pdf).group(1))
+    header, first, count = re.match(
+        rb'(xref\n(\d+) (\d+)\n)', pdf[xref:]
+        ).groups()
+    entries = pdf[xref+len(header):xref+len(header)+20*int(count)]
+    objects = {}
+    for number in range(1, int(count)):
+        offset = int(entries[20*number:20*number+10])
+        end = pdf.index(b'endobj', offset)
+        match = re.match(rb'(\d+) 0 obj\n', pdf[offset:])
+        assert int(match.group(1)) == number
+        objects[number] = pdf[offset+match.end():end]
+    return objects
+
+def _content(stream_object):
+    return zlib.decompress(stream_object.split(b'stream\n', 1)[1][:-11])
+
+class TextElement(object):
+    def __init__(self, text, font_name='Helvetica'):
+        self.text = text
+        self.font_name = font_name
+    def get_minimum_size(self, data):
+        return Point(10, 10)
+    def render(self, rect, data):
+        data['output'].draw_text(
+            self.text, rect.x, rect.y,
+            font_name=self.font_name, font_size=10, fill=(0, 0, 0)
+            )
+
+class TestPDFOutput(unittest.TestCase):
+    def _render(self, elements):
+        f = io.BytesIO()
+        render_to_pdf_file(f, (100, 200), PagesLM(elements))
+        return f.getvalue()
+
+    def test_pages(self):
+        pdf = self._render([TextElement('One'), TextElement('Two')])
+        self.assertTrue(pdf.startswith(b'%PDF-1.4\n'))
+        objects = _read_objects(pdf)
+        self.assertIn(b'/Count 2', objects[2])
+        pages = [
+            body for body in objects.values() if b'/Type /Page ' in body
+            ]
+        self.assertEqual(len(pages), 2)
+        self.assertIn(b'/MediaBox [0 0 100 200]', pages[0])
+
+        contents = [
+            _content(objects[int(re.search(rb'/Contents (\d+)', page)[1])])
+            for page in pages
+            ]
+        self.assertEqual(
+            contents[0], b'0 0 0 rg\nBT /F1 10 Tf\n0 0 Td\n(One) Tj ET'
+            )
+        self.assertIn(b'(Two)', contents[1])
+
+    def test_fonts_shared(self):
+        pdf = self._render([
+            TextElement('One'), TextElement('Two'),
+            TextElement('Three', 'Courier')
+            ])
+        fonts = [
+            body for body in _read_objects(pdf).values()
+            if b'/Type /Font' in body
+            ]
+        self.assertEqual(len(fonts), 2)
+
+    def test_text_encoding(self):
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (100, 100), compress=False)
+        pdf.draw_text('(a\\b) caf\xe9 中', 0, 0,
+                      font_name='Times-Roman', font_size=10, fill=(0, 0, 0))
+        pdf.close()
+        self.assertIn(b'(\\(a\\\\b\\) caf\xe9 ?) Tj', f.getvalue())
+
+    def test_state_changes_only(self):
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (100, 100), compress=False)
+        for y in range(3):
+            pdf.draw_text('A', 0, y, font_name='Courier',
+                          font_size=10, fill=(0, 0, 0))
+        with pdf:
+            pdf.draw_line(0, 0, 1, 1, stroke=(1, 0, 0), stroke_dash=[1, 2])
+            pdf.draw_rect(0, 0, 1, 1, stroke=(1, 0, 0), stroke_dash=[1, 2])
+        pdf.draw_rect(0, 0, 1, 1, fill=(1, 0, 0))
+        pdf.draw_text('A', 0, 0, font_name='Courier',
+                      font_size=10, fill=(0, 0, 0))
+        pdf.close()
+        content = f.getvalue().split(b'stream\n', 1)[1].split(b'\nend')[0]
+        self.assertEqual(content.split(b'\n'), [
+            b'0 0 0 rg', b'BT /F1 10 Tf', b'0 0 Td', b'(A) Tj ET',
+            b'BT', b'0 1 Td', b'(A) Tj ET',
+            b'BT', b'0 2 Td', b'(A) Tj ET',
+            b'q', b'1 0 0 RG', b'1 w', b'[1 2] 0 d', b'0 0 m 1 1 l', b'S',
+            b'0 0 1 1 re', b'S', b'Q',
+            b'1 0 0 rg', b'0 0 1 1 re', b'f',
+            b'0 0 0 rg', b'BT', b'0 0 Td', b'(A) Tj ET'
+            ])
+
+    def test_text_lines(self):
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (100, 100), compress=False)
+        pdf.draw_text_lines([('One', 10, 50), ('Two', 0, 38)],
+                            font_name='Courier', font_size=10,
+                            fill=(0, 0, 0))
+        pdf.close()
+        content = f.getvalue().split(b'stream\n', 1)[1].split(b'\nend')[0]
+        self.assertEqual(content.split(b'\n'), [
+            b'0 0 0 rg', b'BT /F1 10 Tf',
+            b'10 50 Td', b'(One) Tj', b'-10 -12 Td', b'(Two) Tj', b'ET'
+            ])
+
+    def test_batches(self):
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (100, 100), compress=False)
+        pdf.draw_lines([0, 0, 1, 1, 2, 2, 3, 3], stroke=(0, 0, 0))
+        pdf.draw_rects([0, 0, 1, 1, 2, 2, 1, 1], fill=(0, 0, 0))
+        pdf.close()
+        content = f.getvalue().split(b'stream\n', 1)[1].split(b'\nend')[0]
+        self.assertEqual(content.split(b'\n'), [
+            b'0 0 0 RG', b'1 w', b'[] 0 d',
+            b'0 0 m 1 1 l', b'2 2 m 3 3 l', b'S',
+            b'0 0 0 rg', b'0 0 1 1 re', b'2 2 1 1 re', b'f'
+            ])
+
+    def test_unknown_font(self):
+        pdf = PDFOutput(io.BytesIO(), (100, 100))
+        with self.assertRaises(ValueError):
+            pdf.draw_text('A', 0, 0, font_name='Unknown',
+                          font_size=10, fill=(0, 0, 0))
+
+    def test_empty_document(self):
+        f = io.BytesIO()
+        PDFOutput(f, (100, 100)).close()
+        self.assertIn(b'/Count 1', _read_objects(f.getvalue())[2])
+
+    def test_text_width(self):
+        pdf = PDFOutput(io.BytesIO(), (100, 100))
+        self.assertAlmostEqual(
+            pdf.text_width('Hello', font_name='Courier', font_size=10), 30
+            )
+
+class TestBackgroundWriting(unittest.TestCase):
+    def _render(self, threads):
+        f = io.BytesIO()
+        render_to_pdf_file(f, (100, 200), PagesLM([
+            TextElement('Page %d' % index) for index in range(20)
+            ]), threads=threads)
+        return f.getvalue()
+
+    def test_same_as_foreground(self):
+        self.assertEqual(self._render(3), self._render(0))
+
+    def test_write_error(self):
+        class FullFile(object):
+            def write(self, data):
+                raise OSError('Disk full')
+        pdf = PDFOutput(io.BytesIO(), (100, 100), threads=1)
+        pdf.f = FullFile()
+        with self.assertRaises(OSError):
+            for _ in range(10):
+                pdf.end_page()
+            pdf.close()
+
+    def test_render_error(self):
+        class FailingElement(TextElement):
+            def render(self, rect, data):
+                raise ValueError('Rendering failed.')
+        threads = threading.active_count()
+        with self.assertRaises(ValueError):
+            render_to_pdf_file(io.BytesIO(), (100, 200), PagesLM(
+                [TextElement('Page %d' % index) for index in range(20)] +
+                [FailingElement('')]
+                ), threads=3)
+        self.assertEqual(threading.active_count(), threads)
+
+class TestImages(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _write(self, name, data):
+        filename = os.path.join(self.directory.name, name)
+        with open(filename, 'wb') as f:
+            f.write(data)
+        return filename
+
+    def _png(self, color_type):
+        def chunk(kind, data):
+            return struct.pack('>L', len(data)) + kind + data + b'\0' * 4
+        return b'\x89PNG\r\n\x1a\n' + chunk(
+            b'IHDR', struct.pack('>LLBBBBB', 2, 1, 8, color_type, 0, 0, 0)
+            ) + chunk(b'IDAT', b'pixels') + chunk(b'IEND', b'')
+
+    def test_images_shared(self):
+        jpeg = self._write('image.jpg', b'\xff\xd8\xff\xe0\0\4ab' +
+                           b'\xff\xc0\0\x0b\x08\0\3\0\4\3' + b'\xff\xd9')
+        png = self._write('image.png', self._png(2))
+        f = io.BytesIO()
+        pdf = PDFOutput(f, (100, 100))
+        for _ in range(2):
+            pdf.draw_image(jpeg, 0, 0, 10, 10)
+            pdf.draw_image(png, 0, 0, 10, 10)
+            pdf.end_page()
+        pdf.close()
+
+        images = [
+            body for body in _read_objects(f.getvalue()).values()
+            if b'/Subtype /Image' in body
+            ]
+        self.assertEqual(len(images), 2)
+        self.assertIn(b'/Width 4 /Height 3 /BitsPerComponent 8 '
+                      b'/ColorSpace /DeviceRGB /Filter /DCTDecode', images[0])
+        self.assertIn(b'/Predictor 15 /Colors 3', images[1])
+        self.assertIn(b'stream\npixels\nendstream', images[1])
+
+    def test_transparent_png(self):
+        png = self._write('image.png', self._png(6))
+        pdf = PDFOutput(io.BytesIO(), (100, 100))
+        with self.assertRaises(ValueError):
+            pdf.draw_image(png, 0, 0, 10, 10)
@@ -0,0 +1,90 @@
+import array
+import unittest
+from layout.recording import *
+from layout.datatypes import *
+
+class ListOutput(object):
+    def __init__(self):
+        self.calls = []
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+class TestRecordingOutput(unittest.TestCase):
+    def _draw(self, c):
+        c._save_state()
+        c.translate(1, 2)
+        c.rotate(90)
+        c.draw_text('Hello', 3, 4,
+                    font_name='Helvetica', font_size=11, fill=(0, 0, 0))
+        c.draw_line(0, 0, 5, 5, stroke=(1, 0, 0), stroke_dash=(2, 1))
+        c.draw_rect(1, 2, 3, 4, fill=(0, 0, 0))
+        c.draw_polygon(0, 0, 1, 1, 2, 0, close_path=False, stroke=(0, 0, 1))
+        c.clip_rect(0, 0, 10, 10)
+        c.draw_image('image.png', 1, 1, 2, 2)
+        c.draw_lines([0, 0, 1, 1, 2, 2, 3, 3], stroke=(0, 0, 0))
+        c.draw_rects(array.array('d', [0, 0, 1, 1]), fill=(1, 0, 0))
+        c.draw_polygons([(0, 0, 1, 1, 2, 0), (5, 5, 6, 6)], fill=(0, 1, 0))
+        c.draw_text_lines([('One', 0, 10), ('Two', 0, 0)],
+                          font_name='Courier', font_size=10, fill=(0, 0, 0))
+        c._restore_state()
+        c.end_page()
+
+    def test_replay(self):
+        expected = ListOutput()
+        self._draw(expected)
+
+        recording = RecordingOutput()
+        self._draw(recording)
+        replayed = ListOutput()
+        recording.replay(replayed)
+        self.assertEqual(
+            [call[0] for call in replayed.calls],
+            [call[0] for call in expected.calls]
+            )
+        self.assertEqual(replayed.calls[3], ('draw_text', ('Hello', 3, 4), dict(
+            font_name='Helvetica', font_size=11, fill=(0, 0, 0)
+            )))
+
+    def test_replay_round_trip(self):
+        recording = RecordingOutput()
+        self._draw(recording)
+        for _ in range(2):
+            copy = RecordingOutput()
+            recording.replay(copy)
+            self.assertEqual(copy.ops, recording.ops)
+            self.assertEqual(copy.numbers, recording.numbers)
+            self.assertEqual(copy.refs, recording.refs)
+            self.assertEqual(copy.values, recording.values)
+
+    def test_replay_batches(self):
+        recording = RecordingOutput()
+        self._draw(recording)
+        replayed = ListOutput()
+        recording.replay(replayed)
+        name, (coords,), kwargs = replayed.calls[9]
+        self.assertEqual(name, 'draw_lines')
+        self.assertEqual(list(coords), [0, 0, 1, 1, 2, 2, 3, 3])
+        self.assertEqual(kwargs['stroke'], (0, 0, 0))
+        name, (polygons,), kwargs = replayed.calls[11]
+        self.assertEqual(
+            [list(pts) for pts in polygons], [[0, 0, 1, 1, 2, 0], [5, 5, 6, 6]]
+            )
+        self.assertEqual(kwargs['fill'], (0, 1, 0))
+        self.assertEqual(kwargs['close_path'], True)
+        self.assertEqual(replayed.calls[12], ('draw_text_lines', (
+            [('One', 0, 10), ('Two', 0, 0)],
+            ), dict(font_name='Courier', font_size=10, fill=(0, 0, 0))))
+
+    def test_values_shared(self):
+        recording = RecordingOutput()
+        for i in range(10):
+            recording.draw_text('Hello', i, 0,
+                font_name='Helvetica', font_size=11, fill=(0, 0, 0))
+        self.assertEqual(len(recording.values), 3)
+        self.assertEqual(len(recording.ops), 10)
+
+    def test_no_measurement(self):
+        self.assertRaises(
+            ValueError, RecordingOutput().text_width, 'Hello',
+            font_name='Helvetica', font_size=11
+            )
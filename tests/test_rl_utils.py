@@ -0,0 +1,199 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from layout import rl_utils
+
+class StubCanvas(object):
+    """Records the calls made to a ReportLab canvas or path."""
+    def __init__(self, calls=None):
+        self.calls = [] if calls is None else calls
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name,) + args)
+            if name == 'beginPath':
+                return StubCanvas(self.calls)
+        return record
+
+def write_pages(filename, papersize_tuple, layout, pages):
+    with open(filename, 'w') as f:
+        f.write(''.join('%s %d\n' % (layout, page) for page in pages))
+
+def fail_to_write(filename, papersize_tuple, layout, pages):
+    open(filename, 'w').close()
+    raise ValueError('Rendering failed.')
+
+def create_layout():
+    return 'layout'
+
+class TestParallelRendering(unittest.TestCase):
+    def setUp(self):
+        self.directories = []
+        mkdtemp = tempfile.mkdtemp
+        def record_mkdtemp():
+            directory = mkdtemp()
+            self.directories.append(directory)
+            return directory
+        patcher = mock.patch.object(
+            rl_utils.tempfile, 'mkdtemp', record_mkdtemp
+            )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.merged = []
+
+    def _merge(self, output_filename, filenames):
+        self.merged.append((output_filename, list(filenames)))
+        self.pages = []
+        for filename in filenames:
+            with open(filename) as f:
+                self.pages.append(f.read().split('\n')[:-1])
+
+    def _render(self, num_pages, **kwargs):
+        rl_utils.render_to_document_in_parallel(
+            'out.pdf', (100, 100), create_layout, num_pages,
+            merge=self._merge, **kwargs
+            )
+
+    def test_chunks_in_order(self):
+        self._render(
+            10, render_document=write_pages,
+            pages_per_chunk=4, max_workers=2
+            )
+        self.assertEqual(self.pages, [
+            ['layout 0', 'layout 1', 'layout 2', 'layout 3'],
+            ['layout 4', 'layout 5', 'layout 6', 'layout 7'],
+            ['layout 8', 'layout 9']
+            ])
+        output_filename, filenames = self.merged[0]
+        self.assertEqual(output_filename, 'out.pdf')
+        self.assertEqual(filenames, sorted(filenames))
+
+    def test_default_chunks(self):
+        self._render(9, render_document=write_pages, max_workers=1)
+        # Four chunks per worker.
+        self.assertEqual([len(pages) for pages in self.pages], [3, 3, 3])
+
+    def test_temporary_files_removed(self):
+        self._render(3, render_document=write_pages, max_workers=1)
+        self.assertEqual(len(self.directories), 1)
+        self.assertFalse(os.path.exists(self.directories[0]))
+
+    def test_temporary_files_removed_on_error(self):
+        with self.assertRaises(ValueError):
+            self._render(3, render_document=fail_to_write, max_workers=1)
+        self.assertEqual(self.merged, [])
+        self.assertFalse(os.path.exists(self.directories[0]))
+
+class TestRenderChunk(unittest.TestCase):
+    def test_render_chunk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'chunk.pdf')
+            self.assertEqual(rl_utils._render_chunk(
+                write_pages, filename, (100, 100), create_layout, [4, 5]
+                ), filename)
+            with open(filename) as f:
+                self.assertEqual(f.read(), 'layout 4\nlayout 5\n')
+
+@unittest.skipIf(
+    getattr(rl_utils, 'PdfReader', None) is None, 'pdfrw is not installed'
+    )
+class TestMergeDocuments(unittest.TestCase):
+    def test_pages_in_order(self):
+        from layout.pdf_utils import render_to_pdf_document
+        from layout.pages.output import PagesLM
+        from layout.elements.lines import Border
+        with tempfile.TemporaryDirectory() as directory:
+            filenames = []
+            for width in (100, 200):
+                filename = os.path.join(directory, '%d.pdf' % width)
+                render_to_pdf_document(
+                    filename, (width, 100), PagesLM([Border(), Border()])
+                    )
+                filenames.append(filename)
+            output_filename = os.path.join(directory, 'merged.pdf')
+            rl_utils.merge_documents(output_filename, filenames)
+            pages = rl_utils.PdfReader(output_filename).pages
+            self.assertEqual(
+                [float(page.MediaBox[2]) for page in pages],
+                [100, 100, 200, 200]
+                )
+
+class TestReportlabState(unittest.TestCase):
+    def setUp(self):
+        self.canvas = StubCanvas()
+        self.output = rl_utils.ReportlabOutput(self.canvas)
+
+    def _settings(self):
+        return [
+            call for call in self.canvas.calls if call[0].startswith('set')
+            ]
+
+    def test_settings_sent_once(self):
+        o = self.output
+        o.draw_text('a', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_text('b', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_line(0, 0, 1, 1, stroke=(0,0,1), stroke_dash=None)
+        o.draw_line(0, 0, 1, 1, stroke=(0,0,1), stroke_dash=())
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        self.assertEqual(self._settings(), [
+            ('setFont', 'Courier', 10),
+            ('setFillColorRGB', 1, 0, 0),
+            ('setStrokeColorRGB', 0, 0, 1),
+            ('setLineWidth', 1),
+            ('setDash', ())
+            ])
+
+    def test_save_and_restore(self):
+        o = self.output
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        with o:
+            o.draw_rect(0, 0, 1, 1, fill=(0,1,0))
+            o.draw_rect(0, 0, 1, 1, fill=(0,1,0))
+        # The canvas is back to red, so it isn't sent again...
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        # ...but green must be.
+        o.draw_rect(0, 0, 1, 1, fill=(0,1,0))
+        self.assertEqual([
+            call for call in self.canvas.calls if call[0] != 'rect'
+            ], [
+            ('setFillColorRGB', 1, 0, 0),
+            ('saveState',),
+            ('setFillColorRGB', 0, 1, 0),
+            ('restoreState',),
+            ('setFillColorRGB', 0, 1, 0)
+            ])
+
+    def test_end_page_resets(self):
+        o = self.output
+        o.draw_text('a', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_line(0, 0, 1, 1, stroke=(0,0,1), stroke_width=2)
+        o.end_page()
+        o.draw_text('a', 0, 0, font_name='Courier', font_size=10, fill=(1,0,0))
+        o.draw_line(0, 0, 1, 1, stroke=(0,0,1), stroke_width=2)
+        settings = self._settings()
+        self.assertEqual(len(settings), 10)
+        self.assertEqual(settings[:5], settings[5:])
+
+    def test_forms(self):
+        o = self.output
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        self.assertTrue(o.begin_form('a', 10, 10))
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        o.discard_form()
+        self.assertFalse(o.has_form('a'))
+        # Back in the page, where red is still set.
+        o.draw_rect(0, 0, 1, 1, fill=(1,0,0))
+        o.begin_form('a', 10, 10)
+        o.end_form()
+        o.forget_form('a')
+        o.begin_form('b', 10, 10)
+        o.end_form()
+        self.assertEqual([
+            call for call in self.canvas.calls if 'Form' in call[0]
+            ], [
+            ('beginForm', 'LayoutForm1', 0, 0, 10, 10), ('endForm',),
+            ('beginForm', 'LayoutForm2', 0, 0, 10, 10), ('endForm',),
+            ('beginForm', 'LayoutForm3', 0, 0, 10, 10), ('endForm',)
+            ])
+        self.assertEqual(len(self._settings()), 2)
+